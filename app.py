@@ -1,9 +1,12 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 import numpy as np
 from src.data_loader import LottoDataLoader
 from src.ensemble_predictor import EnsemblePredictor
 from pathlib import Path
 import json
+import math
+import os
+import threading
 
 app = Flask(__name__)
 
@@ -11,6 +14,84 @@ app = Flask(__name__)
 loader = LottoDataLoader()
 loader.load()
 
+# 예측 API 기본 시간 예산 (초) - 끝나지 않은 엔진은 최근 점수로 대체하여 응답 지연 상한 유지
+DEFAULT_TIME_BUDGET = float(os.environ.get('LOTTO_TIME_BUDGET', '3.0'))
+
+# 요청 budget 은 고정 단계로 내림하여 캐시 키 수를 제한 (요청 값보다 짧은 단계 중 가장 긴 값, 최소 단계 이하는 최소 단계)
+BUDGET_TIERS = tuple(sorted({1.0, DEFAULT_TIME_BUDGET, 10.0}))
+
+# 캐시에 유지할 예측기 최대 수 (오래된 순으로 제거)
+MAX_CACHED_PREDICTORS = len(BUDGET_TIERS) + 1
+
+# 엔진 점수를 재사용하는 예측기 캐시 {(회차 수, 최신 회차 번호, 시간 예산 단계): 예측기}
+# (최신 회차가 바뀌면 다시 생성, 요청별 가중치는 with_weights 복사본에서 결합하므로 공유 예측기는 변경하지 않음)
+_predictor_cache = {}
+_predictor_rebuilding = set()
+_predictor_lock = threading.Lock()
+
+
+def _budget_tier(budget):
+    """요청 budget (초) -> 캐시 키로 쓰는 고정 단계 (0 이하 = 제한 없음 None)"""
+    if budget <= 0:
+        return None
+    return max([tier for tier in BUDGET_TIERS if tier <= budget], default=BUDGET_TIERS[0])
+
+
+def _get_predictor(matrix, time_budget):
+    """
+    요청 간 공유 예측기 (생성은 잠금 밖에서 수행하여 다른 요청을 막지 않음)
+    예산 초과로 대체된 엔진이 있으면 백그라운드 작업이 모두 끝난 뒤 한 번만 다시 생성하고,
+    다시 생성하는 동안 다른 요청은 기존 예측기를 사용
+    """
+    key = (len(matrix), tuple(int(n) for n in matrix[-1]), time_budget)
+    with _predictor_lock:
+        cached = _predictor_cache.get(key)
+        stale = cached is None or (cached.degraded and not cached.background_pending())
+        if not stale or (cached is not None and key in _predictor_rebuilding):
+            return cached
+        _predictor_rebuilding.add(key)
+    
+    try:
+        predictor = EnsemblePredictor(matrix, time_budget=time_budget)
+        # 엔진 점수/예측 행과 핫/콜드 분석을 미리 채워 요청별 복사본이 공유
+        predictor.get_ensemble_scores()
+        predictor.get_hot_cold_analysis()
+        if time_budget is None:
+            # 제한 없이 계산한 엔진 결과는 이후 시간 예산 요청의 대체 점수로 보관
+            predictor.record_fallback()
+    finally:
+        with _predictor_lock:
+            _predictor_rebuilding.discard(key)
+    
+    with _predictor_lock:
+        for old in [k for k in _predictor_cache if k[:2] != key[:2]]:
+            del _predictor_cache[old]
+        _predictor_cache.pop(key, None)
+        _predictor_cache[key] = predictor
+        while len(_predictor_cache) > MAX_CACHED_PREDICTORS:
+            del _predictor_cache[next(iter(_predictor_cache))]
+    return predictor
+
+
+def _request_params():
+    """
+    요청 파라미터 해석 (형식 오류는 ValueError / TypeError / AttributeError -> 400)
+    
+    Returns:
+        (weights=JSON 가중치 또는 None, profile=default|trained 또는 None, budget 초)
+    """
+    weights = None
+    if request.args.get('weights'):
+        weights = {str(k): float(v) for k, v in json.loads(request.args['weights']).items()}
+    profile = request.args.get('profile') or None
+    if profile not in (None, 'default', 'trained'):
+        raise ValueError(f"지원하지 않는 profile: {profile}")
+    budget = float(request.args.get('budget', DEFAULT_TIME_BUDGET))
+    if math.isnan(budget):
+        raise ValueError("budget 은 숫자여야 합니다")
+    return weights, profile, budget
+
+
 @app.route('/')
 def index():
     """메인 페이지"""
@@ -18,11 +99,25 @@ def index():
 
 @app.route('/api/predict')
 def predict():
-    """예측 결과 API"""
+    """
+    예측 결과 API
+    
+    Query:
+        weights: 엔진별 가중치 JSON (예: {"ml": 0.3, "statistical": 0.2})
+        profile: 가중치 프로파일 (default | trained)
+        budget: 시간 예산 (초, 0 이하 = 제한 없음)
+    """
+    try:
+        weights, profile, budget = _request_params()
+    except (ValueError, TypeError, AttributeError) as e:
+        return jsonify({'error': f"잘못된 요청 파라미터: {e}"}), 400
+
     try:
+        if weights is None and profile is not None:
+            weights = EnsemblePredictor.load_weight_profile(profile)
         matrix = loader.get_numbers_matrix()
-        predictor = EnsemblePredictor(matrix)
-        report = predictor.get_detailed_report()
+        predictor = _get_predictor(matrix, _budget_tier(budget))
+        report = predictor.with_weights(weights or EnsemblePredictor.DEFAULT_WEIGHTS).get_detailed_report()
         
         # JSON 직렬화 가능하도록 변환
         serialized_report = {
@@ -36,7 +131,8 @@ def predict():
                 {'numbers': [int(n) for n in s[0]], 'confidence': float(s[1])}
                 for s in report['predicted_sets']
             ],
-            'sum_range': report['sum_range']
+            'sum_range': report['sum_range'],
+            'degraded_engines': report['degraded_engines']
         }
         
         return jsonify(serialized_report)
@@ -51,6 +51,11 @@ def apply_trained_weights():
     pattern = r"    # 최적화된 엔진 가중치.*?DEFAULT_WEIGHTS = \{[^}]+\}"
     new_content = re.sub(pattern, weights_str, content, flags=re.DOTALL)
     
+    # 학습된 투표 결합 비율 (train_1000.py --optimizer gradient 결과에만 포함)
+    if 'vote_weight' in data:
+        print(f"\n투표 결합 비율: {data['vote_weight']:.4f} (가중 평균 {1 - data['vote_weight']:.4f})")
+        new_content = re.sub(r"    VOTE_WEIGHT = [0-9.]+", f"    VOTE_WEIGHT = {data['vote_weight']:.4f}", new_content)
+    
     # 백업 생성
     backup_path = predictor_path.with_suffix('.py.backup')
     with open(backup_path, 'w') as f:
@@ -4,6 +4,7 @@
 """
 
 import sys
+import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
@@ -11,12 +12,33 @@ sys.path.insert(0, str(Path(__file__).parent))
 from src.data_loader import LottoDataLoader
 from src.ensemble_predictor import EnsemblePredictor
 from src.utils.formatter import LottoFormatter
+from src.utils.profiler import Profiler
 import numpy as np
 import json
 import os
 
 
 def main():
+    parser = argparse.ArgumentParser(description='1~1000회차 학습 → 이후 회차 walk-forward 백테스팅')
+    parser.add_argument('--sets', type=int, default=5, help='회차별 예측 세트 수')
+    parser.add_argument('--mode', choices=['sample', 'portfolio'], default='sample',
+                        help='다중 세트 생성 방식 (portfolio: 커버리지 최대화)')
+    parser.add_argument('--profiles', type=str, default='',
+                        help='동일 회차에서 비교할 가중치 프로파일 (쉼표 구분: default, trained, JSON 경로)')
+    parser.add_argument('--profile', action='store_true', help='엔진 구간별 실행 시간/호출 수 누적 계측 출력')
+    parser.add_argument('--profile-memory', action='store_true', help='계측 시 tracemalloc 최대 할당량 기록')
+    parser.add_argument('--profile-json', type=str, default='', help='계측 결과 JSON 저장 경로')
+    parser.add_argument('--no-store', action='store_true',
+                        help='엔진 점수 저장소(data/score_store)를 쓰지 않고 회차마다 엔진을 직접 계산')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='저장소에 없는 회차 계산 프로세스 수 (기본: CPU 코어 수 - 1)')
+    args = parser.parse_args()
+    
+    # 전 회차 누적 계측기 (미사용 시 None -> 비활성)
+    profiler = None
+    if args.profile or args.profile_memory or args.profile_json:
+        profiler = Profiler(trace_memory=args.profile_memory)
+    
     print("\n" + "=" * 60)
     print("📊 백테스팅: 1~1000회차 학습 → 1001~1209회차 테스트")
     print("=" * 60)
@@ -48,12 +70,25 @@ def main():
         except Exception as e:
             print(f"⚠️ 가중치 로드 실패: {e}")
             
+    # 비교할 가중치 프로파일 (엔진 계산은 회차별 1회만 수행하고 프로파일끼리 공유)
+    if args.profiles:
+        profiles = {name: EnsemblePredictor.load_weight_profile(name)
+                    for name in args.profiles.split(',') if name}
+    else:
+        profiles = {'trained' if trained_weights else 'default': trained_weights}
+    
+    # 테스트 구간 엔진 결과를 저장소에서 재사용 (없는 회차만 병렬 계산 후 저장)
+    store = None
+    if not args.no_store:
+        from src.optimization_cache import OptimizationCache
+        store = OptimizationCache().fill_store(full_matrix, range(1000, len(full_matrix)), workers=args.workers)
+    
     print("✅ 학습 완료! 테스트 시작...\n")
     print("-" * 60)
     
-    # 1001회차부터 테스트
-    hit_counts = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0}
-    total_hits = 0
+    # 1001회차부터 테스트 (프로파일별 집계)
+    hit_counts = {name: {0: 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0} for name in profiles}
+    total_hits = {name: 0 for name in profiles}
     test_count = 0
     
     # Walk-Forward Validation을 위한 현재 데이터 매트릭스
@@ -71,34 +106,41 @@ def main():
             current_matrix, 
             weights=trained_weights, 
             use_ml=True,        # 정확도를 위해 ML 사용
-            use_validator=True  # 정확도를 위해 검증기 사용
+            use_validator=True, # 정확도를 위해 검증기 사용
+            profiler=profiler
         )
+        if store is not None:
+            predictor.load_stored(store)
         
-        # 5개 세트 예측
-        predicted_sets = predictor.predict_multiple_sets(5)
+        # 프로파일별 N개 세트 예측 (엔진 점수 공유)
+        profile_results = predictor.predict_profiles(profiles, args.sets, mode=args.mode)
         
-        # 5개 중 가장 잘 맞은 것 기준
-        best_hit = 0
-        best_set = None
-        
-        for pred, _ in predicted_sets:
-            hits = len(set(pred) & actual)
-            if hits > best_hit:
-                best_hit = hits
-                best_set = pred
-        
-        if best_set is None:
-            best_set = predicted_sets[0][0]
-        
-        hit_counts[best_hit] += 1
-        total_hits += best_hit
+        for name, result in profile_results.items():
+            predicted_sets = result['predicted_sets']
+            
+            # N개 중 가장 잘 맞은 것 기준
+            best_hit = 0
+            best_set = None
+            
+            for pred, _ in predicted_sets:
+                hits = len(set(pred) & actual)
+                if hits > best_hit:
+                    best_hit = hits
+                    best_set = pred
+            
+            if best_set is None:
+                best_set = predicted_sets[0][0]
+            
+            hit_counts[name][best_hit] += 1
+            total_hits[name] += best_hit
+            
+            # 실시간 로그
+            clean_pred = [int(n) for n in best_set]
+            clean_actual = [int(n) for n in actual]
+            label = f" ({name})" if len(profiles) > 1 else ""
+            print(f"[{round_num}회차]{label} 최고 적중: {best_hit}개 | 예측: {sorted(clean_pred)} | 정답: {sorted(clean_actual)}")
         test_count += 1
         
-        # 실시간 로그
-        clean_pred = [int(n) for n in best_set]
-        clean_actual = [int(n) for n in actual]
-        print(f"[{round_num}회차] 최고 적중: {best_hit}개 | 예측: {sorted(clean_pred)} | 정답: {sorted(clean_actual)}")
-        
         # 📌 다음 예측을 위해 정답을 데이터에 추가 (재학습 효과)
         # full_matrix[test_idx]는 1차원 배열이므로 2차원으로 변환 후 추가
         new_row = full_matrix[test_idx].reshape(1, 6)
@@ -109,24 +151,33 @@ def main():
     print("📈 최종 결과")
     print("=" * 60)
     print(f"\n총 테스트 회차: {test_count}회")
-    print(f"평균 적중 개수: {total_hits / test_count:.2f}개\n")
-    
-    print("적중 분포:")
-    for hits in range(6, -1, -1):
-        count = hit_counts[hits]
-        if count > 0:
-            pct = count / test_count * 100
-            bar = "█" * int(pct / 2)
-            prize = ""
-            if hits == 6:
-                prize = " (1등!)"
-            elif hits == 5:
-                prize = " (3등)"
-            elif hits == 4:
-                prize = " (4등)"
-            elif hits == 3:
-                prize = " (5등)"
-            print(f"  {hits}개 적중: {count:3d}회 ({pct:5.1f}%) {bar}{prize}")
+    
+    for name in profiles:
+        if len(profiles) > 1:
+            print(f"\n[{name}]")
+        print(f"평균 적중 개수: {total_hits[name] / test_count:.2f}개\n")
+        
+        print("적중 분포:")
+        for hits in range(6, -1, -1):
+            count = hit_counts[name][hits]
+            if count > 0:
+                pct = count / test_count * 100
+                bar = "█" * int(pct / 2)
+                prize = ""
+                if hits == 6:
+                    prize = " (1등!)"
+                elif hits == 5:
+                    prize = " (3등)"
+                elif hits == 4:
+                    prize = " (4등)"
+                elif hits == 3:
+                    prize = " (5등)"
+                print(f"  {hits}개 적중: {count:3d}회 ({pct:5.1f}%) {bar}{prize}")
+    
+    if profiler is not None:
+        LottoFormatter.print_profile(profiler.report())
+        if args.profile_json:
+            print(f"\n💾 계측 결과 저장: {profiler.save_json(args.profile_json)}")
     
     print("\n" + "=" * 60)
 
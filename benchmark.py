@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+⏱️ 성능/정확도 벤치마크 모음
+
+사용 예:
+    python benchmark.py ml-modes --start 900 --end 1200
+    python benchmark.py ml-compiled --bucket 1150
+    python benchmark.py portfolio --sets 5,100 --rounds 20
+    python benchmark.py weights --rounds 500 --budget 5000 --seeds 3
+    python benchmark.py weights-parity --start 800 --end 820
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from src.data_loader import LottoDataLoader
+
+
+def _top6_hits(proba: np.ndarray, actual_rows: np.ndarray) -> np.ndarray:
+    """(n, 45) 확률 행렬의 상위 6개 번호와 실제 당첨번호 적중 수"""
+    top6 = np.argpartition(-proba, 6, axis=1)[:, :6] + 1
+    return np.array([len(set(top6[i]) & set(actual_rows[i])) for i in range(len(proba))])
+
+
+def _positive_proba(proba_list) -> np.ndarray:
+    """predict_proba 결과 (45개 (n, 2) 배열 리스트) -> (n, 45) 양성 확률"""
+    return np.stack([p[:, 1] if p.shape[1] > 1 else np.full(len(p), 0.5) for p in proba_list], axis=1)
+
+
+def bench_ml_modes(matrix: np.ndarray, start: int, end: int, modes):
+    """MLEngine 모델 방식별 학습 시간 / 추론 시간 / 적중률 비교 (walk-forward)"""
+    from src.engines.ml import MLEngine
+
+    interval = MLEngine.default_params()['retrain_interval']
+    buckets = list(range(start, min(end, len(matrix)), interval))
+    print(f"\n🌲 MLEngine 모델 방식 비교 (구간 {buckets[0]}~{buckets[-1] + interval}, {len(buckets)}개 재학습)")
+    print("-" * 78)
+    print(f"{'mode':12s} {'fit(s)':>9s} {'infer 1row(ms)':>15s} {'infer batch(ms)':>16s} {'avg hits':>9s} {'rounds':>7s}")
+
+    results = {}
+    for mode in modes:
+        engine = MLEngine(matrix, mode=mode)
+        fit_time, single_time, batch_time = 0.0, 0.0, 0.0
+        hits, n_single = [], 0
+        model = None
+
+        for bucket in buckets:
+            X, y = engine._training_set(bucket)
+            t = time.perf_counter()
+            model = engine._fit_model(X, y, base_model=model if mode == 'warm_start' else None)
+            fit_time += time.perf_counter() - t
+
+            test_idx = list(range(bucket, min(bucket + interval, len(matrix))))
+            X_test = np.stack([engine._extract_features(i) for i in test_idx])
+
+            t = time.perf_counter()
+            proba = _positive_proba(model.predict_proba(X_test))
+            batch_time += time.perf_counter() - t
+
+            t = time.perf_counter()
+            for row in X_test[:5]:
+                model.predict_proba(row.reshape(1, -1))
+            single_time += time.perf_counter() - t
+            n_single += min(5, len(X_test))
+
+            hits.extend(_top6_hits(proba, matrix[test_idx]))
+
+        results[mode] = {
+            'fit_sec': fit_time,
+            'infer_single_ms': single_time / max(n_single, 1) * 1000,
+            'infer_batch_ms': batch_time / len(buckets) * 1000,
+            'avg_hits': float(np.mean(hits)),
+            'rounds': len(hits),
+        }
+        r = results[mode]
+        print(f"{mode:12s} {r['fit_sec']:9.2f} {r['infer_single_ms']:15.2f} {r['infer_batch_ms']:16.2f} {r['avg_hits']:9.3f} {r['rounds']:7d}")
+
+    return results
+
+
+def bench_ml_compiled(matrix: np.ndarray, bucket: int, modes):
+    """sklearn predict_proba vs 배열 기반 추론기: 결과 일치 / 지연 시간 / 메모리"""
+    import pickle
+    from src.engines.ml import MLEngine
+    from src.compiled_forest import CompiledForest
+
+    print(f"\n🧮 배열 기반 포레스트 추론 비교 (학습 구간 {bucket}, 평가 {len(matrix) - bucket}행)")
+    print("-" * 96)
+    print(f"{'mode':12s} {'pickle(MB)':>11s} {'arrays(MB)':>11s} {'max|diff|':>10s} "
+          f"{'sk 1row(ms)':>12s} {'arr 1row(ms)':>13s} {'sk batch(ms)':>13s} {'arr batch(ms)':>14s}")
+
+    results = {}
+    for mode in modes:
+        engine = MLEngine(matrix, mode=mode)
+        X, y = engine._training_set(bucket)
+        model = engine._fit_model(X, y)
+        compiled = CompiledForest.from_sklearn(model)
+
+        X_test = np.stack([engine._extract_features(i) for i in range(bucket, len(matrix))])
+
+        t = time.perf_counter()
+        sk = _positive_proba(model.predict_proba(X_test))
+        sk_batch = time.perf_counter() - t
+        t = time.perf_counter()
+        arr = compiled.predict_positive(X_test)
+        arr_batch = time.perf_counter() - t
+
+        n_single = min(20, len(X_test))
+        t = time.perf_counter()
+        for row in X_test[:n_single]:
+            model.predict_proba(row.reshape(1, -1))
+        sk_single = (time.perf_counter() - t) / n_single
+        t = time.perf_counter()
+        for row in X_test[:n_single]:
+            compiled.predict_positive(row)
+        arr_single = (time.perf_counter() - t) / n_single
+
+        results[mode] = {
+            'pickle_mb': len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1e6,
+            'arrays_mb': compiled.nbytes / 1e6,
+            'max_abs_diff': float(np.abs(sk - arr).max()),
+            'sk_single_ms': sk_single * 1000, 'arr_single_ms': arr_single * 1000,
+            'sk_batch_ms': sk_batch * 1000, 'arr_batch_ms': arr_batch * 1000,
+        }
+        r = results[mode]
+        print(f"{mode:12s} {r['pickle_mb']:11.2f} {r['arrays_mb']:11.2f} {r['max_abs_diff']:10.2e} "
+              f"{r['sk_single_ms']:12.2f} {r['arr_single_ms']:13.2f} {r['sk_batch_ms']:13.2f} {r['arr_batch_ms']:14.2f}")
+
+    return results
+
+
+def bench_portfolio(matrix: np.ndarray, set_sizes, rounds: int):
+    """다중 세트 생성 방식 비교: 추출(sample) vs 커버리지 포트폴리오 (생성 시간 / 중복도 / 적중)"""
+    from src.ensemble_predictor import EnsemblePredictor
+    from src.portfolio import portfolio_overlap
+
+    modes = ('sample', 'portfolio')
+    print(f"\n🎟️ 다중 세트 생성 방식 비교 (최신 {len(matrix)}회차 기준)")
+    print("-" * 86)
+    print(f"{'mode':10s} {'sets':>5s} {'time(ms)':>9s} {'mean overlap':>13s} {'max overlap':>12s} "
+          f"{'numbers':>8s} {'pairs':>6s} {'confidence':>11s}")
+
+    predictor = EnsemblePredictor(matrix, use_ml=False)
+    predictor.get_ensemble_scores()
+    results = {}
+    for n_sets in set_sizes:
+        for mode in modes:
+            t = time.perf_counter()
+            sets = predictor.predict_multiple_sets(n_sets, mode=mode)
+            elapsed = time.perf_counter() - t
+            stats = portfolio_overlap([combo for combo, _ in sets])
+            stats.update(time_ms=elapsed * 1000, confidence=float(np.mean([c for _, c in sets])))
+            results[(mode, n_sets)] = stats
+            print(f"{mode:10s} {n_sets:5d} {stats['time_ms']:9.1f} {stats['mean_overlap']:13.3f} "
+                  f"{stats['max_overlap']:12d} {stats['numbers_covered']:8d} {stats['pairs_covered']:6d} "
+                  f"{stats['confidence']:11.2f}")
+
+    if rounds > 0:
+        # walk-forward: 최근 rounds 회차를 직전 데이터로 예측 (ML 제외)
+        n_sets = max(set_sizes)
+        hits = {mode: [] for mode in modes}
+        covered = {mode: [] for mode in modes}
+        for idx in range(len(matrix) - rounds, len(matrix)):
+            predictor = EnsemblePredictor(matrix[:idx], use_ml=False)
+            actual = set(int(n) for n in matrix[idx])
+            for mode in modes:
+                sets = predictor.predict_multiple_sets(n_sets, mode=mode)
+                hits[mode].append([len(set(combo) & actual) for combo, _ in sets])
+                covered[mode].append(len(actual & {n for combo, _ in sets for n in combo}))
+        print(f"\n🎯 최근 {rounds}회차 walk-forward ({n_sets}세트)")
+        print(f"{'mode':10s} {'best-of avg':>12s} {'3+ tickets/round':>17s} {'numbers hit/round':>18s}")
+        for mode in modes:
+            h = np.array(hits[mode])
+            print(f"{mode:10s} {h.max(axis=1).mean():12.3f} {(h >= 3).sum(axis=1).mean():17.3f} "
+                  f"{np.mean(covered[mode]):18.3f}")
+        results['walk_forward'] = {mode: np.array(v).tolist() for mode, v in hits.items()}
+
+    return results
+
+
+def bench_weight_search(matrix: np.ndarray, end: int, rounds: int, budget: int, seeds: int,
+                        optimizers, workers: int = None):
+    """엔진 가중치 최적화기 비교 (ga / de / cmaes): 같은 평가 예산에서의 최고 평균 적중 수와 GA 최고점 도달 평가 수"""
+    from src.optimization_cache import OptimizationCache, PopulationEvaluator
+    from src.weight_search import make_optimizer, evaluations_to_reach
+
+    train = matrix[:end]
+    cache = OptimizationCache()
+    cache.precalculate(train, rounds, workers)
+
+    print(f"\n⚖️ 엔진 가중치 최적화기 비교 (검증 {end - rounds}~{end - 1}, 예산 {budget}회 평가, 시드 {seeds}개)")
+    results = {name: [] for name in optimizers}
+    with PopulationEvaluator(cache.store, end - rounds, end, workers=workers) as evaluator:
+        x0 = np.ones(len(evaluator.engine_names))
+        for seed in range(seeds):
+            for name in optimizers:
+                t = time.perf_counter()
+                result = make_optimizer(name, seed=seed).run(evaluator.evaluate, x0, budget=budget)
+                result['time_sec'] = time.perf_counter() - t
+                results[name].append(result)
+
+    # 기준: 같은 시드의 GA 최종 최고점 (GA 를 비교하지 않으면 첫 번째 최적화기)
+    reference = results['ga' if 'ga' in results else optimizers[0]]
+    print("-" * 78)
+    print(f"{'optimizer':10s} {'best avg':>9s} {'best std':>9s} {'time(s)':>8s} {'evals':>7s} "
+          f"{'reach ref (median evals)':>25s} {'reached':>8s}")
+    for name in optimizers:
+        runs = results[name]
+        best = np.array([r['score'] for r in runs])
+        reach = [evaluations_to_reach(r['history'], ref['score']) for r, ref in zip(runs, reference)]
+        reached = [n for n in reach if n is not None]
+        median = f"{np.median(reached):.0f}" if reached else '-'
+        print(f"{name:10s} {best.mean():9.4f} {best.std():9.4f} {np.mean([r['time_sec'] for r in runs]):8.2f} "
+              f"{np.mean([r['evaluations'] for r in runs]):7.0f} {median:>25s} {len(reached):>4d}/{len(runs)}")
+    return results
+
+
+def _top6(scores: np.ndarray) -> np.ndarray:
+    """(..., 45) 점수의 상위 6개 번호 (동점은 작은 번호 먼저 - EnsemblePredictor 정렬과 같은 규칙)"""
+    order = np.argsort(-scores, axis=-1, kind='stable')[..., :6]
+    return np.sort(order, axis=-1) + 1
+
+
+def check_weight_parity(matrix: np.ndarray, start: int, end: int, keep: int, seed: int = 0):
+    """
+    학습 평가기(OptimizationCache) 와 실제 예측기(EnsemblePredictor) 의 상위 6개 번호 일치 확인
+    저장된 cutoff [start, end) 에서 모든 가중치가 양수인 경우와 keep 개 엔진만 남기고 0 인 경우를 비교
+    """
+    from src.ensemble_predictor import EnsemblePredictor
+    from src.optimization_cache import OptimizationCache
+
+    store = OptimizationCache().fill_store(matrix, range(start, end))
+    cached_data = store.cached_data(start, end)
+    names = cached_data['engine_names']
+    rng = np.random.default_rng(seed)
+    dense = rng.dirichlet(np.ones(len(names)))
+    sparse = dense.copy()
+    sparse[rng.permutation(len(names))[keep:]] = 0
+    sparse /= sparse.sum()
+    cases = {'dense': dense, 'sparse': sparse}
+
+    expected = {label: _top6(OptimizationCache.ensemble_scores(cached_data, w)[:, 0])
+                for label, w in cases.items()}
+    mismatches = {label: 0 for label in cases}
+    for r, cutoff in enumerate(range(start, end)):
+        predictor = EnsemblePredictor(matrix[:cutoff], use_ml=True, use_validator=True, use_dynamic_weight=True)
+        predictor.load_stored(store)
+        for label, w in cases.items():
+            live = predictor.reweight(dict(zip(names, w.tolist())))
+            live_top6 = _top6(np.array([live[num] for num in range(1, 46)]))
+            mismatches[label] += int(not np.array_equal(live_top6, expected[label][r]))
+
+    print(f"\n🔍 평가기 / 예측기 상위 6개 번호 일치 확인 (cutoff {start}~{end - 1})")
+    for label, w in cases.items():
+        used = ', '.join(name for name, v in zip(names, w) if v > 0)
+        print(f"   {label:6s} 불일치 {mismatches[label]:3d}/{end - start} 회차 (가중치 > 0: {used})")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로또 예측 시스템 벤치마크')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_ml = sub.add_parser('ml-modes', help='MLEngine 모델 방식 비교 (multioutput / native / warm_start)')
+    p_ml.add_argument('--start', type=int, default=900, help='첫 재학습 회차 인덱스')
+    p_ml.add_argument('--end', type=int, default=1200, help='마지막 테스트 회차 인덱스')
+    p_ml.add_argument('--modes', type=str, default='multioutput,native,warm_start', help='비교할 방식 (쉼표 구분)')
+
+    p_cf = sub.add_parser('ml-compiled', help='sklearn 추론 vs 배열 기반 추론 비교')
+    p_cf.add_argument('--bucket', type=int, default=1150, help='학습 구간 (이후 회차로 평가)')
+    p_cf.add_argument('--modes', type=str, default='multioutput,native', help='비교할 방식 (쉼표 구분)')
+
+    p_pf = sub.add_parser('portfolio', help='다중 세트 추출 vs 커버리지 포트폴리오 비교')
+    p_pf.add_argument('--sets', type=str, default='5,100', help='세트 수 목록 (쉼표 구분)')
+    p_pf.add_argument('--rounds', type=int, default=0, help='walk-forward 적중 비교 회차 수 (0 이면 생략)')
+
+    p_ws = sub.add_parser('weights', help='엔진 가중치 최적화기 비교 (ga / de / cmaes, 캐시 점수 텐서)')
+    p_ws.add_argument('--end', type=int, default=1000, help='학습 데이터 회차 수 (train_1000 과 동일하게 1000)')
+    p_ws.add_argument('--rounds', type=int, default=500, help='검증 회차 수')
+    p_ws.add_argument('--budget', type=int, default=5000, help='최적화기별 최대 평가 수')
+    p_ws.add_argument('--seeds', type=int, default=3, help='반복 시드 수')
+    p_ws.add_argument('--optimizers', type=str, default='ga,de,cmaes', help='비교할 최적화기 (쉼표 구분)')
+    p_ws.add_argument('--workers', type=int, help='평가 프로세스 수 (기본: CPU - 1)')
+
+    p_wp = sub.add_parser('weights-parity', help='학습 평가기와 실제 예측기의 상위 6개 번호 일치 확인 (가중치 0 엔진 포함)')
+    p_wp.add_argument('--start', type=int, default=800, help='첫 cutoff')
+    p_wp.add_argument('--end', type=int, default=820, help='마지막 cutoff (미포함)')
+    p_wp.add_argument('--keep', type=int, default=2, help='sparse 가중치에서 남길 엔진 수')
+
+    args = parser.parse_args()
+
+    # 웹 동기화 없이 로컬 데이터만 사용 (재현 가능한 측정)
+    loader = LottoDataLoader()
+    loader.load()
+    matrix = loader.numbers_df.values
+
+    if args.command == 'ml-modes':
+        bench_ml_modes(matrix, args.start, args.end, args.modes.split(','))
+    elif args.command == 'ml-compiled':
+        bench_ml_compiled(matrix, args.bucket, args.modes.split(','))
+    elif args.command == 'portfolio':
+        bench_portfolio(matrix, [int(n) for n in args.sets.split(',')], args.rounds)
+    elif args.command == 'weights':
+        bench_weight_search(matrix, args.end, args.rounds, args.budget, args.seeds,
+                            args.optimizers.split(','), args.workers)
+    elif args.command == 'weights-parity':
+        mismatches = check_weight_parity(matrix, args.start, args.end, args.keep)
+        if any(mismatches.values()):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from src.data_loader import LottoDataLoader
 from src.ensemble_predictor import EnsemblePredictor
 from src.utils.formatter import LottoFormatter
+from src.utils.profiler import Profiler
 
 
 def run_backtest(loader, last_n: int = 100):
@@ -63,15 +64,58 @@ def run_backtest(loader, last_n: int = 100):
     LottoFormatter.print_backtest_report(hit_counts, total_hits / last_n if last_n > 0 else 0)
 
 
+def _parse_numbers(text: str):
+    return [int(n) for n in text.split(',') if n.strip()] if text else []
+
+
+def run_quickpick(args):
+    """조건부 대량 자동번호 생성 (청크 단위로 파일 또는 표준출력에 기록)"""
+    import time
+    from src.quickpick import QuickPickGenerator, to_csv_bytes
+    
+    start = time.time()
+    generator = QuickPickGenerator(fixed=_parse_numbers(args.fixed), exclude=_parse_numbers(args.exclude),
+                                   validate=not args.no_validate, seed=args.seed)
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        for chunk in generator.generate(args.quickpick):
+            out.write(to_csv_bytes(chunk))
+            written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+    
+    if args.output:
+        elapsed = time.time() - start
+        print(f"✅ 자동번호 {written:,}장 생성 → {args.output} "
+              f"(조건 만족 조합 {generator.space_size:,}개 중, {elapsed:.2f}초)")
+
+
 def main():
     parser = argparse.ArgumentParser(description='로또 당첨번호 예측 시스템')
     parser.add_argument('--sets', type=int, default=5, help='예측 세트 수')
     parser.add_argument('--backtest', action='store_true', help='백테스팅 실행')
     parser.add_argument('--last', type=int, default=100, help='백테스팅 회차 수')
     parser.add_argument('--simple', action='store_true', help='간단 출력 모드')
+    parser.add_argument('--full-search', action='store_true', help='45개 번호 전체에서 최적 조합 정확 탐색')
+    parser.add_argument('--quickpick', type=int, default=0, help='조건부 자동번호 N장 생성 (중복 없음)')
+    parser.add_argument('--fixed', type=str, default='', help='자동번호 고정 번호 (쉼표 구분)')
+    parser.add_argument('--exclude', type=str, default='', help='자동번호 제외 번호 (쉼표 구분)')
+    parser.add_argument('--output', type=str, default='', help='자동번호 저장 파일 (CSV, 미지정 시 표준출력)')
+    parser.add_argument('--seed', type=int, default=None, help='자동번호 난수 시드')
+    parser.add_argument('--no-validate', action='store_true', help='자동번호에 조합 검증 규칙 미적용')
+    parser.add_argument('--profile', action='store_true', help='엔진 구간별 실행 시간/호출 수 계측 출력')
+    parser.add_argument('--profile-memory', action='store_true', help='계측 시 tracemalloc 최대 할당량 기록')
+    parser.add_argument('--profile-json', type=str, default='', help='계측 결과 JSON 저장 경로')
+    parser.add_argument('--weights', type=str, default='', help='가중치 프로파일 (default, trained 또는 JSON 파일 경로)')
     
     args = parser.parse_args()
     
+    if args.quickpick:
+        run_quickpick(args)
+        return
+    
     print("\n⏳ 데이터 로딩 및 분석 엔진 초기화 중...")
     loader = LottoDataLoader()
     # 최신 데이터 확인 및 동기화 추가
@@ -82,7 +126,12 @@ def main():
         run_backtest(loader, args.last)
         return
     
-    predictor = EnsemblePredictor(matrix)
+    weights = EnsemblePredictor.load_weight_profile(args.weights) if args.weights else None
+    profiler = None
+    if args.profile or args.profile_memory or args.profile_json:
+        profiler = Profiler(trace_memory=args.profile_memory)
+    predictor = EnsemblePredictor(matrix, weights=weights, full_search=args.full_search,
+                                  profiler=profiler)
     predicted_sets = predictor.predict_multiple_sets(args.sets)
     
     LottoFormatter.print_header(loader.get_latest_round() + 1)
@@ -92,6 +141,10 @@ def main():
         LottoFormatter.print_engine_predictions(predictor.engine_predictions)
     
     LottoFormatter.print_final_predictions(predicted_sets)
+    if profiler is not None:
+        LottoFormatter.print_profile(profiler.report())
+        if args.profile_json:
+            print(f"\n💾 계측 결과 저장: {profiler.save_json(args.profile_json)}")
     LottoFormatter.print_footer()
 
 
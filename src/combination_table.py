@@ -0,0 +1,257 @@
+"""
+6/45 전체 조합 특성 테이블 (C(45,6) = 8,145,060 조합)
+조합 고유의 검증 지표를 1회 계산하여 열(column)별 memory-mapped 배열로 저장
+
+    - 인덱스: 사전식 순위 (itertools.combinations(range(1, 46), 6) 순서와 동일)
+    - 열: sum, ac, consecutive_pairs, odd_count, high_count, ending_diversity (uint8)
+          sections (uint16, 구간 1~5 개수를 3비트씩 패킹)
+    - 용량: 약 65MB (data/combination_table/)
+
+사용 예:
+    table = CombinationTable.open(build=True)
+    metrics = table.metrics(table.rank(combos))            # 배치 조회 = 배열 gather
+    for tickets in table.iter_filtered(ac=(7, 10), sum=(100, 175)):
+        ...
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from itertools import combinations
+from math import comb
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+
+DEFAULT_TABLE_DIR = Path(__file__).parent.parent / "data" / "combination_table"
+
+N_NUMBERS = 45
+PICK = 6
+N_COMBINATIONS = comb(N_NUMBERS, PICK)
+
+UINT8_COLUMNS = ('sum', 'ac', 'consecutive_pairs', 'odd_count', 'high_count', 'ending_diversity')
+SECTION_BITS = 3
+
+
+def _prefix_counts() -> np.ndarray:
+    """
+    S[i, x] = sum_{v=1..x} C(45 - v, 5 - i)
+    위치 i 의 값을 v 보다 작게 고를 때 앞서는 조합 수 계산용 누적표
+    """
+    S = np.zeros((PICK, N_NUMBERS + 1), dtype=np.int64)
+    for i in range(PICK):
+        for v in range(1, N_NUMBERS + 1):
+            S[i, v] = S[i, v - 1] + comb(N_NUMBERS - v, PICK - 1 - i)
+    return S
+
+
+_S = _prefix_counts()
+
+
+def rank(combos: np.ndarray) -> np.ndarray:
+    """(K, 6) 조합 -> (K,) 사전식 순위 (입력 정렬 여부 무관)"""
+    c = np.sort(np.asarray(combos, dtype=np.int64).reshape(-1, PICK), axis=1)
+    prev = np.zeros(len(c), dtype=np.int64)
+    r = np.zeros(len(c), dtype=np.int64)
+    for i in range(PICK):
+        r += _S[i, c[:, i] - 1] - _S[i, prev]
+        prev = c[:, i]
+    return r
+
+
+def _unrank_tables():
+    """
+    순위 -> 조합 변환표
+    앞 두 번호 (a, b) 990쌍의 시작 순위와, 뒤 네 번호를 위한 {1..43} 의 4-조합 사전식 목록.
+    {b+1..45} 의 4-조합 사전식 목록은 {1..43} 목록의 마지막 C(45-b, 4) 개에 2 를 더한 것과 같음
+    """
+    pairs = np.array(list(combinations(range(1, N_NUMBERS + 1), 2)), dtype=np.int64)
+    counts = np.array([comb(N_NUMBERS - b, PICK - 2) for _, b in pairs], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    tails = np.array(list(combinations(range(1, N_NUMBERS - 1), PICK - 2)), dtype=np.uint8)
+    return pairs.astype(np.uint8), counts, starts, tails
+
+
+_PAIRS, _PAIR_COUNTS, _PAIR_STARTS, _TAILS = _unrank_tables()
+
+
+def unrank(ranks: np.ndarray) -> np.ndarray:
+    """(K,) 사전식 순위 -> (K, 6) 오름차순 조합 (uint8)"""
+    r = np.asarray(ranks, dtype=np.int64).ravel()
+    i = np.searchsorted(_PAIR_STARTS, r, side='right') - 1
+    row = len(_TAILS) - _PAIR_COUNTS[i] + (r - _PAIR_STARTS[i])
+    out = np.empty((len(r), PICK), dtype=np.uint8)
+    out[:, :2] = _PAIRS[i]
+    out[:, 2:] = _TAILS[row] + np.uint8(2)
+    return out
+
+
+def pack_sections(combos: np.ndarray) -> np.ndarray:
+    """조합별 구간(1-10, 11-20, 21-30, 31-40, 41-45) 개수를 uint16 으로 패킹"""
+    sec = np.minimum((np.asarray(combos, dtype=np.int64) - 1) // 10, 4)
+    packed = np.zeros(len(sec), dtype=np.uint16)
+    for s in range(5):
+        packed |= (np.count_nonzero(sec == s, axis=1).astype(np.uint16) << (SECTION_BITS * s))
+    return packed
+
+
+def unpack_sections(packed: np.ndarray) -> np.ndarray:
+    """uint16 패킹 -> (K, 5) 구간별 개수"""
+    p = np.asarray(packed, dtype=np.uint16)
+    mask = (1 << SECTION_BITS) - 1
+    return np.stack([(p >> (SECTION_BITS * s)) & mask for s in range(5)], axis=1).astype(np.uint8)
+
+
+class CombinationTable:
+    """memory-mapped 전체 조합 특성 테이블"""
+
+    FORMAT_VERSION = 1
+    CHUNK = 1_000_000
+
+    def __init__(self, table_dir: Path = None):
+        self.table_dir = Path(table_dir) if table_dir else DEFAULT_TABLE_DIR
+        manifest_path = self.table_dir / "manifest.json"
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != self.FORMAT_VERSION or manifest.get('count') != N_COMBINATIONS:
+            raise ValueError(f"조합 테이블 형식이 맞지 않습니다: {manifest_path}")
+        self.columns = {name: np.load(self.table_dir / f"{name}.npy", mmap_mode='r')
+                        for name in UINT8_COLUMNS + ('sections',)}
+
+    # ------------------------------------------------------------------ #
+    # 생성
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def exists(cls, table_dir: Path = None) -> bool:
+        return ((Path(table_dir) if table_dir else DEFAULT_TABLE_DIR) / "manifest.json").exists()
+
+    @classmethod
+    def open(cls, table_dir: Path = None, build: bool = False) -> 'CombinationTable':
+        """테이블 열기 (build=True 이면 없을 때 생성)"""
+        if not cls.exists(table_dir):
+            if not build:
+                raise FileNotFoundError("조합 테이블이 없습니다. CombinationTable.build() 를 먼저 실행하세요.")
+            cls.build(table_dir)
+        return cls(table_dir)
+
+    @classmethod
+    def build(cls, table_dir: Path = None, verbose: bool = False) -> Path:
+        """전체 조합 특성 계산 후 임시 디렉터리에 기록, 완료 시 원자적으로 교체"""
+        from src.combination_validator import CombinationValidator
+
+        table_dir = Path(table_dir) if table_dir else DEFAULT_TABLE_DIR
+        tmp_dir = table_dir.with_name(f"{table_dir.name}.tmp-{os.getpid()}")
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+
+        start = time.time()
+        try:
+            outputs = {name: np.lib.format.open_memmap(tmp_dir / f"{name}.npy", mode='w+',
+                                                       dtype=np.uint8, shape=(N_COMBINATIONS,))
+                       for name in UINT8_COLUMNS}
+            outputs['sections'] = np.lib.format.open_memmap(tmp_dir / "sections.npy", mode='w+',
+                                                            dtype=np.uint16, shape=(N_COMBINATIONS,))
+            for lo in range(0, N_COMBINATIONS, cls.CHUNK):
+                hi = min(lo + cls.CHUNK, N_COMBINATIONS)
+                combos = unrank(np.arange(lo, hi))
+                metrics = CombinationValidator.batch_metrics(combos, use_table=False)
+                for name in UINT8_COLUMNS:
+                    outputs[name][lo:hi] = metrics[name]
+                outputs['sections'][lo:hi] = pack_sections(combos)
+                if verbose:
+                    sys.stdout.write(f"\r   조합 테이블 생성: {hi / N_COMBINATIONS * 100:5.1f}% ({hi:,}/{N_COMBINATIONS:,})")
+                    sys.stdout.flush()
+            for arr in outputs.values():
+                arr.flush()
+            del outputs
+
+            with open(tmp_dir / "manifest.json", 'w', encoding='utf-8') as f:
+                json.dump({'format': cls.FORMAT_VERSION, 'count': N_COMBINATIONS,
+                           'columns': list(UINT8_COLUMNS) + ['sections'],
+                           'built_at': time.strftime("%Y-%m-%d %H:%M:%S")}, f, indent=2)
+
+            if table_dir.exists():
+                shutil.rmtree(table_dir)
+            os.replace(tmp_dir, table_dir)
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        if verbose:
+            print(f"\n✅ 조합 테이블 생성 완료: {table_dir} ({time.time() - start:.1f}초)")
+        return table_dir
+
+    # ------------------------------------------------------------------ #
+    # 조회
+    # ------------------------------------------------------------------ #
+    rank = staticmethod(rank)
+    unrank = staticmethod(unrank)
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(col.nbytes for col in self.columns.values()))
+
+    def metrics(self, ranks: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        순위 배열 -> 지표 배열 (CombinationValidator.batch_metrics 와 동일한 키)
+        """
+        ranks = np.asarray(ranks, dtype=np.int64)
+        result = {name: self.columns[name][ranks].astype(np.int64) for name in UINT8_COLUMNS}
+        sections = unpack_sections(self.columns['sections'][ranks])
+        result['sections_covered'] = np.count_nonzero(sections, axis=1)
+        return result
+
+    def sections(self, ranks: np.ndarray) -> np.ndarray:
+        """순위 배열 -> (K, 5) 구간별 개수"""
+        return unpack_sections(self.columns['sections'][np.asarray(ranks, dtype=np.int64)])
+
+    def _range_mask(self, lo: int, hi: int, ranges: Dict[str, Tuple[int, int]]) -> np.ndarray:
+        mask = np.ones(hi - lo, dtype=bool)
+        for name, (low, high) in ranges.items():
+            if name == 'sections_covered':
+                covered = np.count_nonzero(unpack_sections(self.columns['sections'][lo:hi]), axis=1)
+                col = covered
+            else:
+                col = self.columns[name][lo:hi]
+            mask &= (col >= low) & (col <= high)
+        return mask
+
+    def iter_filtered_ranks(self, chunk: int = None, **ranges: Tuple[int, int]) -> Iterator[np.ndarray]:
+        """
+        조건을 만족하는 조합 순위를 청크 단위로 생성
+
+        Args:
+            ranges: 열 이름 = (최소, 최대) 포함 범위. 예) ac=(7, 10), sum=(100, 175)
+                    사용 가능: sum, ac, consecutive_pairs, odd_count, high_count,
+                              ending_diversity, sections_covered
+        """
+        unknown = set(ranges) - set(UINT8_COLUMNS) - {'sections_covered'}
+        if unknown:
+            raise ValueError(f"알 수 없는 조건: {sorted(unknown)}")
+        chunk = chunk or self.CHUNK
+        for lo in range(0, N_COMBINATIONS, chunk):
+            hi = min(lo + chunk, N_COMBINATIONS)
+            idx = np.nonzero(self._range_mask(lo, hi, ranges))[0]
+            if len(idx):
+                yield idx + lo
+
+    def iter_filtered(self, chunk: int = None, **ranges: Tuple[int, int]) -> Iterator[np.ndarray]:
+        """조건을 만족하는 조합을 (k, 6) uint8 배열 청크로 생성"""
+        for ranks in self.iter_filtered_ranks(chunk, **ranges):
+            yield unrank(ranks)
+
+    def count(self, **ranges: Tuple[int, int]) -> int:
+        """조건을 만족하는 조합 수"""
+        return int(sum(len(r) for r in self.iter_filtered_ranks(**ranges)))
+
+
+# 테이블 생성
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    CombinationTable.build(verbose=True)
+    table = CombinationTable.open()
+    print(f"   용량: {table.nbytes / 1e6:.1f}MB")
+    print(f"   AC 7~10, 합계 100~175: {table.count(ac=(7, 10), sum=(100, 175)):,}개")
@@ -3,10 +3,22 @@
 AC값, 연속번호, 끝수 다양성, 홀짝/고저 비율 등 검증
 """
 
-from typing import List, Tuple, Dict, Set
+from typing import List, Tuple, Dict, Set, Optional
 from itertools import combinations
+import time
 import numpy as np
 
+from src.utils.bitmask import combination_masks, popcount
+
+
+# 번호 비트마스크 (비트 n = 번호 n)
+_ODD_MASK = np.uint64(sum(1 << n for n in range(1, 46, 2)))
+_HIGH_MASK = np.uint64(sum(1 << n for n in range(23, 46)))
+# 번호 -> 번호/끝수/구간 비트 조회표
+_NUMBER_BIT = np.array([1 << n for n in range(46)], dtype=np.uint64)
+_ENDING_BIT = np.array([1 << (n % 10) for n in range(46)], dtype=np.uint64)
+_SECTION_BIT = np.array([1 << min(max(n - 1, 0) // 10, 4) for n in range(46)], dtype=np.uint64)
+
 
 class CombinationValidator:
     """번호 조합 검증기"""
@@ -18,6 +30,25 @@ class CombinationValidator:
     OPTIMAL_HIGH_RANGE = (2, 4)  # 고번호(23-45) 2~4개
     MIN_ENDING_DIVERSITY = 4  # 최소 4가지 다른 끝수
     MAX_CONSECUTIVE_PAIRS = 2  # 연속번호 쌍 최대 2개
+
+    # 전체 조합 특성 테이블 (선택 사항: attach_table 로 연결 시 batch_metrics 가 배열 gather 로 동작)
+    _table = None
+    
+    # validate_batch 위반 비트 (validate 의 violations 항목과 같은 순서)
+    VIOLATION_AC = 1
+    VIOLATION_SUM = 2
+    VIOLATION_ODD = 4
+    VIOLATION_ENDING = 8
+    VIOLATION_NAMES = {VIOLATION_AC: 'ac', VIOLATION_SUM: 'sum',
+                       VIOLATION_ODD: 'odd_count', VIOLATION_ENDING: 'ending_diversity'}
+    
+    # validate_batch 결과 구조화 배열 형식
+    BATCH_DTYPE = np.dtype([
+        ('sum', np.uint16), ('ac', np.int8), ('consecutive_pairs', np.uint8),
+        ('odd_count', np.uint8), ('high_count', np.uint8), ('ending_diversity', np.uint8),
+        ('sections_covered', np.uint8), ('violations', np.uint8), ('is_valid', np.bool_),
+        ('score', np.float64),
+    ])
     
     @staticmethod
     def calculate_ac(numbers: List[int]) -> int:
@@ -72,14 +103,9 @@ class CombinationValidator:
                 sections[5] += 1
         return sections
     
-    def validate(self, numbers: List[int]) -> Tuple[bool, Dict[str, any]]:
-        """
-        조합 유효성 검증
-        
-        Returns:
-            (유효 여부, 상세 결과)
-        """
-        results = {
+    def _metrics(self, numbers: List[int]) -> Dict[str, any]:
+        """단일 조합 지표 (검증 메시지 없이)"""
+        return {
             'sum': sum(numbers),
             'ac': self.calculate_ac(numbers),
             'consecutive_pairs': self.count_consecutive_pairs(numbers),
@@ -88,6 +114,15 @@ class CombinationValidator:
             'ending_diversity': self.count_ending_diversity(numbers),
             'sections': self.get_section_distribution(numbers)
         }
+    
+    def validate(self, numbers: List[int]) -> Tuple[bool, Dict[str, any]]:
+        """
+        조합 유효성 검증
+        
+        Returns:
+            (유효 여부, 상세 결과)
+        """
+        results = self._metrics(numbers)
         
         # 검증
         is_valid = True
@@ -123,7 +158,7 @@ class CombinationValidator:
         조합 품질 점수 (0~1)
         높을수록 좋은 조합
         """
-        is_valid, results = self.validate(numbers)
+        results = self._metrics(numbers)
         
         score = 0.0
         
@@ -164,6 +199,198 @@ class CombinationValidator:
         return score
 
 
+    # ------------------------------------------------------------------ #
+    # 배치(벡터화) 계산 - 다수 조합을 (K, 6) 배열로 한 번에 처리
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _count_distinct(values: np.ndarray) -> np.ndarray:
+        """행별 서로 다른 값의 개수 (0~63 값은 비트마스크 popcount, 그 외는 정렬)"""
+        if values.size == 0:
+            return np.zeros(len(values), dtype=np.int64)
+        if values.min() >= 0 and values.max() < 64:
+            return popcount(combination_masks(values))
+        v = np.sort(values, axis=1)
+        return 1 + np.count_nonzero(v[:, 1:] != v[:, :-1], axis=1)
+
+    @classmethod
+    def attach_table(cls, table=None, build: bool = False):
+        """
+        전체 조합 특성 테이블 연결 (None 이면 기본 경로에서 열기)
+
+        선택 사항이며 예측기/조합 탐색/포트폴리오는 자동으로 연결하지 않습니다.
+        서로 다른 6개 번호의 지표는 비트마스크 경로(_mask_metrics)가 테이블 gather 와 같은 속도이므로,
+        테이블은 순위 공간을 직접 다루는 쪽(QuickPickGenerator, CombinationTable.iter_filtered)이 쓰고
+        attach_table 은 이미 테이블을 열어 둔 대량 검증 호출자가 같은 테이블을 재사용할 때 호출합니다.
+
+        Returns:
+            연결된 CombinationTable (테이블이 없고 build=False 이면 None)
+        """
+        if table is None:
+            from src.combination_table import CombinationTable
+            if not (build or CombinationTable.exists()):
+                return None
+            table = CombinationTable.open(build=build)
+        cls._table = table
+        return table
+
+    @classmethod
+    def detach_table(cls):
+        cls._table = None
+
+    @classmethod
+    def batch_metrics(cls, combos: np.ndarray, use_table: bool = True) -> Dict[str, np.ndarray]:
+        """
+        다수 조합의 지표를 배열로 계산 (validate 의 결과와 동일한 값)
+
+        Args:
+            combos: (K, n) 번호 배열 (정렬 여부 무관)
+            use_table: 테이블이 연결되어 있고 6개 조합이면 순위 gather 로 조회
+        Returns:
+            {'sum', 'ac', 'consecutive_pairs', 'odd_count', 'high_count',
+             'ending_diversity', 'sections_covered'} 각 (K,) 정수 배열
+        """
+        c = np.asarray(combos)
+        n = c.shape[1]
+        if len(c) and n and c.min() >= 1 and c.max() <= 45:
+            # 테이블 / 비트마스크 경로는 번호가 서로 다른 행만 (중복 번호 행은 정렬 경로)
+            distinct = popcount(combination_masks(c)) == n
+            if not distinct.all():
+                fast = cls.batch_metrics(c[distinct], use_table)
+                slow = cls._sorted_metrics(c[~distinct])
+                merged = {}
+                for key in slow:
+                    merged[key] = np.empty(len(c), dtype=np.int64)
+                    merged[key][distinct] = fast[key]
+                    merged[key][~distinct] = slow[key]
+                return merged
+            if use_table and cls._table is not None and n == 6:
+                return cls._table.metrics(cls._table.rank(np.sort(c.astype(np.int64), axis=1)))
+            return cls._mask_metrics(c)
+        return cls._sorted_metrics(c)
+
+    @classmethod
+    def _sorted_metrics(cls, c: np.ndarray) -> Dict[str, np.ndarray]:
+        """정렬 기반 지표 계산 (중복 번호 / 범위 밖 번호 포함 임의 입력)"""
+        n = c.shape[1]
+        c = np.sort(c.astype(np.int64), axis=1)
+        i, j = np.triu_indices(n, k=1)
+        diffs = c[:, j] - c[:, i]
+        return {
+            'sum': c.sum(axis=1),
+            'ac': cls._count_distinct(diffs) - (n - 1),
+            'consecutive_pairs': np.count_nonzero(np.diff(c, axis=1) == 1, axis=1),
+            'odd_count': np.count_nonzero(c % 2 == 1, axis=1),
+            'high_count': np.count_nonzero(c >= 23, axis=1),
+            'ending_diversity': cls._count_distinct(c % 10),
+            'sections_covered': cls._count_distinct(np.minimum((c - 1) // 10, 4)),
+        }
+
+    @staticmethod
+    def _mask_metrics(c: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        번호 비트마스크 기반 지표 계산 (정렬 불필요, 조합 내 번호는 서로 달라야 함)
+        차이값 집합 = OR_i (mask >> c_i) 에서 0 을 뺀 것
+        """
+        n = c.shape[1]
+        idx = c.astype(np.intp)
+        cols = [idx[:, k] for k in range(n)]
+        one = np.uint64(1)
+        mask = _NUMBER_BIT[cols[0]].copy()
+        endings = _ENDING_BIT[cols[0]].copy()
+        sections = _SECTION_BIT[cols[0]].copy()
+        for col in cols[1:]:
+            mask |= _NUMBER_BIT[col]
+            endings |= _ENDING_BIT[col]
+            sections |= _SECTION_BIT[col]
+        diffs = np.zeros(len(c), dtype=np.uint64)
+        for col in cols:
+            diffs |= mask >> col.astype(np.uint64)
+        return {
+            'sum': c.sum(axis=1, dtype=np.int64),
+            'ac': popcount(diffs & ~one) - (n - 1),
+            'consecutive_pairs': popcount(mask & (mask >> one)),
+            'odd_count': popcount(mask & _ODD_MASK),
+            'high_count': popcount(mask & _HIGH_MASK),
+            'ending_diversity': popcount(endings),
+            'sections_covered': popcount(sections),
+        }
+
+    def violation_mask(self, combos: np.ndarray, metrics: Dict[str, np.ndarray] = None) -> np.ndarray:
+        """다수 조합의 위반 비트마스크 (VIOLATION_* 비트의 OR, 0 이면 유효)"""
+        m = metrics if metrics is not None else self.batch_metrics(combos)
+        ac, total, odds = m['ac'], m['sum'], m['odd_count']
+        mask = np.zeros(len(ac), dtype=np.uint8)
+        mask |= np.where((ac < self.OPTIMAL_AC_RANGE[0]) | (ac > self.OPTIMAL_AC_RANGE[1]),
+                         self.VIOLATION_AC, 0).astype(np.uint8)
+        mask |= np.where((total < self.OPTIMAL_SUM_RANGE[0]) | (total > self.OPTIMAL_SUM_RANGE[1]),
+                         self.VIOLATION_SUM, 0).astype(np.uint8)
+        mask |= np.where((odds < self.OPTIMAL_ODD_RANGE[0]) | (odds > self.OPTIMAL_ODD_RANGE[1]),
+                         self.VIOLATION_ODD, 0).astype(np.uint8)
+        mask |= np.where(m['ending_diversity'] < self.MIN_ENDING_DIVERSITY,
+                         self.VIOLATION_ENDING, 0).astype(np.uint8)
+        return mask
+
+    def is_valid_batch(self, combos: np.ndarray, metrics: Dict[str, np.ndarray] = None) -> np.ndarray:
+        """다수 조합의 유효 여부 (validate 의 is_valid 와 동일한 기준)"""
+        m = metrics if metrics is not None else self.batch_metrics(combos)
+        return ((self.OPTIMAL_AC_RANGE[0] <= m['ac']) & (m['ac'] <= self.OPTIMAL_AC_RANGE[1]) &
+                (self.OPTIMAL_SUM_RANGE[0] <= m['sum']) & (m['sum'] <= self.OPTIMAL_SUM_RANGE[1]) &
+                (self.OPTIMAL_ODD_RANGE[0] <= m['odd_count']) & (m['odd_count'] <= self.OPTIMAL_ODD_RANGE[1]) &
+                (m['ending_diversity'] >= self.MIN_ENDING_DIVERSITY))
+
+    def validate_batch(self, combos: np.ndarray, metrics: Dict[str, np.ndarray] = None) -> np.ndarray:
+        """
+        다수 조합 일괄 검증 (validate + score 의 배열 버전)
+
+        Args:
+            combos: (K, 6) 번호 배열 (uint8 등 정수형, 정렬 여부 무관)
+        Returns:
+            BATCH_DTYPE 구조화 배열 (K,) - 모든 지표, 위반 비트마스크, 유효 여부, 품질 점수
+        """
+        m = metrics if metrics is not None else self.batch_metrics(combos)
+        out = np.empty(len(m['sum']), dtype=self.BATCH_DTYPE)
+        for name in ('sum', 'ac', 'consecutive_pairs', 'odd_count', 'high_count',
+                     'ending_diversity', 'sections_covered'):
+            out[name] = m[name]
+        out['violations'] = self.violation_mask(None, m)
+        out['is_valid'] = out['violations'] == 0
+        out['score'] = self.score_batch(None, m)
+        return out
+
+    def score_batch(self, combos: np.ndarray, metrics: Dict[str, np.ndarray] = None) -> np.ndarray:
+        """다수 조합의 품질 점수 (score 와 동일한 부동소수 연산 순서로 계산)"""
+        m = metrics if metrics is not None else self.batch_metrics(combos)
+        ac, total, odds = m['ac'], m['sum'], m['odd_count']
+
+        score = np.zeros(len(ac), dtype=np.float64)
+        score += np.where((self.OPTIMAL_AC_RANGE[0] <= ac) & (ac <= self.OPTIMAL_AC_RANGE[1]), 0.3,
+                          np.where((6 <= ac) & (ac <= 10), 0.2, 0.1))
+        score += np.where((self.OPTIMAL_SUM_RANGE[0] <= total) & (total <= self.OPTIMAL_SUM_RANGE[1]), 0.25,
+                          np.where((90 <= total) & (total <= 185), 0.15, 0.05))
+        score += np.where((2 <= odds) & (odds <= 4), 0.2,
+                          np.where((1 <= odds) & (odds <= 5), 0.1, 0.0))
+        score += np.minimum(m['ending_diversity'] / 6, 1) * 0.15
+        score += (m['sections_covered'] / 5) * 0.1
+        return score
+
+
+def top_n_indices(scores: np.ndarray, n: int) -> np.ndarray:
+    """
+    점수 내림차순 상위 n 개 인덱스 (argpartition, 동점은 인덱스 오름차순)
+    안정 정렬 후 앞에서 n 개를 자른 것과 같은 결과
+    """
+    scores = np.asarray(scores)
+    if n >= len(scores):
+        return np.lexsort((np.arange(len(scores)), -scores))
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    kth = np.partition(scores, len(scores) - n)[len(scores) - n]   # n 번째로 큰 값
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:n - len(above)]
+    idx = np.concatenate([above, ties])
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+
 class CombinationOptimizer:
     """최적 조합 생성기"""
     
@@ -173,32 +400,24 @@ class CombinationOptimizer:
         self._analyze_historical_patterns()
     
     def _analyze_historical_patterns(self):
-        """과거 당첨 조합 패턴 분석"""
-        ac_values = []
-        sums = []
-        odd_counts = []
-        consecutive_counts = []
-        
-        for row in self.numbers_matrix:
-            row_list = list(row)
-            ac_values.append(self.validator.calculate_ac(row_list))
-            sums.append(sum(row_list))
-            odd_counts.append(self.validator.count_odd_numbers(row_list))
-            consecutive_counts.append(self.validator.count_consecutive_pairs(row_list))
+        """과거 당첨 조합 패턴 분석 (전체 이력을 한 번의 배치 계산으로)"""
+        history = np.asarray(self.numbers_matrix, dtype=np.int64).reshape(-1, 6)
+        m = self.validator.batch_metrics(history)
         
         self.historical_patterns = {
-            'ac_mean': np.mean(ac_values),
-            'ac_std': np.std(ac_values),
-            'sum_mean': np.mean(sums),
-            'sum_std': np.std(sums),
-            'odd_mean': np.mean(odd_counts),
-            'consecutive_mean': np.mean(consecutive_counts)
+            'ac_mean': np.mean(m['ac']),
+            'ac_std': np.std(m['ac']),
+            'sum_mean': np.mean(m['sum']),
+            'sum_std': np.std(m['sum']),
+            'odd_mean': np.mean(m['odd_count']),
+            'consecutive_mean': np.mean(m['consecutive_pairs'])
         }
     
     def find_optimal_combinations(self, 
                                    candidates: List[int], 
                                    n_numbers: int = 6,
-                                   n_results: int = 10) -> List[Tuple[List[int], float]]:
+                                   n_results: int = 10,
+                                   full_search: bool = False) -> List[Tuple[List[int], float]]:
         """
         후보 번호에서 최적 조합 찾기
         
@@ -206,6 +425,7 @@ class CombinationOptimizer:
             candidates: 후보 번호 리스트
             n_numbers: 선택할 번호 수
             n_results: 반환할 조합 수
+            full_search: True 이면 상위 15개 제한 없이 전체 후보에서 정확 탐색
             
         Returns:
             [(조합, 점수), ...] - 점수 높은 순
@@ -213,53 +433,127 @@ class CombinationOptimizer:
         if len(candidates) < n_numbers:
             return [(candidates + list(range(1, n_numbers - len(candidates) + 1)), 0.0)]
         
-        # 모든 조합 생성 및 점수 계산
-        results = []
+        if full_search:
+            from src.ticket_search import TicketSearch, VALIDATOR_WEIGHTS
+            search = TicketSearch([(n, 0.0) for n in candidates],
+                                  *self.validator.OPTIMAL_SUM_RANGE,
+                                  validator=self.validator, weights=VALIDATOR_WEIGHTS,
+                                  n_numbers=n_numbers)
+            return search.top_k(n_results)
         
         # 후보가 너무 많으면 상위 15개로 제한
-        search_space = candidates[:min(15, len(candidates))]
-        
-        for combo in combinations(search_space, n_numbers):
-            combo_list = list(combo)
-            score = self.validator.score(combo_list)
-            results.append((combo_list, score))
+        search_space = np.asarray(candidates[:min(15, len(candidates))], dtype=np.int64)
         
-        # 점수 순 정렬
-        results.sort(key=lambda x: x[1], reverse=True)
+        # 모든 조합을 배열로 생성하여 한 번에 점수 계산 (itertools.combinations 순서)
+        flat = np.fromiter((i for combo in combinations(range(len(search_space)), n_numbers) for i in combo),
+                           dtype=np.int64)
+        combos = search_space[flat.reshape(-1, n_numbers)]
+        scores = self.validator.score_batch(combos)
         
-        return results[:n_results]
+        # 점수 순 상위 n_results (동점은 조합 생성 순서, 전체 정렬과 같은 결과)
+        top = top_n_indices(scores, n_results)
+        return [([int(n) for n in combos[i]], float(scores[i])) for i in top]
+    
+    # 교체 이웃 인덱스 템플릿 캐시 {(조합 크기, 교체 수): (위치 배열, 값 인덱스 배열)}
+    _NEIGHBOUR_TEMPLATES = {}
+    
+    # 유효 조합이 항상 무효 조합보다 앞서도록 더하는 가산점 (나머지 항목 합의 최댓값은 1)
+    VALID_BONUS = 2.0
+    
+    @classmethod
+    def _neighbour_template(cls, n: int, swaps: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        정확히 swaps 개 번호를 교체하는 이웃 템플릿
+        Returns:
+            positions (M, swaps), value_idx (M, swaps) - 조합 밖 번호 목록(오름차순)의 인덱스
+        """
+        key = (n, swaps)
+        if key not in cls._NEIGHBOUR_TEMPLATES:
+            pos = np.array(list(combinations(range(n), swaps)), dtype=np.intp)
+            vals = np.array(list(combinations(range(45 - n), swaps)), dtype=np.intp)
+            # 교체할 위치 조합 x 새 번호 조합 (새 번호 집합이 같으면 배치 순서는 무관)
+            cls._NEIGHBOUR_TEMPLATES[key] = (np.repeat(pos, len(vals), axis=0),
+                                             np.tile(vals, (len(pos), 1)))
+        return cls._NEIGHBOUR_TEMPLATES[key]
+    
+    def _neighbours(self, current: np.ndarray, swaps: int) -> np.ndarray:
+        """현재 조합에서 번호 swaps 개를 교체한 이웃 전체 (M, n)"""
+        positions, value_idx = self._neighbour_template(len(current), swaps)
+        outside = np.setdiff1d(np.arange(1, 46), current)
+        combos = np.tile(current, (len(positions), 1))
+        rows = np.arange(len(positions))
+        for k in range(swaps):
+            combos[rows, positions[:, k]] = outside[value_idx[:, k]]
+        return combos
+    
+    def _objective(self, combos: np.ndarray, number_scores: Optional[np.ndarray],
+                   score_weight: float) -> np.ndarray:
+        """유효 가산점 + (1-w) * 검증 점수 + w * 평균 번호 점수 (0~1 정규화)"""
+        result = self.validator.validate_batch(combos)
+        objective = np.where(result['is_valid'], self.VALID_BONUS, 0.0)
+        if number_scores is None:
+            return objective + result['score']
+        return (objective + (1 - score_weight) * result['score'] +
+                score_weight * number_scores[combos].mean(axis=1))
     
     def optimize_combination(self, 
                             initial_combo: List[int],
-                            all_scores: Dict[int, float]) -> List[int]:
+                            all_scores: Dict[int, float] = None,
+                            score_weight: float = 0.3,
+                            max_swaps: int = 2,
+                            max_iter: int = 20,
+                            time_limit: Optional[float] = None) -> List[int]:
         """
-        초기 조합을 최적화 (제약 조건 만족하도록)
+        초기 조합을 국소 탐색으로 개선 (제약 조건 만족 우선)
+        
+        매 반복마다 번호 1개 교체 이웃 전체를 배열로 만들어 한 번에 평가하고 가장 좋은 이웃으로 이동,
+        개선이 없으면 2개 교체 이웃(최대 max_swaps 개)으로 넓혀서 평가
+        모든 이웃에서 개선이 없거나(국소 최적) max_iter / time_limit(초) 에 도달하면 종료
+        
+        Args:
+            initial_combo: 초기 조합
+            all_scores: {번호: 점수} 앙상블 번호 점수 (None 이면 검증 점수만 사용)
+            score_weight: 목적함수에서 번호 점수 비중
+            max_swaps: 한 번에 교체할 최대 번호 수 (1 또는 2)
+        Returns:
+            정렬된 최적화 조합
         """
-        current = list(initial_combo)
-        is_valid, _ = self.validator.validate(current)
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        number_scores = None
+        if all_scores:
+            number_scores = np.array([all_scores.get(n, 0.0) for n in range(46)], dtype=np.float64)
+            top = number_scores.max()
+            number_scores = number_scores / top if top > 0 else np.zeros(46)
         
-        if is_valid:
-            return sorted(current)
+        current = np.array(sorted(int(n) for n in initial_combo), dtype=np.int64)
+        current_value = self._objective(current[None, :], number_scores, score_weight)[0]
         
-        # 유효하지 않으면 개선 시도
-        best_combo = current
-        best_score = self.validator.score(current)
+        # 목적함수 상한 (도달하면 더 넓은 이웃을 평가할 필요 없음)
+        if number_scores is None:
+            upper = self.VALID_BONUS + 1.0
+        else:
+            best_numbers = np.sort(number_scores[1:])[-len(current):].mean()
+            upper = self.VALID_BONUS + (1 - score_weight) + score_weight * best_numbers
         
-        # 각 번호를 교체해보며 최적화
-        for i in range(6):
-            for replacement in range(1, 46):
-                if replacement in current:
-                    continue
-                
-                test_combo = current.copy()
-                test_combo[i] = replacement
-                
-                score = self.validator.score(test_combo)
-                if score > best_score:
-                    best_score = score
-                    best_combo = test_combo.copy()
+        for _ in range(max_iter):
+            if current_value >= upper - 1e-12:
+                break
+            improved = False
+            for swaps in range(1, max_swaps + 1):
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                neighbours = self._neighbours(current, swaps)
+                values = self._objective(neighbours, number_scores, score_weight)
+                best = int(np.argmax(values))
+                if values[best] > current_value + 1e-12:
+                    current = np.sort(neighbours[best])
+                    current_value = values[best]
+                    improved = True
+                    break
+            if not improved:
+                break
         
-        return sorted(best_combo)
+        return [int(n) for n in current]
 
 
 # 테스트
@@ -0,0 +1,192 @@
+"""
+배열 기반 랜덤 포레스트 추론기
+학습된 sklearn 포레스트를 연속된 NumPy 배열로 평탄화하여
+sklearn 없이 여러 피처 행을 한 번에 벡터화 추론
+
+지원 모델:
+    - MultiOutputClassifier(RandomForestClassifier)  : 출력별 포레스트 (트리당 출력 1개)
+    - RandomForestClassifier (다중 출력 직접 학습)      : 트리당 출력 n_outputs 개
+"""
+
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+
+class CompiledForest:
+    """평탄화된 트리 배열 + 벡터화 배치 추론"""
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray,
+                 left: np.ndarray, right: np.ndarray, leaf_index: np.ndarray,
+                 leaf_values: np.ndarray, roots: np.ndarray,
+                 output_weights: np.ndarray, constant_outputs: np.ndarray,
+                 max_depth: int, n_features: int):
+        self.feature = feature                  # (n_nodes,) int16/int32, 리프는 0
+        self.threshold = threshold              # (n_nodes,) float64 (sklearn 과 동일 비교)
+        self.left = left                        # (n_nodes,) int32 전역 노드 인덱스, 리프는 자기 자신
+        self.right = right                      # (n_nodes,) int32
+        self.leaf_index = leaf_index            # (n_nodes,) int32 -> leaf_values 행 (내부 노드 -1)
+        self.leaf_values = leaf_values          # (n_leaves, k) float32 양성 클래스 확률
+        self.roots = roots                      # (n_trees,) int32
+        self.output_weights = output_weights    # (n_trees, n_outputs) float32 (k == 1 일 때 트리 -> 출력 평균)
+        self.constant_outputs = constant_outputs  # (n_outputs,) float32, NaN 이 아니면 고정값 (단일 클래스)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+
+    # ------------------------------------------------------------------ #
+    # 변환
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _positive_column(classes) -> int:
+        """양성(1) 클래스 열 인덱스 (없으면 -1)"""
+        classes = list(np.asarray(classes).ravel())
+        return classes.index(1) if 1 in classes else (1 if len(classes) > 1 else -1)
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'CompiledForest':
+        """학습된 sklearn 모델을 배열 표현으로 변환 (sklearn import 불필요)"""
+        if hasattr(model, 'estimators_') and hasattr(model.estimators_[0], 'estimators_'):
+            # MultiOutputClassifier: 출력 o 마다 포레스트 1개
+            forests = model.estimators_
+            n_outputs = len(forests)
+            trees, tree_output, pos_cols = [], [], []
+            constant = np.full(n_outputs, np.nan, dtype=np.float32)
+            for o, forest in enumerate(forests):
+                if len(forest.classes_) < 2:
+                    constant[o] = 0.5
+                col = cls._positive_column(forest.classes_)
+                for est in forest.estimators_:
+                    trees.append(est.tree_)
+                    tree_output.append(o)
+                    pos_cols.append([col])
+            n_features = forests[0].n_features_in_
+        else:
+            # 단일 다중 출력 포레스트
+            classes = model.classes_ if isinstance(model.classes_, list) else [model.classes_]
+            n_outputs = len(classes)
+            constant = np.array([0.5 if len(c) < 2 else np.nan for c in classes], dtype=np.float32)
+            cols = [cls._positive_column(c) for c in classes]
+            trees = [est.tree_ for est in model.estimators_]
+            tree_output = None
+            pos_cols = [cols] * len(trees)
+            n_features = model.n_features_in_
+
+        k = 1 if tree_output is not None else n_outputs
+        features, thresholds, lefts, rights, leaf_idx, leaf_vals, roots = [], [], [], [], [], [], []
+        offset, leaf_offset, max_depth = 0, 0, 0
+        for tree, cols in zip(trees, pos_cols):
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n)
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+
+            # 리프의 양성 클래스 확률 (sklearn 과 동일하게 노드별 정규화)
+            value = tree.value[is_leaf]                       # (n_leaf, n_outputs_tree, n_classes)
+            totals = value.sum(axis=2)
+            totals[totals == 0] = 1.0
+            pos = np.zeros((value.shape[0], k), dtype=np.float32)
+            for j, col in enumerate(cols):
+                if col >= 0:
+                    pos[:, j] = value[:, j, col] / totals[:, j]
+            li = np.full(n, -1, dtype=np.int32)
+            li[is_leaf] = np.arange(is_leaf.sum()) + leaf_offset
+            leaf_idx.append(li)
+            leaf_vals.append(pos)
+
+            roots.append(offset)
+            offset += n
+            leaf_offset += int(is_leaf.sum())
+            max_depth = max(max_depth, int(tree.max_depth))
+
+        n_trees = len(trees)
+        if tree_output is not None:
+            counts = np.bincount(tree_output, minlength=n_outputs).astype(np.float32)
+            output_weights = np.zeros((n_trees, n_outputs), dtype=np.float32)
+            output_weights[np.arange(n_trees), tree_output] = 1.0 / counts[tree_output]
+        else:
+            output_weights = np.zeros((0, n_outputs), dtype=np.float32)
+
+        feature_dtype = np.int16 if n_features < np.iinfo(np.int16).max else np.int32
+        return cls(
+            feature=np.concatenate(features).astype(feature_dtype),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            leaf_index=np.concatenate(leaf_idx),
+            leaf_values=np.concatenate(leaf_vals),
+            roots=np.array(roots, dtype=np.int32),
+            output_weights=output_weights,
+            constant_outputs=constant,
+            max_depth=max_depth,
+            n_features=n_features,
+        )
+
+    # ------------------------------------------------------------------ #
+    # 추론
+    # ------------------------------------------------------------------ #
+    @property
+    def n_outputs(self) -> int:
+        return len(self.constant_outputs)
+
+    def predict_positive(self, X: np.ndarray) -> np.ndarray:
+        """
+        피처 행 배치의 출력별 양성 클래스 확률
+
+        Args:
+            X: (n_rows, n_features) 피처 행렬
+        Returns:
+            (n_rows, n_outputs) float32 확률 (RandomForest predict_proba 평균과 동일)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        rows = np.arange(len(X))[:, None]
+
+        # 모든 (행, 트리) 쌍을 동시에 한 단계씩 내려감 (리프는 자기 자신으로 고정)
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        leaf_vals = self.leaf_values[self.leaf_index[node]]   # (n_rows, n_trees, k)
+        if self.leaf_values.shape[1] == 1:
+            proba = leaf_vals[:, :, 0] @ self.output_weights
+        else:
+            proba = leaf_vals.mean(axis=1)
+
+        fixed = ~np.isnan(self.constant_outputs)
+        if fixed.any():
+            proba[:, fixed] = self.constant_outputs[fixed]
+        return proba.astype(np.float32, copy=False)
+
+    # ------------------------------------------------------------------ #
+    # 저장 / 로드 (np.savez, pickle 없이 로드 가능)
+    # ------------------------------------------------------------------ #
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'feature': self.feature, 'threshold': self.threshold,
+            'left': self.left, 'right': self.right,
+            'leaf_index': self.leaf_index, 'leaf_values': self.leaf_values,
+            'roots': self.roots, 'output_weights': self.output_weights,
+            'constant_outputs': self.constant_outputs,
+            'meta': np.array([self.max_depth, self.n_features], dtype=np.int64),
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(a.nbytes for a in self.to_arrays().values()))
+
+    def save(self, path: Path):
+        np.savez(path, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path: Path) -> 'CompiledForest':
+        with np.load(path) as data:
+            arrays = {k: data[k] for k in data.files}
+        max_depth, n_features = arrays.pop('meta')
+        return cls(max_depth=max_depth, n_features=n_features, **arrays)
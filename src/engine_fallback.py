@@ -0,0 +1,164 @@
+"""
+엔진 대체 점수 저장소 (Engine Fallback Store)
+엔진별 가장 최근에 계산된 점수 벡터/예측 번호와 동적 부스트를 영구 기록하여,
+시간 예산 안에 계산을 끝내지 못한 엔진이 직전 결과로 대신 참여할 수 있게 함
+
+- 서비스 경로(시간 예산 작업 완료 / EnsemblePredictor.record_fallback)에서만 기록
+  (백테스트 등 과거 구간 예측기는 기록하지 않으므로 마지막 기록이 서비스 중인 이력의 결과)
+- 엔진 모듈 소스가 바뀌면 해당 엔진 기록은 사용하지 않음
+- 기록 시점 이력의 지문을 함께 저장하여, 현재 이력의 앞부분과 같은 이력에서 계산된 기록만 사용
+  (다른 데이터 파일/수정된 과거 회차로 계산된 기록은 회차 수와 관계없이 무시)
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.utils.atomic_io import file_lock, atomic_write_bytes
+from src.utils.fingerprint import matrix_fingerprint
+
+
+DEFAULT_FALLBACK_PATH = Path(__file__).parent.parent / "data" / "engine_fallback.json"
+
+
+class EngineFallbackStore:
+    """영구 저장되는 엔진별 최근 점수 벡터"""
+
+    FORMAT_VERSION = 2
+    _shared = {}
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path) if path else DEFAULT_FALLBACK_PATH
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self._data = None
+        self._mtime = None
+
+    @classmethod
+    def shared(cls, path: Path = None) -> 'EngineFallbackStore':
+        """프로세스 내 공유 인스턴스 (경로별)"""
+        key = str(path or DEFAULT_FALLBACK_PATH)
+        if key not in cls._shared:
+            cls._shared[key] = cls(path)
+        return cls._shared[key]
+
+    # ------------------------------------------------------------------ #
+    # 저장 / 로드
+    # ------------------------------------------------------------------ #
+    def _empty(self) -> Dict:
+        return {'format': self.FORMAT_VERSION, 'engines': {}, 'boosts': {}}
+
+    def _read_file(self) -> Dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') == self.FORMAT_VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return self._empty()
+
+    def _load(self) -> Dict:
+        """파일이 바뀐 경우에만 다시 읽음"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+        if self._data is None or mtime != self._mtime:
+            self._data = self._read_file()
+            self._mtime = mtime
+        return self._data
+
+    def _save(self, update):
+        """다른 프로세스의 기록과 병합하여 원자적으로 저장 (실패 시 메모리에만 반영)"""
+        try:
+            with file_lock(self.lock_path):
+                data = self._read_file()
+                update(data)
+                atomic_write_bytes(self.path, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+                self._data = data
+                self._mtime = os.stat(self.path).st_mtime
+        except OSError:
+            update(self._load())
+
+    @staticmethod
+    def _same_history(entry: Optional[Dict], numbers_matrix: np.ndarray) -> bool:
+        """기록이 현재 이력의 앞부분(n_draws 회차)과 같은 이력에서 계산되었는지"""
+        if not entry or entry.get('n_draws', -1) > len(numbers_matrix):
+            return False
+        return entry.get('data') == matrix_fingerprint(numbers_matrix[:entry['n_draws']])
+
+    # ------------------------------------------------------------------ #
+    # 조회 / 갱신
+    # ------------------------------------------------------------------ #
+    def get(self, name: str, version: str, numbers_matrix: np.ndarray) -> Optional[Dict]:
+        """
+        엔진의 최근 결과 {'scores': {번호: 점수}, 'predictions': [...], 'n_draws': int}
+        (기록이 없거나 엔진 코드가 바뀌었거나 현재 이력과 다른 이력의 기록이면 None)
+        """
+        entry = self._load()['engines'].get(name)
+        if entry is None or entry.get('version') != version or not self._same_history(entry, numbers_matrix):
+            return None
+        return {
+            'scores': {i + 1: float(v) for i, v in enumerate(entry['scores'])},
+            'predictions': [int(n) for n in entry['predictions']],
+            'n_draws': int(entry['n_draws']),
+        }
+
+    def _superseded(self, entry: Optional[Dict], version: str, numbers_matrix: np.ndarray) -> bool:
+        """새 기록으로 덮어써야 하는지 (같은 엔진 코드로 같은 이력에서 계산된 기록이 이미 있으면 False)"""
+        return not (entry and entry.get('version') == version
+                    and entry.get('n_draws') == len(numbers_matrix)
+                    and self._same_history(entry, numbers_matrix))
+
+    def record(self, results: Dict[str, Dict], versions: Dict[str, str], numbers_matrix: np.ndarray):
+        """
+        엔진 결과 기록 (같은 엔진 코드/이력의 기록이 이미 있으면 무시)
+
+        Args:
+            results: {엔진: {'scores': {번호: 점수}, 'predictions': [...]}}
+            numbers_matrix: 결과를 계산한 당첨번호 이력
+        """
+        current = self._load()['engines']
+        fresh = {name: r for name, r in results.items()
+                 if self._superseded(current.get(name), versions[name], numbers_matrix)}
+        if not fresh:
+            return
+        n_draws = len(numbers_matrix)
+        fingerprint = matrix_fingerprint(numbers_matrix)
+
+        def update(data: Dict):
+            for name, r in fresh.items():
+                if not self._superseded(data['engines'].get(name), versions[name], numbers_matrix):
+                    continue
+                data['engines'][name] = {
+                    'version': versions[name],
+                    'n_draws': int(n_draws),
+                    'data': fingerprint,
+                    'scores': [float(r['scores'].get(i, 0.0)) for i in range(1, 46)],
+                    'predictions': [int(n) for n in r['predictions']],
+                    'updated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                }
+        self._save(update)
+
+    def get_boosts(self, numbers_matrix: np.ndarray) -> Dict[str, float]:
+        """현재 이력과 같은 이력에서 계산된 최근 동적 부스트 (없으면 빈 dict)"""
+        boosts = self._load()['boosts']
+        if not self._same_history(boosts, numbers_matrix):
+            return {}
+        return {k: float(v) for k, v in boosts.get('values', {}).items()}
+
+    def record_boosts(self, boosts: Dict[str, float], numbers_matrix: np.ndarray):
+        n_draws = len(numbers_matrix)
+        fingerprint = matrix_fingerprint(numbers_matrix)
+        current = self._load()['boosts']
+        if current.get('n_draws') == n_draws and current.get('data') == fingerprint:
+            return
+
+        def update(data: Dict):
+            data['boosts'] = {'n_draws': int(n_draws), 'data': fingerprint,
+                              'values': {k: float(v) for k, v in boosts.items()}}
+        self._save(update)
@@ -2,12 +2,13 @@
 XGBoost 기계학습 예측 엔진 (간소화 버전)
 """
 
+import json
 import numpy as np
+from pathlib import Path
 from typing import Dict, List, Tuple
-from collections import Counter
+from collections import Counter, OrderedDict
 from .base import BaseEngine
-import os
-import pickle
+from src.compiled_forest import CompiledForest
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -15,70 +16,117 @@ warnings.filterwarnings('ignore')
 class MLEngine(BaseEngine):
     """ML 기반 예측 엔진 (XGBoost 대체용 GradientBoosting)"""
     
-    _model_cache = {} # 백테스팅 속도 최적화를 위한 전역 모델 캐시
-    _meta_cache = {}
-    _meta_cache_file = "data/ml_meta_features.pkl"
-    _meta_cache_loaded = False
+    _model_cache = OrderedDict() # 백테스팅 속도 최적화를 위한 전역 모델 캐시 (LRU)
+    _model_store = None
+    _meta_store = None
+    
+    # 모델 하이퍼파라미터 기본값 (값이 바뀌면 저장소 키도 바뀌어 재학습)
+    # data/ml_params.json (tune_ml.py 결과)이 있으면 그 값이 기본값이 됨
+    LOOKBACK = 10
+    N_ESTIMATORS = 50
+    MAX_DEPTH = 8
+    RANDOM_STATE = 42
+    RETRAIN_INTERVAL = 50
+    N_JOBS = -1  # 포레스트 학습 병렬도 (프로세스 풀 워커에서는 1 권장)
+    MEMORY_CACHE_SIZE = 4
+    PARAMS_FILE = Path(__file__).parent.parent.parent / "data" / "ml_params.json"
+    TUNABLE_PARAMS = ('lookback', 'n_estimators', 'max_depth', 'retrain_interval', 'mode')
+    _default_params = None
+    
+    # 학습 후 트리를 배열로 평탄화하여 sklearn 없이 벡터화 추론
+    COMPILED_INFERENCE = True
+    
+    # 모델 구성 방식
+    #   'multioutput': 번호별 RandomForest 45개 (MultiOutputClassifier, 기존 방식)
+    #   'native'     : 다중 출력을 직접 지원하는 단일 RandomForest (predict_proba 1회)
+    #   'warm_start' : native + 재학습 구간마다 직전 모델에 트리만 추가
+    MODEL_MODE = 'multioutput'
+    MODEL_MODES = ('multioutput', 'native', 'warm_start')
+    WARM_START_TREES = 10    # 재학습 구간당 추가 트리 수
+    WARM_START_MAX_TREES = 150  # 초과 시 처음부터 재학습
+    
+    # 피처 정의가 바뀌면 올려서 캐시를 새로 생성
+    FEATURE_VERSION = 1
+    META_FEATURE_VERSION = 1
+    N_META_FEATURES = 45 * 5
+    
+    @staticmethod
+    def _meta_engines():
+        """메타 피처 소스 엔진 모듈 (모듈 소스 해시가 저장소 키가 됨)"""
+        from . import fourier, advanced_pattern, statistical, lstm, poisson
+        return [
+            (fourier, fourier.FourierEngine),
+            (advanced_pattern, advanced_pattern.AdvancedPatternEngine),
+            (statistical, statistical.StatisticalEngine),
+            (lstm, lstm.LSTMEngine),
+            (poisson, poisson.PoissonEngine),
+        ]
     
     @classmethod
-    def _load_meta_cache(cls):
-        if not cls._meta_cache_loaded:
-            if os.path.exists(cls._meta_cache_file):
-                try:
-                    with open(cls._meta_cache_file, 'rb') as f:
-                        cls._meta_cache = pickle.load(f)
-                except Exception:
-                    pass
-            cls._meta_cache_loaded = True
-
-    @classmethod
-    def _save_meta_cache(cls):
-        try:
-            os.makedirs(os.path.dirname(cls._meta_cache_file), exist_ok=True)
-            with open(cls._meta_cache_file, 'wb') as f:
-                pickle.dump(cls._meta_cache, f)
-        except Exception:
-            pass
+    def _get_meta_store(cls):
+        if cls._meta_store is None:
+            from src.meta_feature_store import MetaFeatureStore
+            from src.utils.fingerprint import module_fingerprint
+            versions = {module.__name__: module_fingerprint(module) for module, _ in cls._meta_engines()}
+            versions['meta_feature_version'] = str(cls.META_FEATURE_VERSION)
+            cls._meta_store = MetaFeatureStore(versions, cls.N_META_FEATURES)
+        return cls._meta_store
 
     @classmethod
-    def _get_meta_features(cls, idx: int, matrix: np.ndarray) -> np.ndarray:
-        if idx in cls._meta_cache:
-            return cls._meta_cache[idx]
-            
+    def _compute_meta_features(cls, idx: int, matrix: np.ndarray) -> np.ndarray:
+        """idx 회차 직전까지의 데이터로 5개 주요 엔진의 점수를 계산"""
         subset = matrix[:idx]
         if len(subset) < 10:
-            return np.zeros(45 * 5, dtype=np.float32)
-            
-        from .fourier import FourierEngine
-        from .advanced_pattern import AdvancedPatternEngine
-        from .statistical import StatisticalEngine
-        from .lstm import LSTMEngine
-        from .poisson import PoissonEngine
-        
-        engines = [
-            FourierEngine(subset),
-            AdvancedPatternEngine(subset),
-            StatisticalEngine(subset),
-            LSTMEngine(subset),
-            PoissonEngine(subset)
-        ]
+            return np.zeros(cls.N_META_FEATURES, dtype=np.float32)
         
         meta_f = []
-        for eng in engines:
+        for _, engine_class in cls._meta_engines():
             try:
-                scores = eng.get_scores()
+                scores = engine_class(subset).get_scores()
                 meta_f.extend([scores.get(num, 0.0) for num in range(1, 46)])
             except Exception:
                 meta_f.extend([0.0] * 45)
                 
-        meta_arr = np.array(meta_f, dtype=np.float32)
-        cls._meta_cache[idx] = meta_arr
-        return meta_arr
+        return np.array(meta_f, dtype=np.float32)
+
+    @classmethod
+    def _load_meta_features(cls, matrix: np.ndarray, upto: int) -> np.ndarray:
+        """행 0..upto 메타 피처 (저장소에 없으면 단일 스윕으로 일괄 계산 후 기록)"""
+        return cls._get_meta_store().ensure(matrix, upto, cls._compute_meta_features)
 
-    def __init__(self, numbers_matrix: np.ndarray, lookback: int = 10):
+    @classmethod
+    def default_params(cls) -> Dict:
+        """하이퍼파라미터 기본값 (튜닝 결과 파일이 있으면 반영, 프로세스당 1회 로드)"""
+        if cls._default_params is None:
+            params = {
+                'lookback': cls.LOOKBACK,
+                'n_estimators': cls.N_ESTIMATORS,
+                'max_depth': cls.MAX_DEPTH,
+                'retrain_interval': cls.RETRAIN_INTERVAL,
+                'mode': cls.MODEL_MODE,
+            }
+            try:
+                with open(cls.PARAMS_FILE, 'r', encoding='utf-8') as f:
+                    tuned = json.load(f).get('params', {})
+                params.update({k: v for k, v in tuned.items() if k in cls.TUNABLE_PARAMS})
+            except (OSError, ValueError):
+                pass
+            cls._default_params = params
+        return dict(cls._default_params)
+
+    def __init__(self, numbers_matrix: np.ndarray, lookback: int = None, mode: str = None,
+                 n_estimators: int = None, max_depth: int = None, retrain_interval: int = None):
         super().__init__(numbers_matrix)
-        self.lookback = lookback
+        defaults = self.default_params()
+        self.lookback = lookback or defaults['lookback']
+        self.n_estimators = n_estimators or defaults['n_estimators']
+        self.max_depth = max_depth or defaults['max_depth']
+        self.retrain_interval = retrain_interval or defaults['retrain_interval']
+        self.mode = mode or defaults['mode']
+        if self.mode not in self.MODEL_MODES:
+            raise ValueError(f"지원하지 않는 모델 방식: {self.mode} (지원: {self.MODEL_MODES})")
         self.model = None
+        self._meta = None
         
     def _extract_features(self, idx: int) -> np.ndarray:
         if idx < self.lookback: return None
@@ -97,50 +145,152 @@ class MLEngine(BaseEngine):
         features.append(np.mean([sum(1 for n in row if n % 2 == 1) for row in recent]))
         
         # Meta-Features 추출 (다른 5개 주요 엔진들의 예측 점수)
-        meta_features = self.__class__._get_meta_features(idx, self.numbers_matrix)
+        if self._meta is None or len(self._meta) <= idx:
+            self._meta = self.__class__._load_meta_features(self.numbers_matrix, self.n_draws)
+        meta_features = self._meta[idx]
         
         return np.concatenate([np.array(features, dtype=np.float32), meta_features])
     
+    def _model_key(self, bucket: int, artifact: str = 'sklearn') -> str:
+        """모델 저장소 키: (재학습 구간, 학습 데이터 지문, 하이퍼파라미터, 피처 버전, 산출물 종류)"""
+        from src.model_store import ModelStore
+        from src.utils.fingerprint import matrix_fingerprint
+        return ModelStore.make_key({
+            'bucket': bucket,
+            'data': matrix_fingerprint(self.numbers_matrix[:bucket]),
+            'lookback': self.lookback,
+            'n_estimators': self.n_estimators,
+            'max_depth': self.max_depth,
+            'random_state': self.RANDOM_STATE,
+            'mode': self.mode,
+            'feature_version': self.FEATURE_VERSION,
+            'meta_store': self.__class__._get_meta_store().key,
+            'artifact': artifact,
+        })
+
+    @classmethod
+    def _get_model_store(cls):
+        if cls._model_store is None:
+            from src.model_store import ModelStore
+            cls._model_store = ModelStore()
+        return cls._model_store
+
+    @classmethod
+    def _remember_model(cls, key: str, model):
+        """프로세스 내 LRU 캐시에 모델 보관"""
+        cls._model_cache[key] = model
+        cls._model_cache.move_to_end(key)
+        while len(cls._model_cache) > cls.MEMORY_CACHE_SIZE:
+            cls._model_cache.popitem(last=False)
+
+    @classmethod
+    def _lookup_model(cls, key: str):
+        """프로세스 내 캐시 -> 디스크 저장소 순으로 모델 조회"""
+        if key in cls._model_cache:
+            cls._model_cache.move_to_end(key)
+            return cls._model_cache[key]
+        model = cls._get_model_store().load(key)
+        if model is not None:
+            cls._remember_model(key, model)
+        return model
+
+    def _training_set(self, end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """회차 lookback..end-1 의 (피처, 당첨 여부) 학습 데이터"""
+        if self._meta is None or len(self._meta) <= self.n_draws:
+            self._meta = self.__class__._load_meta_features(self.numbers_matrix, self.n_draws)
+        
+        X, y = [], []
+        binary = np.zeros((end, 45), dtype=np.float32)
+        for i, row in enumerate(self.numbers_matrix[:end]):
+            for num in row: binary[i, num - 1] = 1.0
+        for i in range(self.lookback, end):
+            f = self._extract_features(i)
+            if f is not None: X.append(f); y.append(binary[i])
+        return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+
+    def _fit_model(self, X: np.ndarray, y: np.ndarray, base_model=None):
+        """모델 방식에 따라 학습 (warm_start 는 base_model 에 트리 추가)"""
+        from sklearn.ensemble import RandomForestClassifier
+        
+        if self.mode == 'multioutput':
+            from sklearn.multioutput import MultiOutputClassifier
+            # GradientBoosting보다 훨씬 빠르고 병렬 처리가 잘 되는 RandomForest 사용
+            # 메타 피처가 늘어났으므로 capacity 증대 (n_estimators=50, max_depth=8)
+            model = MultiOutputClassifier(RandomForestClassifier(n_estimators=self.n_estimators, max_depth=self.max_depth, random_state=self.RANDOM_STATE, n_jobs=1), n_jobs=self.N_JOBS)
+            model.fit(X, y)
+            return model
+        
+        if (self.mode == 'warm_start' and base_model is not None
+                and base_model.n_estimators + self.WARM_START_TREES <= self.WARM_START_MAX_TREES):
+            import copy
+            model = copy.deepcopy(base_model)
+            model.set_params(n_estimators=base_model.n_estimators + self.WARM_START_TREES, warm_start=True)
+            model.fit(X, y)
+            return model
+        
+        # 단일 포레스트가 45개 출력을 직접 학습 (트리 분할 기준이 전체 출력을 함께 고려)
+        model = RandomForestClassifier(n_estimators=self.n_estimators, max_depth=self.max_depth, random_state=self.RANDOM_STATE, n_jobs=self.N_JOBS, warm_start=(self.mode == 'warm_start'))
+        model.fit(X, y)
+        return model
+
     def train(self, n_estimators: int = 30) -> bool:
         # 백테스팅 시 매 회차 재학습하는 오버헤드 방지 (50회차 단위 모델 재사용)
-        # Lookahead Bias(미래 참조 오류)가 없도록 현재 데이터 수 이하의 키만 사용
-        cache_key = (self.n_draws // 50) * 50
-        if cache_key in self.__class__._model_cache:
-            self.model = self.__class__._model_cache[cache_key]
+        # Lookahead Bias(미래 참조 오류)가 없도록 구간 시작 회차 이전 데이터로만 학습하고,
+        # 학습 데이터 지문을 키로 사용하여 프로세스 간 (디스크) 재사용
+        bucket = (self.n_draws // self.retrain_interval) * self.retrain_interval
+        if bucket - self.lookback < 100:
+            return False
+        cache_key = self._model_key(bucket)
+        compiled_key = self._model_key(bucket, 'compiled')
+        
+        # 배열 기반 추론기가 저장되어 있으면 sklearn 없이 바로 사용
+        cls = self.__class__
+        if self.COMPILED_INFERENCE:
+            self.model = cls._lookup_model(compiled_key)
+            if self.model is not None:
+                return True
+        
+        self.model = cls._lookup_model(cache_key)
+        if self.model is not None:
+            if self.COMPILED_INFERENCE:
+                self.model = self._compile(compiled_key, self.model)
             return True
             
         try:
-            from sklearn.multioutput import MultiOutputClassifier
-            from sklearn.ensemble import RandomForestClassifier
-            self.__class__._load_meta_cache()
-            initial_cache_size = len(self.__class__._meta_cache)
-            
-            X, y = [], []
-            binary = np.zeros((self.n_draws, 45), dtype=np.float32)
-            for i, row in enumerate(self.numbers_matrix):
-                for num in row: binary[i, num - 1] = 1.0
-            for i in range(self.lookback, self.n_draws):
-                f = self._extract_features(i)
-                if f is not None: X.append(f); y.append(binary[i])
+            X, y = self._training_set(bucket)
             if len(X) < 100: return False
             
-            if len(self.__class__._meta_cache) > initial_cache_size:
-                self.__class__._save_meta_cache()
+            # warm_start: 직전 구간 모델이 저장소에 있으면 새 회차를 반영한 트리만 추가
+            base_model = None
+            if self.mode == 'warm_start' and bucket - self.retrain_interval - self.lookback >= 100:
+                base_model = cls._lookup_model(self._model_key(bucket - self.retrain_interval))
             
-            # GradientBoosting보다 훨씬 빠르고 병렬 처리가 잘 되는 RandomForest 사용
-            # 메타 피처가 늘어났으므로 capacity 증대 (n_estimators=50, max_depth=8)
-            self.model = MultiOutputClassifier(RandomForestClassifier(n_estimators=50, max_depth=8, random_state=42, n_jobs=1), n_jobs=-1)
-            self.model.fit(X, y)
+            self.model = self._fit_model(X, y, base_model)
             
-            # 모델 캐싱 및 메모리 관리
-            self.__class__._model_cache[cache_key] = self.model
-            old_keys = [k for k in self.__class__._model_cache.keys() if k < cache_key - 100]
-            for k in old_keys:
-                del self.__class__._model_cache[k]
+            # 모델 캐싱 (프로세스 내 LRU + 디스크 저장소)
+            cls._remember_model(cache_key, self.model)
+            cls._get_model_store().save(cache_key, self.model)
+            if self.COMPILED_INFERENCE:
+                self.model = self._compile(compiled_key, self.model)
                 
             return True
         except ImportError: return False
     
+    @classmethod
+    def _compile(cls, compiled_key: str, model) -> CompiledForest:
+        """sklearn 모델 -> 배열 기반 추론기 변환 후 캐싱 (sklearn 모델은 warm_start 용으로 별도 보관)"""
+        compiled = CompiledForest.from_sklearn(model)
+        cls._remember_model(compiled_key, compiled)
+        cls._get_model_store().save(compiled_key, compiled)
+        return compiled
+    
+    def _predict_positive(self, X: np.ndarray) -> np.ndarray:
+        """(n, 피처) -> (n, 45) 번호별 당첨 확률"""
+        if isinstance(self.model, CompiledForest):
+            return self.model.predict_positive(X)
+        proba = self.model.predict_proba(X)
+        return np.stack([p[:, 1] if p.shape[1] > 1 else np.full(len(X), 0.5) for p in proba], axis=1)
+    
     def get_scores(self) -> Dict[int, float]:
         if self.model is None and not self.train(20):
             recent = self.numbers_matrix[-50:].flatten()
@@ -148,8 +298,8 @@ class MLEngine(BaseEngine):
             return {i: freq.get(i, 0)/50 for i in range(1, 46)}
         
         f = self._extract_features(self.n_draws).reshape(1, -1)
-        proba = self.model.predict_proba(f)
-        scores = {i+1: float(p[0][1] if len(p[0]) > 1 else 0.5) for i, p in enumerate(proba)}
+        proba = self._predict_positive(f)[0]
+        scores = {i+1: float(p) for i, p in enumerate(proba)}
         max_s = max(scores.values()) or 1
         return {k: v / max_s for k, v in scores.items()}
     
@@ -3,10 +3,50 @@
 9개 분석 엔진 + ML 모델 + 조합 검증 + 동적 가중치 최적화
 """
 
+import sys
+import threading
+import time
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-from collections import Counter
+from typing import Dict, List, Mapping, Tuple, Optional
 from itertools import combinations
+from pathlib import Path
+
+from src.utils.bitmask import combination_masks
+
+
+class _LazyEngines(Mapping):
+    """엔진 id -> 인스턴스 매핑 (처음 접근할 때 생성/학습, 목록 조회는 생성 없이)"""
+    
+    def __init__(self, predictor: 'EnsemblePredictor'):
+        self._predictor = predictor
+        self._loaded = {}
+    
+    def _ids(self) -> List[str]:
+        p = self._predictor
+        return [name for name in p._resolve(p._available()) if name not in p._excluded]
+    
+    def __getitem__(self, name: str):
+        if name not in self._loaded:
+            p = self._predictor
+            if name not in p._engine_classes or name in p._failed or name in p._excluded:
+                raise KeyError(name)
+            instance = p._create_engine(name)
+            if instance is None:
+                raise KeyError(name)
+            self._loaded[name] = instance
+        return self._loaded[name]
+    
+    def __contains__(self, name) -> bool:
+        p = self._predictor
+        if name not in p._available() or name in p._excluded:
+            return False
+        return bool(p._resolve([name]))
+    
+    def __iter__(self):
+        return iter(self._ids())
+    
+    def __len__(self) -> int:
+        return len(self._ids())
 
 
 class EnsemblePredictor:
@@ -28,44 +68,90 @@ class EnsemblePredictor:
         'poisson': 0.0010,
     }
     
+    # 앙상블 결합 시 투표 점수 비율 (가중 평균 점수는 1 - VOTE_WEIGHT, train_1000.py --optimizer gradient 로 학습 가능)
+    VOTE_WEIGHT = 0.35
+    
+    # 학습된 가중치 프로파일 (train_1000.py 결과)
+    TRAINED_WEIGHTS_PATH = Path(__file__).resolve().parent.parent / "trained_weights_1000.json"
+    
     # 엔진 클래스 캐시 (로드 1회만 수행)
     _ENGINE_CLASSES_CACHE = {}
     
+    # 조합 인덱스 배열 캐시 {(후보 수, 선택 수): (K, 선택 수)}
+    _COMBINATION_INDEX_CACHE = {}
+    
+    # 시간 예산 모드: 엔진 계산 공유 프로세스 풀과 진행 중/완료 작업 {(종류, 엔진, 데이터 지문): Future}
+    # (예산을 넘긴 작업도 백그라운드에서 끝까지 수행되어 다음 호출과 대체 점수 저장소에 반영,
+    #  스레드가 아닌 프로세스를 사용하여 남은 작업이 본 요청의 조합 탐색과 GIL 을 다투지 않음)
+    _BUDGET_EXECUTOR = None
+    _BUDGET_WORKERS = None
+    _BUDGET_JOBS = {}
+    _BUDGET_LOCK = threading.Lock()
+    # 시간 예산 중 앙상블 결합/조합 탐색/리포트용으로 남겨두는 비율
+    BUDGET_RESERVE = 0.2
+    
     def __init__(self, numbers_matrix: np.ndarray, 
                  weights: Dict[str, float] = None,
                  use_ml: bool = True,
                  use_validator: bool = True,
-                 use_dynamic_weight: bool = True): # 동적 가중치 옵션 추가
+                 use_dynamic_weight: bool = True, # 동적 가중치 옵션 추가
+                 boost_lookback: int = 10,
+                 boost_decay: float = 1.0,
+                 full_search: bool = False,
+                 profiler=None,
+                 time_budget: float = None,
+                 vote_weight: float = None):
         self.numbers_matrix = numbers_matrix
         self.use_ml = use_ml
         self.use_validator = use_validator
         self.use_dynamic_weight = use_dynamic_weight
+        self.boost_lookback = boost_lookback  # 동적 부스트 평가 회차 수
+        self.boost_decay = boost_decay        # 오래된 회차 감쇠율 (1.0 = 단순 합계)
+        self.full_search = full_search        # 조합 최적화를 45개 번호 전체에서 정확 탐색
+        self.time_budget = time_budget        # 생성 시간 예산 (초, None = 제한 없음)
+        self.vote_weight = self.VOTE_WEIGHT if vote_weight is None else vote_weight
+        start = time.perf_counter()
+        
+        # 구간별 계측 (미지정 시 비활성 - 오버헤드 없음)
+        from src.utils.profiler import NULL_PROFILER
+        self.profiler = profiler or NULL_PROFILER
+        
+        # 엔진 인스턴스/학습, 동적 부스트, 가중치, 조합 최적화기 이력 분석은 처음 필요할 때 수행
+        # (핫/콜드 요약처럼 엔진 하나만 쓰는 경로는 해당 엔진만 생성)
+        self._engine_classes = {name: engine_class
+                                for name, engine_class in self._discover_engine_classes().items()
+                                if self.use_ml or name != 'ml'}  # ML 엔진 제외 처리 (use_ml=False일 때)
+        self._engines = _LazyEngines(self)
+        self._failed = set()        # 생성/학습에 실패한 엔진
+        self._excluded = set()      # 시간 예산 초과로 이번 예측에서 생성하지 않는 엔진
+        self._dynamic_boosts = None
+        self._weights = None
+        self._optimizer = None
         
-        self.engines = {}
         self.engine_scores = {}
         self.engine_predictions = {}
-        self.dynamic_boosts = {} # 엔진별 성능 가중치 부스트
+        self._matrix_cache = None  # (엔진 점수, 엔진 예측, {엔진: (점수 행, 예측 번호 표시 행)})
+        self._analysis_cache = {}  # 가중치와 무관한 분석 결과
+        self.fallback_engines = {}  # 엔진 계산 대신 외부 결과 (작업 프로세스/저장소/최근 저장 점수) 를 사용하는 엔진
+        self.degraded = {}          # 예산 초과 구간 {엔진 또는 'dynamic_boosts': 'cached' | 'dropped' | 'neutral'}
+        self._budget_keys = []      # 시간 예산 모드에서 제출한 작업 key (_BUDGET_JOBS)
         self.validator = None
-        self.optimizer = None
-        
-        # 엔진 동적 로드
-        self._load_engines()
         
-        # 가중치 설정 (로드된 엔진 기준)
+        # 가중치 설정 (로드된 엔진 기준, 가중치 0 인 엔진은 생성/계산하지 않음)
         self.base_weights = weights or self.DEFAULT_WEIGHTS.copy()
         
-        if self.use_dynamic_weight:
-            self._calculate_dynamic_boosts()
-            
-        self._normalize_weights()
+        if time_budget is not None:
+            # 예산 안에 끝난 엔진만 사용하고 나머지는 최근 점수로 대체하거나 제외
+            self._load_engines_within_budget(start + time_budget * (1 - self.BUDGET_RESERVE))
         
         self._analyze_sum_stats()
         self._initialize_validator()
         
-    def _load_engines(self):
-        """src.engines 패키지에서 엔진들을 동적으로 로드 (캐싱 적용)"""
+    @classmethod
+    def _discover_engine_classes(cls) -> Dict[str, type]:
+        """src.engines 패키지의 엔진 클래스 {엔진 id: 클래스} (1회만 탐색)"""
         # 이미 로드된 클래스가 있다면 캐시에서 사용
-        if not self._ENGINE_CLASSES_CACHE:
+        if not cls._ENGINE_CLASSES_CACHE:
             import importlib
             import pkgutil
             import src.engines as engines_pkg
@@ -81,61 +167,112 @@ class EnsemblePredictor:
                         obj = getattr(module, name)
                         if isinstance(obj, type) and issubclass(obj, BaseEngine) and obj is not BaseEngine:
                             engine_id = obj.__name__.replace('Engine', '').lower()
-                            self._ENGINE_CLASSES_CACHE[engine_id] = obj
+                            cls._ENGINE_CLASSES_CACHE[engine_id] = obj
                 except Exception as e:
                     print(f"⚠️ 엔진 모듈 로드 실패 ({module_name}): {e}")
-
-        # 캐시된 클래스로 인스턴스 생성
-        for engine_id, engine_class in self._ENGINE_CLASSES_CACHE.items():
-            # ML 엔진 제외 처리 (use_ml=False일 때)
-            if not self.use_ml and engine_id == 'ml':
-                continue
-                
-            try:
+        return cls._ENGINE_CLASSES_CACHE
+    
+    # 학습에 실패하면 빠지는 엔진 (엔진 목록을 확정할 때 먼저 학습)
+    TRAINED_ENGINES = ('ml',)
+    
+    def _create_engine(self, engine_id: str):
+        """엔진 1개 생성 (ML 엔진은 학습까지, 실패 시 None)"""
+        engine_class = self._engine_classes[engine_id]
+        try:
+            with self.profiler.phase('construct', engine_id):
                 instance = engine_class(self.numbers_matrix)
-                # ML 엔진은 추가 학습 필요
-                if engine_id == 'ml':
-                    if not instance.train():
-                        continue
-                        
-                self.engines[engine_id] = instance
-            except Exception as e:
-                print(f"⚠️ 엔진 {engine_id} 초기화 실패: {e}")
+            # ML 엔진은 추가 학습 필요
+            if engine_id == 'ml':
+                with self.profiler.phase('train', engine_id):
+                    trained = instance.train()
+                if not trained:
+                    instance = None
+        except Exception as e:
+            print(f"⚠️ 엔진 {engine_id} 초기화 실패: {e}")
+            instance = None
+        if instance is None:
+            self._failed.add(engine_id)
+            self._weights = None  # 남은 엔진 기준으로 다시 정규화
+        return instance
+    
+    def _available(self, base_weights: Dict[str, float] = None,
+                   include_zero: bool = False) -> List[str]:
+        """
+        가중치를 받을 수 있는 엔진 (엔진 순서, 실패/예산 제외 엔진 제외, 대체 점수 엔진 포함)
+        include_zero 가 아니면 기본 가중치가 0 인 엔진은 제외 (모두 0 이면 전체)
+        """
+        base = self.base_weights if base_weights is None else base_weights
+        names = [name for name in self._engine_classes
+                 if name not in self._failed and (name not in self._excluded or name in self.fallback_engines)]
+        if not include_zero:
+            names = [name for name in names if base.get(name, 0.05) != 0] or names
+        return names
+    
+    def _resolve(self, names: List[str]) -> List[str]:
+        """학습 실패 가능 엔진을 먼저 생성해 보고 실패한 엔진을 뺀 목록 (저장 점수 사용 엔진은 생략)"""
+        for name in names:
+            if name in self.TRAINED_ENGINES and name not in self._excluded and name not in self.fallback_engines:
+                self._engines.get(name)
+        return [name for name in names if name not in self._failed]
+    
+    @property
+    def engines(self) -> Mapping:
+        """엔진 id -> 엔진 인스턴스 (처음 접근할 때 생성, 가중치 0 인 엔진 제외)"""
+        return self._engines
+    
+    @property
+    def dynamic_boosts(self) -> Dict[str, float]:
+        """엔진별 성능 가중치 부스트 (처음 필요할 때 계산)"""
+        if self._dynamic_boosts is None:
+            self._dynamic_boosts = {}
+            if self.use_dynamic_weight:
+                with self.profiler.phase('dynamic_boosts'):
+                    self._calculate_dynamic_boosts()
+        return self._dynamic_boosts
+    
+    @dynamic_boosts.setter
+    def dynamic_boosts(self, value: Dict[str, float]):
+        self._dynamic_boosts = value
+    
+    @property
+    def weights(self) -> Dict[str, float]:
+        """동적 부스트 반영 정규화 가중치 (처음 필요할 때 계산)"""
+        if self._weights is None:
+            self._normalize_weights()
+        return self._weights
+    
+    @weights.setter
+    def weights(self, value: Dict[str, float]):
+        self._weights = value
+    
+    @property
+    def optimizer(self):
+        """조합 최적화기 (이력 패턴 분석은 처음 사용할 때 수행)"""
+        if self._optimizer is None and self.validator is not None:
+            from src.combination_validator import CombinationOptimizer
+            self._optimizer = CombinationOptimizer(self.numbers_matrix)
+        return self._optimizer
 
     def _calculate_dynamic_boosts(self):
-        """최근 10회차 엔진별 성능을 기반으로 가중치 부스트 계산 (메타 러닝)"""
-        lookback = 10
+        """최근 회차 엔진별 성능을 기반으로 가중치 부스트 계산 (메타 러닝)"""
+        # 가중치와 무관하게 사용 가능한 전체 엔진 기준 (가중치 0 인 엔진도 성능 비교에 포함)
+        names = self._resolve(self._available(include_zero=True))
+        lookback = self.boost_lookback
         if len(self.numbers_matrix) < lookback + 50:
-            self.dynamic_boosts = {k: 1.0 for k in self.engines}
+            self.dynamic_boosts = {k: 1.0 for k in names}
             return
 
-        performance = {k: 0.0 for k in self.engines}
-        
-        # 최근 lookback 회차 동안 각 엔진의 적중 내역 확인
-        for i in range(1, lookback + 1):
-            idx = -i
-            train_matrix = self.numbers_matrix[:idx]
-            actual = set(self.numbers_matrix[idx])
-            
-            for name, engine_class in self.engines.items():
-                try:
-                    # 임시 엔진 생성 (현재 idx까지의 데이터로)
-                    # ML 엔진은 너무 느리므로 성능 최적화를 위해 일부 엔진만 정밀 검증하거나
-                    # 기존 예측 데이터를 캐싱하는 방식이 좋으나, 여기선 단순화
-                    if name == 'ml' or name == 'lstm':
-                        # 무거운 엔진은 계산 건너뛰거나 기본값 유지
-                        continue
-                        
-                    temp_engine = self.engines[name].__class__(train_matrix)
-                    pred = set(temp_engine.predict())
-                    hits = len(pred & actual)
-                    performance[name] += hits
-                except:
-                    continue
-        
-        # 부스트 계산 (평균 적중수 기반, 최소 0.8 ~ 최대 1.3)
+        # 성능 원장에서 엔진별 적중 내역 조회 (새 회차분만 계산, ML/LSTM 포함 전 엔진 동일 취급)
+        engine_classes = {name: self._engine_classes[name] for name in names}
+        performance = self._run_performance(self.numbers_matrix, engine_classes,
+                                            lookback, self.boost_decay)
+        self._apply_boosts(performance, names)
+    
+    def _apply_boosts(self, performance: Dict[str, float], names: List[str]):
+        """부스트 계산 (평균 적중수 기반, 최소 0.8 ~ 최대 1.3)"""
+        performance = {name: performance[name] for name in names}
         max_perf = max(performance.values()) if any(performance.values()) else 1
-        for name in self.engines:
+        for name in names:
             if max_perf > 0:
                 # 성능이 좋을수록 부스트 (최대 30% 증가)
                 boost = 1.0 + (performance[name] / max_perf) * 0.3
@@ -143,181 +280,589 @@ class EnsemblePredictor:
                 boost = 1.0
             self.dynamic_boosts[name] = boost
 
+    # ------------------------------------------------------------------ #
+    # 시간 예산 (anytime) 모드
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _run_engine(engine_id: str, engine_class: type, numbers_matrix: np.ndarray):
+        """
+        엔진 1개 생성/학습/점수/예측 (작업 프로세스에서 실행, ML 학습 불가 시 None)
+        Returns:
+            (점수, 예측 번호) - 엔진 인스턴스(ML 모델, 메타 피처 배열)는 돌려보내지 않음
+        """
+        instance = engine_class(numbers_matrix)
+        if engine_id == 'ml' and not instance.train():
+            return None
+        try:
+            scores = instance.get_scores()
+        except Exception:
+            scores = {i: 0.5 for i in range(1, 46)}
+        try:
+            predictions = instance.predict()
+        except Exception:
+            predictions = []
+        return scores, predictions
+    
+    @staticmethod
+    def _run_performance(numbers_matrix: np.ndarray, engine_classes: Dict[str, type],
+                         lookback: int, decay: float) -> Dict[str, float]:
+        """동적 부스트용 엔진 성능 (작업 프로세스에서 실행)"""
+        from src.performance_ledger import PerformanceLedger
+        return PerformanceLedger.shared().performance(numbers_matrix, engine_classes, lookback, decay)
+    
+    @classmethod
+    def _new_budget_executor(cls):
+        """
+        시간 예산 작업 프로세스 풀 생성 (작업 프로세스 수 = 엔진 수 + 1, CPU 수 이내)
+        스레드를 쓰는 서버(Flask)에서 fork 하면 다른 스레드가 잡고 있던 잠금까지 복제되므로
+        forkserver (미지원 플랫폼은 spawn) 로 작업 프로세스를 시작
+        """
+        import multiprocessing
+        import os
+        from concurrent.futures import ProcessPoolExecutor
+        if cls._BUDGET_WORKERS is None:
+            cls._BUDGET_WORKERS = max(1, min(len(cls._ENGINE_CLASSES_CACHE) + 1, os.cpu_count() or 1))
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        return ProcessPoolExecutor(max_workers=cls._BUDGET_WORKERS,
+                                   mp_context=multiprocessing.get_context(method))
+    
+    @classmethod
+    def _submit(cls, key: Tuple, fn, *args, on_done=None):
+        """공유 프로세스 풀에 작업 제출 (같은 key 의 작업이 있으면 재사용)"""
+        from concurrent.futures.process import BrokenProcessPool
+        with cls._BUDGET_LOCK:
+            if cls._BUDGET_EXECUTOR is None:
+                cls._BUDGET_EXECUTOR = cls._new_budget_executor()
+            if key not in cls._BUDGET_JOBS:
+                # 다른 데이터의 끝난 작업은 정리
+                fingerprint = key[-1]
+                for old in [k for k, f in cls._BUDGET_JOBS.items() if k[-1] != fingerprint and f.done()]:
+                    del cls._BUDGET_JOBS[old]
+                try:
+                    future = cls._BUDGET_EXECUTOR.submit(fn, *args)
+                except BrokenProcessPool:
+                    # 작업 프로세스가 비정상 종료된 풀은 새로 생성
+                    cls._BUDGET_EXECUTOR = cls._new_budget_executor()
+                    cls._BUDGET_JOBS.clear()
+                    future = cls._BUDGET_EXECUTOR.submit(fn, *args)
+                if on_done is not None:
+                    future.add_done_callback(on_done)
+                cls._BUDGET_JOBS[key] = future
+            return cls._BUDGET_JOBS[key]
+    
+    @staticmethod
+    def _engine_version(engine_class: type) -> str:
+        from src.utils.fingerprint import module_fingerprint
+        return module_fingerprint(sys.modules[engine_class.__module__])
+    
+    @classmethod
+    def _record_fallback(cls, results: Dict[str, Tuple[Dict, List]], engine_classes: Dict[str, type],
+                         numbers_matrix: np.ndarray):
+        """엔진 결과를 대체 점수 저장소에 기록 (저장 실패는 무시)"""
+        from src.engine_fallback import EngineFallbackStore
+        try:
+            EngineFallbackStore.shared().record(
+                {name: {'scores': scores, 'predictions': predictions}
+                 for name, (scores, predictions) in results.items()},
+                {name: cls._engine_version(engine_classes[name]) for name in results},
+                numbers_matrix)
+        except Exception as e:
+            print(f"⚠️ 엔진 대체 점수 저장 실패: {e}")
+    
+    def _load_engines_within_budget(self, deadline: float):
+        """
+        엔진 계산과 동적 부스트를 병렬로 시작하고 deadline 까지 끝난 결과만 사용
+        끝나지 않은 엔진은 최근 저장된 점수 벡터로 대체 (없으면 제외 -> 가중치 재정규화)
+        쓸 수 있는 엔진이 하나도 없으면 (첫 실행) 기다리지 않고 균등 점수로 응답하고
+        조합은 검증기 규칙만으로 고름 (degraded['budget'] = 'neutral', _neutral_sets)
+        
+        끝난 엔진은 작업 프로세스의 점수/예측만 사용하고, 엔진 인스턴스는 핫/콜드 분석 등에서
+        직접 필요할 때만 현재 프로세스에서 생성
+        """
+        from concurrent.futures import wait
+        from src.engine_fallback import EngineFallbackStore
+        from src.utils.fingerprint import matrix_fingerprint
+        
+        classes = {name: self._engine_classes[name] for name in self._available()}
+        fingerprint = matrix_fingerprint(self.numbers_matrix)
+        n_draws = len(self.numbers_matrix)
+        
+        def record_late(name):
+            def callback(future):
+                if not future.cancelled() and future.exception() is None and future.result() is not None:
+                    scores, predictions = future.result()
+                    self._record_fallback({name: (scores, predictions)}, classes, self.numbers_matrix)
+            return callback
+        
+        # 작업 프로세스가 적을 때 학습이 필요한 엔진이 먼저 자리를 차지하지 않도록
+        # 가벼운 엔진 -> 학습 엔진 -> 동적 부스트 순으로 제출
+        order = sorted(classes, key=lambda name: name in self.TRAINED_ENGINES)
+        futures = {name: self._submit(('engine', name, fingerprint), self._run_engine,
+                                      name, classes[name], self.numbers_matrix,
+                                      on_done=record_late(name))
+                   for name in order}
+        boost_future = None
+        if self.use_dynamic_weight and n_draws >= self.boost_lookback + 50:
+            boost_future = self._submit(('boosts', self.boost_lookback, self.boost_decay, fingerprint),
+                                        self._run_performance, self.numbers_matrix, classes,
+                                        self.boost_lookback, self.boost_decay)
+        pending = list(futures.values()) + ([boost_future] if boost_future else [])
+        with self._BUDGET_LOCK:
+            self._budget_keys = [key for key, future in self._BUDGET_JOBS.items() if future in pending]
+        with self.profiler.phase('budget_wait'):
+            wait(pending, timeout=max(0.0, deadline - time.perf_counter()))
+        
+        store = EngineFallbackStore.shared()
+        versions = {name: self._engine_version(engine_class) for name, engine_class in classes.items()}
+        if not any(f.done() for f in futures.values()) and \
+                not any(store.get(name, versions[name], self.numbers_matrix) for name in classes):
+            # 쓸 수 있는 엔진이 하나도 없으면 예산을 지키고 균등 점수로 응답 (엔진은 백그라운드에서 계속)
+            self.degraded['budget'] = 'neutral'
+
+        for name, future in futures.items():
+            if future.done():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"⚠️ 엔진 {name} 초기화 실패: {e}")
+                    result = None
+                if result is None:
+                    self._failed.add(name)
+                    continue
+                scores, predictions = result
+                self.fallback_engines[name] = {'scores': scores, 'predictions': predictions}
+                self.engine_scores[name] = scores
+                self.engine_predictions[name] = predictions
+                continue
+            self._excluded.add(name)
+            cached = store.get(name, versions[name], self.numbers_matrix)
+            if cached is None:
+                self.degraded[name] = 'dropped'
+                continue
+            self.fallback_engines[name] = cached
+            self.engine_scores[name] = cached['scores']
+            self.engine_predictions[name] = cached['predictions']
+            self.degraded[name] = 'cached'
+        
+        names = self._weighted_engines()
+        if not self.use_dynamic_weight:
+            return
+        self.dynamic_boosts = {}
+        if boost_future is None:
+            self.dynamic_boosts = {k: 1.0 for k in names}
+        elif boost_future.done() and boost_future.exception() is None:
+            self._apply_boosts(boost_future.result(), names)
+            store.record_boosts(self.dynamic_boosts, self.numbers_matrix)
+        else:
+            cached = store.get_boosts(self.numbers_matrix)
+            self.dynamic_boosts = {k: cached.get(k, 1.0) for k in names}
+            self.degraded['dynamic_boosts'] = 'cached' if cached else 'neutral'
+    
+    def load_stored(self, store) -> bool:
+        """
+        점수 텐서 저장소(ScoreTensorStore)에 현재 이력 시점의 엔진 결과가 있으면 엔진 학습/계산 대신 사용
+        (엔진 인스턴스는 핫/콜드 분석 등에서 직접 필요할 때만 생성,
+         동적 부스트는 저장 시와 엔진 구성/부스트 설정이 같을 때만 사용)
+        
+        Returns:
+            저장된 결과 사용 여부
+        """
+        if not store.matches(self.numbers_matrix):
+            return False
+        row = store.row(len(self.numbers_matrix))
+        if row is None:
+            return False
+        for name in self._engine_classes:
+            if name in row['engines']:
+                self.fallback_engines[name] = row['engines'][name]
+            elif name in row['failed']:
+                self._failed.add(name)
+        if (self.use_dynamic_weight and set(self._engine_classes) == set(store.engine_names) and
+                (self.boost_lookback, self.boost_decay) == store.BOOST_PARAMS):
+            self.dynamic_boosts = dict(row['boosts'])
+        self._weights = None
+        return True
+    
+    def _weighted_engines(self, base_weights: Dict[str, float] = None) -> List[str]:
+        """가중치를 받는 엔진 (로드 가능한 엔진 + 최근 점수로 대체된 엔진, 가중치 0 제외)"""
+        return self._resolve(self._available(base_weights))
+    
     def _normalize_weights(self):
         """현재 로드된 엔진들과 동적 부스트를 반영하여 가중치 정규화"""
+        self.weights = self._profile_weights(self.base_weights)
+    
+    def _profile_weights(self, base_weights: Dict[str, float]) -> Dict[str, float]:
+        """기본 가중치 -> 로드된 엔진 기준 동적 부스트 반영 정규화 가중치"""
         temp_weights = {}
-        for k in self.engines:
-            base = self.base_weights.get(k, 0.05)
+        engines = self._weighted_engines(base_weights)
+        for k in engines:
+            base = base_weights.get(k, 0.05)
             boost = self.dynamic_boosts.get(k, 1.0)
             temp_weights[k] = base * boost
             
         total = sum(temp_weights.values())
         if total > 0:
-            self.weights = {k: v/total for k, v in temp_weights.items()}
-        else:
-            w = 1.0 / len(self.engines) if self.engines else 1.0
-            self.weights = {k: w for k in self.engines}
+            return {k: v/total for k, v in temp_weights.items()}
+        w = 1.0 / len(engines) if engines else 1.0
+        return {k: w for k in engines}
 
     def _analyze_sum_stats(self):
         """합계 통계 분석"""
-        sums = [sum(row) for row in self.numbers_matrix]
-        self.mean_sum = np.mean(sums) if sums else 138
-        self.std_sum = np.std(sums) if sums else 20
+        sums = np.asarray(self.numbers_matrix, dtype=np.int64).reshape(-1, 6).sum(axis=1)
+        self.mean_sum = np.mean(sums) if len(sums) else 138
+        self.std_sum = np.std(sums) if len(sums) else 20
         self.min_optimal_sum = self.mean_sum - self.std_sum
         self.max_optimal_sum = self.mean_sum + self.std_sum
         
     def _initialize_validator(self):
-        """조합 검증기 초기화"""
+        """조합 검증기 초기화 (조합 최적화기는 optimizer 속성에서 지연 생성)"""
         if self.use_validator:
             try:
-                from src.combination_validator import CombinationValidator, CombinationOptimizer
+                from src.combination_validator import CombinationValidator
                 self.validator = CombinationValidator()
-                self.optimizer = CombinationOptimizer(self.numbers_matrix)
             except Exception as e:
                 print(f"⚠️ 조합 검증기 초기화 실패: {e}")
                 self.use_validator = False
     
+    def _score_engine(self, name: str):
+        """엔진 1개 점수 계산 (대체 점수 엔진은 저장된 점수, 생성 실패 시 생략)"""
+        if name in self.fallback_engines:
+            self.engine_scores[name] = self.fallback_engines[name]['scores']
+            return
+        engine = self.engines.get(name)
+        if engine is None:
+            return
+        try:
+            with self.profiler.phase('get_scores', name):
+                self.engine_scores[name] = engine.get_scores()
+        except Exception as e:
+            self.engine_scores[name] = {i: 0.5 for i in range(1, 46)}
+    
+    def _predict_engine(self, name: str):
+        """엔진 1개 예측 (대체 점수 엔진은 저장된 예측, 생성 실패 시 생략)"""
+        if name in self.fallback_engines:
+            self.engine_predictions[name] = self.fallback_engines[name]['predictions']
+            return
+        engine = self.engines.get(name)
+        if engine is None:
+            return
+        try:
+            with self.profiler.phase('predict', name):
+                self.engine_predictions[name] = engine.predict()
+        except Exception as e:
+            self.engine_predictions[name] = []
+    
     def calculate_all_scores(self) -> Dict[str, Dict[int, float]]:
         """모든 엔진의 점수 계산"""
         self.engine_scores = {}
-        
-        for name, engine in self.engines.items():
-            try:
-                self.engine_scores[name] = engine.get_scores()
-            except Exception as e:
-                self.engine_scores[name] = {i: 0.5 for i in range(1, 46)}
-                
+        for name in self._weighted_engines():
+            self._score_engine(name)
         return self.engine_scores
     
     def get_all_predictions(self) -> Dict[str, List[int]]:
         """모든 엔진의 예측 결과"""
         self.engine_predictions = {}
-        
-        for name, engine in self.engines.items():
-            try:
-                self.engine_predictions[name] = engine.predict()
-            except Exception as e:
-                self.engine_predictions[name] = []
-                
+        for name in self._weighted_engines():
+            self._predict_engine(name)
         return self.engine_predictions
     
-    def get_ensemble_scores(self) -> Dict[int, float]:
-        """가중 평균 앙상블 점수 + 투표 기반 부스트"""
+    def _engine_rows(self, names: List[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        names 중 결과가 있는 엔진과 점수 행렬 (엔진 수, 45), 예측 번호 표시 행렬 (엔진 수, 45)
+        엔진 점수/예측이 다시 계산되기 전까지 엔진별 행을 캐시하여 가중치 변경 시 재사용
+        """
         if not self.engine_scores:
             self.calculate_all_scores()
         if not self.engine_predictions:
             self.get_all_predictions()
-            
-        ensemble = {i: 0.0 for i in range(1, 46)}
-        
-        # 1. 가중 평균 점수 (65%)
-        total_weight = sum(self.weights.get(name, 0) for name in self.engines.keys())
-        for name, scores in self.engine_scores.items():
-            weight = self.weights.get(name, 0) / total_weight if total_weight > 0 else 0
-            for num, score in scores.items():
-                ensemble[num] += score * weight * 0.65
-        
-        # 2. 투표 기반 점수 (35%)
-        vote_counts = Counter()
-        for predictions in self.engine_predictions.values():
-            for num in predictions:
-                vote_counts[num] += 1
-        
-        max_votes = max(vote_counts.values()) if vote_counts.values() else 1
-        for num in range(1, 46):
-            vote_score = vote_counts.get(num, 0) / max_votes
-            ensemble[num] += vote_score * 0.35
+        for name in names:
+            # 가중치 변경으로 새로 필요해진 엔진만 계산
+            if name not in self.engine_scores:
+                self._score_engine(name)
+            if name not in self.engine_predictions and name in self.engine_scores:
+                self._predict_engine(name)
+        
+        cache = self._matrix_cache
+        if cache is None or cache[0] is not self.engine_scores or cache[1] is not self.engine_predictions:
+            cache = self._matrix_cache = (self.engine_scores, self.engine_predictions, {})
+        rows = cache[2]
+        
+        present = [name for name in names if name in self.engine_scores]
+        for name in present:
+            if name in rows:
+                continue
+            score_row = np.zeros(45, dtype=np.float64)
+            for num, score in self.engine_scores[name].items():
+                score_row[int(num) - 1] += score
+            vote_row = np.zeros(45, dtype=np.int64)
+            np.add.at(vote_row, np.asarray(self.engine_predictions.get(name, []), dtype=np.int64) - 1, 1)
+            rows[name] = (score_row, vote_row)
+        
+        matrix = np.array([rows[name][0] for name in present]).reshape(-1, 45)
+        votes = np.array([rows[name][1] for name in present], dtype=np.int64).reshape(-1, 45)
+        return present, matrix, votes
+    
+    def _blend(self, weight_matrix: np.ndarray, matrix: np.ndarray,
+               votes: np.ndarray) -> np.ndarray:
+        """
+        가중치 행렬 (프로파일 수, 엔진 수) -> 정규화된 앙상블 점수 (프로파일 수, 45)
+        엔진 순서대로 누적하여 프로파일 하나를 dict 로 계산할 때와 같은 값을 보장
+        (투표는 프로파일별로 가중치가 0 보다 큰 엔진의 예측 번호만 집계)
+        """
+        weight_matrix = np.atleast_2d(np.asarray(weight_matrix, dtype=np.float64))
+        n_profiles, n_engines = weight_matrix.shape
+        totals = np.zeros((n_profiles, 1))
+        for row in range(n_engines):
+            totals[:, 0] += weight_matrix[:, row]
+        scale = np.divide(weight_matrix, totals, out=np.zeros_like(weight_matrix), where=totals > 0)
+        
+        # 1. 가중 평균 점수 (기본 65%)
+        ensemble = np.zeros((n_profiles, 45))
+        for row in range(n_engines):
+            ensemble += matrix[row] * scale[:, row:row + 1] * (1 - self.vote_weight)
+        
+        # 2. 투표 기반 점수 (기본 35%)
+        vote_counts = (weight_matrix > 0).astype(np.int64) @ votes
+        max_votes = vote_counts.max(axis=1, keepdims=True) if n_engines else np.ones((n_profiles, 1))
+        max_votes[max_votes == 0] = 1
+        ensemble += vote_counts / max_votes * self.vote_weight
         
         # 정규화
-        max_score = max(ensemble.values()) if ensemble.values() else 1
-        if max_score > 0:
-            ensemble = {k: v / max_score for k, v in ensemble.items()}
-            
-        return ensemble
+        max_score = ensemble.max(axis=1, keepdims=True)
+        return np.divide(ensemble, max_score, out=ensemble.copy(), where=max_score > 0)
+    
+    def get_ensemble_scores(self) -> Dict[int, float]:
+        """가중 평균 앙상블 점수 + 투표 기반 부스트"""
+        names, matrix, votes = self._engine_rows(self._weighted_engines())
+        weights = [self.weights.get(name, 0) for name in names]
+        with self.profiler.phase('ensemble_blend'):
+            ensemble = self._blend(np.array([weights]).reshape(1, -1), matrix, votes)[0]
+        return {num: float(ensemble[num - 1]) for num in range(1, 46)}
     
+    def get_profile_scores(self, profiles: Dict[str, object]) -> Dict[str, Dict[int, float]]:
+        """
+        여러 가중치 프로파일의 앙상블 점수를 한 번에 계산
+        엔진 점수/예측은 1회만 계산하고 (프로파일 수, 엔진 수) 가중치 행렬과
+        (엔진 수, 45) 점수 행렬의 곱으로 모든 프로파일을 동시에 결합
+        
+        Args:
+            profiles: {이름: 엔진별 가중치 dict 또는 load_weight_profile 소스 문자열}
+        """
+        labels = list(profiles.keys())
+        bases = []
+        for label in labels:
+            base = profiles[label]
+            if base is None or isinstance(base, str):
+                base = self.load_weight_profile(base or 'default')
+            bases.append(base)
+        
+        # 어느 프로파일에서든 가중치를 받는 엔진만 계산
+        needed = set()
+        for base in bases:
+            needed.update(self._weighted_engines(base))
+        names, matrix, votes = self._engine_rows([n for n in self._engine_classes if n in needed])
+        
+        weight_matrix = np.zeros((len(labels), len(names)))
+        for i, base in enumerate(bases):
+            weights = self._profile_weights(base)
+            weight_matrix[i] = [weights.get(name, 0) for name in names]
+        
+        ensemble = self._blend(weight_matrix, matrix, votes)
+        return {label: {num: float(ensemble[i, num - 1]) for num in range(1, 46)}
+                for i, label in enumerate(labels)}
+    
+    def predict_profiles(self, profiles: Dict[str, object], n_sets: int = 5,
+                         seed: Optional[int] = None, mode: str = 'sample') -> Dict[str, Dict]:
+        """
+        가중치 프로파일별 예측 (엔진 계산 공유)
+        
+        Returns:
+            {이름: {'ensemble_scores': {...}, 'predicted_sets': [(조합, 신뢰도), ...]}}
+        """
+        results = {}
+        for label, scores in self.get_profile_scores(profiles).items():
+            results[label] = {
+                'ensemble_scores': scores,
+                'predicted_sets': self.predict_multiple_sets(n_sets, seed=seed, mode=mode,
+                                                             ensemble_scores=scores),
+            }
+        return results
+    
+    def reweight(self, weights: Dict[str, float] = None,
+                 profile: str = None) -> Dict[int, float]:
+        """
+        엔진 가중치 변경 (엔진 재학습/점수 재계산 없이 캐시된 점수로 앙상블만 다시 계산)
+        
+        Args:
+            weights: 엔진별 기본 가중치 (동적 부스트는 그대로 적용)
+            profile: weights 대신 사용할 가중치 프로파일 (load_weight_profile 참고)
+        Returns:
+            새 가중치로 계산한 앙상블 점수
+        """
+        if weights is None:
+            weights = self.load_weight_profile(profile or 'default')
+        self.base_weights = dict(weights)
+        self._normalize_weights()
+        return self.get_ensemble_scores()
+    
+    def with_weights(self, weights: Dict[str, float] = None,
+                     profile: str = None) -> 'EnsemblePredictor':
+        """
+        가중치만 다른 예측기 (원본은 바꾸지 않음, 인자는 reweight 와 동일)
+        
+        엔진 점수/예측, 동적 부스트, 분석 캐시는 원본과 공유하므로 여러 스레드가 하나의 예측기에서
+        요청별 가중치로 동시에 리포트를 만들 수 있습니다 (원본은 미리 get_ensemble_scores 로 채워 둘 것).
+        """
+        import copy
+        clone = copy.copy(self)
+        clone.reweight(weights, profile)
+        return clone
+    
+    def background_pending(self) -> bool:
+        """시간 예산을 넘겨 백그라운드에서 계속 중인 엔진/부스트 작업이 있는지"""
+        with self._BUDGET_LOCK:
+            return any(not self._BUDGET_JOBS[key].done() for key in self._budget_keys
+                       if key in self._BUDGET_JOBS)
+    
+    def record_fallback(self):
+        """
+        현재 프로세스에서 계산한 엔진 결과를 시간 예산 모드의 대체 점수로 기록
+        (서비스 경로에서 명시적으로 호출 - 일반 점수 계산/백테스트는 저장소를 갱신하지 않음,
+         시간 예산 모드 작업 결과는 작업이 끝날 때 자동으로 기록)
+        """
+        fresh = {name: (scores, self.engine_predictions.get(name, []))
+                 for name, scores in self.engine_scores.items() if name not in self.fallback_engines}
+        if fresh:
+            self._record_fallback(fresh, self._engine_classes, self.numbers_matrix)
+    
+    @classmethod
+    def load_weight_profile(cls, source: str = 'trained') -> Dict[str, float]:
+        """
+        가중치 프로파일 로드 (소스 코드 수정 없이 실행 중 적용)
+        
+        Args:
+            source: 'default' - DEFAULT_WEIGHTS
+                    'trained' - trained_weights_1000.json 의 학습 가중치
+                    그 외 - {"weights": {...}} 또는 {엔진: 가중치} 형식 JSON 파일 경로
+        """
+        if source == 'default':
+            return cls.DEFAULT_WEIGHTS.copy()
+        
+        import json
+        path = cls.TRAINED_WEIGHTS_PATH if source == 'trained' else Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"가중치 프로파일 파일이 없습니다: {path}")
+        with open(path, 'r') as f:
+            data = json.load(f)
+        weights = data.get('weights', data)
+        return {str(k): float(v) for k, v in weights.items()}
+    
+    @classmethod
+    def _combination_indices(cls, n_items: int, k: int) -> np.ndarray:
+        """C(n_items, k) 조합 인덱스 배열 (itertools.combinations 순서, 1회 생성 후 재사용)"""
+        key = (n_items, k)
+        if key not in cls._COMBINATION_INDEX_CACHE:
+            flat = np.fromiter((i for combo in combinations(range(n_items), k) for i in combo),
+                               dtype=np.int8)
+            cls._COMBINATION_INDEX_CACHE[key] = flat.reshape(-1, k)
+        return cls._COMBINATION_INDEX_CACHE[key]
+
     def _optimize_combination(self, candidates: List[Tuple[int, float]], 
                               n_numbers: int = 6) -> List[int]:
+        """조합 최적화 (계측 구간: combination_search)"""
+        with self.profiler.phase('combination_search'):
+            return self._search_combination(candidates, n_numbers)
+    
+    def _search_combination(self, candidates: List[Tuple[int, float]],
+                            n_numbers: int = 6) -> List[int]:
         """
         조합 최적화 (AC값, 홀짝, 연속번호 등 고려)
+        상위 20개 후보의 모든 조합을 배열로 한 번에 평가하여 최고 점수 조합 선택
+        (full_search 이면 전체 후보에서 branch-and-bound 정확 탐색)
         """
+        if self.full_search and len(candidates) >= n_numbers:
+            from src.ticket_search import TicketSearch
+            search = TicketSearch(candidates, self.min_optimal_sum, self.max_optimal_sum,
+                                  validator=self.validator, n_numbers=n_numbers)
+            return search.best()[0]
+        
         top_n = min(20, len(candidates))
-        top_candidates = [num for num, _ in candidates[:top_n]]
+        if top_n < n_numbers:
+            return [num for num, _ in candidates[:n_numbers]]
         
-        best_combo = None
-        best_score = -float('inf')
+        top_nums = np.array([num for num, _ in candidates[:top_n]], dtype=np.int64)
+        top_scores = np.array([score for _, score in candidates[:top_n]], dtype=np.float64)
         
-        # 점수 딕셔너리 미리 생성 (최적화)
-        scores_dict = dict(candidates)
+        idx = self._combination_indices(top_n, n_numbers)
+        combos = top_nums[idx]                      # (K, n) - 후보 순서 유지
         
-        for combo in combinations(top_candidates, n_numbers):
-            combo_list = list(combo)
-            combo_sum = sum(combo)
-            
-            # 기본 조합 검증
-            if self.validator:
-                is_valid, results = self.validator.validate(combo_list)
-                validator_score = self.validator.score(combo_list)
-            else:
-                is_valid = True
-                validator_score = 0.5
-            
-            # 합계 적합도 (25%)
-            if self.min_optimal_sum <= combo_sum <= self.max_optimal_sum:
-                sum_score = 1.0
-            else:
-                distance = min(abs(combo_sum - self.min_optimal_sum), 
-                             abs(combo_sum - self.max_optimal_sum))
-                sum_score = max(0, 1 - distance / 40)
-            
-            # 번호 점수 (30%)
-            scores_dict = dict(candidates)
-            num_score = sum(scores_dict.get(n, 0) for n in combo) / n_numbers
-            
-            # 검증기 점수 (30%)
-            valid_score = validator_score
-            
-            # 다양성 점수 (15%)
-            sections_covered = len(set((n-1)//10 for n in combo))
-            diversity_score = sections_covered / 5
-            
-            # 종합 점수
-            total_score = (sum_score * 0.25 + num_score * 0.30 + 
-                          valid_score * 0.30 + diversity_score * 0.15)
-            
-            if total_score > best_score:
-                best_score = total_score
-                best_combo = combo_list
+        # 기본 조합 검증 점수
+        if self.validator:
+            metrics = self.validator.batch_metrics(combos)
+            validator_score = self.validator.score_batch(combos, metrics)
+            sections_covered = metrics['sections_covered']
+            combo_sum = metrics['sum']
+        else:
+            from src.combination_validator import CombinationValidator
+            validator_score = np.full(len(combos), 0.5)
+            sections_covered = CombinationValidator.batch_metrics(combos)['sections_covered']
+            combo_sum = combos.sum(axis=1)
+        
+        # 합계 적합도 (25%)
+        distance = np.minimum(np.abs(combo_sum - self.min_optimal_sum),
+                              np.abs(combo_sum - self.max_optimal_sum))
+        in_range = (self.min_optimal_sum <= combo_sum) & (combo_sum <= self.max_optimal_sum)
+        sum_score = np.where(in_range, 1.0, np.maximum(0, 1 - distance / 40))
+        
+        # 번호 점수 (30%) - 조합 내 순서대로 누적 (스칼라 계산과 동일한 반올림)
+        combo_scores = top_scores[idx]
+        num_score = combo_scores[:, 0].copy()
+        for col in range(1, n_numbers):
+            num_score += combo_scores[:, col]
+        num_score /= n_numbers
+        
+        # 다양성 점수 (15%)
+        diversity_score = sections_covered / 5
         
-        return sorted(best_combo) if best_combo else [num for num, _ in candidates[:n_numbers]]
+        # 종합 점수 (검증기 30%)
+        total_score = (sum_score * 0.25 + num_score * 0.30 + 
+                      validator_score * 0.30 + diversity_score * 0.15)
+        
+        best = int(np.argmax(total_score))
+        return sorted(int(n) for n in combos[best])
     
     def calculate_confidence(self, numbers: List[int]) -> float:
         """예측 번호 조합의 신뢰도 계산"""
+        return float(self.calculate_confidence_batch(np.asarray([numbers]))[0])
+    
+    def calculate_confidence_batch(self, combos: np.ndarray) -> np.ndarray:
+        """다수 조합 (K, n) 의 신뢰도를 한 번에 계산 (calculate_confidence 와 동일한 값)"""
         if not self.engine_predictions:
             self.get_all_predictions()
-            
-        # 엔진 추천 횟수
-        recommendation_counts = Counter()
-        for predictions in self.engine_predictions.values():
-            for num in predictions:
-                recommendation_counts[num] += 1
+        combos = np.asarray(combos, dtype=np.int64)
         
-        total_engines = len(self.engines)
-        avg_recommendation = sum(recommendation_counts.get(n, 0) for n in numbers) / len(numbers)
+        # 엔진 추천 횟수 (가중치를 받는 엔진 기준)
+        names = [name for name in self._weighted_engines() if name in self.engine_predictions]
+        recommendation_counts = np.zeros(46, dtype=np.int64)
+        for name in names:
+            for num in self.engine_predictions[name]:
+                recommendation_counts[int(num)] += 1
+        
+        total_engines = max(1, len(names))
+        avg_recommendation = recommendation_counts[combos].sum(axis=1) / combos.shape[1]
         
         # 합계 적합도
-        combo_sum = sum(numbers)
-        if self.min_optimal_sum <= combo_sum <= self.max_optimal_sum:
-            sum_confidence = 1.0
-        else:
-            distance = min(abs(combo_sum - self.min_optimal_sum), 
-                         abs(combo_sum - self.max_optimal_sum))
-            sum_confidence = max(0, 1 - distance / 50)
+        combo_sum = combos.sum(axis=1)
+        distance = np.minimum(np.abs(combo_sum - self.min_optimal_sum),
+                              np.abs(combo_sum - self.max_optimal_sum))
+        in_range = (self.min_optimal_sum <= combo_sum) & (combo_sum <= self.max_optimal_sum)
+        sum_confidence = np.where(in_range, 1.0, np.maximum(0, 1 - distance / 50))
         
         # 조합 검증 점수
         if self.validator:
-            validator_score = self.validator.score(numbers)
+            validator_score = self.validator.score_batch(combos)
         else:
-            validator_score = 0.5
+            validator_score = np.full(len(combos), 0.5)
         
         # 종합 신뢰도
         engine_confidence = (avg_recommendation / total_engines) * 100
@@ -325,11 +870,11 @@ class EnsemblePredictor:
                      sum_confidence * 25 + 
                      validator_score * 35)
         
-        return min(confidence, 100)
+        return np.minimum(confidence, 100)
     
-    def predict_single_set(self) -> Tuple[List[int], float]:
-        """단일 예측 세트 생성"""
-        ensemble_scores = self.get_ensemble_scores()
+    def predict_single_set(self, ensemble_scores: Dict[int, float] = None) -> Tuple[List[int], float]:
+        """단일 예측 세트 생성 (ensemble_scores 지정 시 해당 점수 사용)"""
+        ensemble_scores = ensemble_scores or self.get_ensemble_scores()
         sorted_nums = sorted(ensemble_scores.items(), key=lambda x: x[1], reverse=True)
         
         selected = self._optimize_combination(sorted_nums)
@@ -337,74 +882,145 @@ class EnsemblePredictor:
         
         return sorted(selected), confidence
     
-    def predict_multiple_sets(self, n_sets: int = 5) -> List[Tuple[List[int], float]]:
-        """다중 예측 세트 생성 (다양성 + 최적화)"""
-        ensemble_scores = self.get_ensemble_scores()
+    # 다양성 세트 샘플링: 세트당 추첨 횟수 / 이 횟수 이후에는 검증 미통과 조합도 허용
+    SAMPLE_ATTEMPTS = 100
+    SAMPLE_RELAX_AFTER = 50
+    DEFAULT_SEED = 7
+    
+    def predict_multiple_sets(self, n_sets: int = 5, seed: Optional[int] = None,
+                              mode: str = 'sample',
+                              ensemble_scores: Dict[int, float] = None) -> List[Tuple[List[int], float]]:
+        """
+        다중 예측 세트 생성 (다양성 + 최적화)
+        
+        전역 난수 상태를 건드리지 않고 호출별 np.random.Generator 를 사용하므로
+        여러 스레드에서 동시에 호출해도 안전하며, 같은 seed 이면 결과가 같습니다.
+        
+        Args:
+            mode: 'sample' - 최적 조합 + 반복 번호 세트 + 점수 비례 추출 변형
+                  'portfolio' - 최적 조합 + 번호/번호 쌍 커버리지를 최대화하도록 함께 고른 세트
+            ensemble_scores: 지정 시 현재 가중치 대신 이 앙상블 점수 사용 (프로파일별 예측)
+        """
+        if mode not in ('sample', 'portfolio'):
+            raise ValueError(f"지원하지 않는 mode: {mode}")
+        if ensemble_scores is None and self.degraded.get('budget') == 'neutral':
+            return self._neutral_sets(n_sets, seed)
+        if mode == 'portfolio':
+            return self.predict_portfolio(n_sets, seed, ensemble_scores=ensemble_scores)
+        
+        rng = np.random.default_rng(self.DEFAULT_SEED if seed is None else seed)
+        ensemble_scores = ensemble_scores or self.get_ensemble_scores()
         sorted_nums = sorted(ensemble_scores.items(), key=lambda x: x[1], reverse=True)
         
-        results = []
-        used_combinations = set()
+        selected = []
+        used_keys = set()
+        
+        def add(candidate) -> bool:
+            key = int(combination_masks(np.asarray([candidate]))[0])
+            if key in used_keys:
+                return False
+            used_keys.add(key)
+            selected.append(sorted(int(n) for n in candidate))
+            return True
         
         # 첫 번째 세트: 최적화된 조합
-        first_set = tuple(self._optimize_combination(sorted_nums))
-        results.append((list(first_set), self.calculate_confidence(list(first_set))))
-        used_combinations.add(first_set)
+        add(self._optimize_combination(sorted_nums))
         
         # 직전 회차 반복 포함 세트
-        last_draw = list(self.numbers_matrix[-1])
-        top_scored = [num for num, _ in sorted_nums[:15]]
+        if n_sets > 1:
+            last_draw = [int(n) for n in self.numbers_matrix[-1]]
+            top_scored = [num for num, _ in sorted_nums[:15]]
+            base = last_draw[:2]
+            remaining = [n for n in top_scored if n not in base]
+            base.extend(rng.permutation(remaining)[:4].tolist())
+            add(base[:6])
         
-        for set_idx in range(1, n_sets):
-            np.random.seed(set_idx * 42 + 7)
+        # 다양성을 위한 변형: 상위 20개에서 점수 비례 비복원 추출 (Gumbel-top-k) 을 한 번에 수행
+        n_sampled = n_sets - 2
+        if n_sampled > 0:
+            top_20 = np.array([num for num, _ in sorted_nums[:20]], dtype=np.int64)
+            weights = np.array([ensemble_scores[int(n)] for n in top_20], dtype=np.float64)
+            with np.errstate(divide='ignore'):
+                log_weights = np.log(weights / weights.sum())
             
-            if set_idx == 1:
-                # 반복 번호 포함
-                base = list(last_draw[:2])
-                remaining = [n for n in top_scored if n not in base]
-                np.random.shuffle(remaining)
-                base.extend(remaining[:4])
-                candidate = base[:6]
+            draws = n_sampled * self.SAMPLE_ATTEMPTS
+            keys = log_weights + rng.gumbel(size=(draws, len(top_20)))
+            picks = np.argpartition(-keys, 5, axis=1)[:, :6]
+            candidates = np.sort(top_20[picks], axis=1)
+            
+            if self.validator:
+                valid = self.validator.is_valid_batch(candidates)
             else:
-                # 다양성을 위한 변형
-                top_20 = [num for num, _ in sorted_nums[:20]]
-                weights = np.array([ensemble_scores[n] for n in top_20])
-                weights = weights / weights.sum()
-                
-                attempts = 0
-                candidate = None
-                while attempts < 100:
-                    selected_indices = np.random.choice(len(top_20), size=6, replace=False, p=weights)
-                    candidate = sorted([top_20[i] for i in selected_indices])
-                    
-                    if tuple(candidate) not in used_combinations:
-                        # 조합 검증
-                        if self.validator:
-                            is_valid, _ = self.validator.validate(candidate)
-                            if is_valid or attempts > 50:
-                                break
-                        else:
-                            break
-                    attempts += 1
+                valid = np.ones(draws, dtype=bool)
+            ticket_keys = combination_masks(candidates).tolist()
             
-            if candidate and tuple(sorted(candidate)) not in used_combinations:
-                candidate = sorted(candidate)
-                used_combinations.add(tuple(candidate))
-                results.append((candidate, self.calculate_confidence(candidate)))
+            # 세트별 추첨 블록에서 미사용 + (유효 또는 완화 구간) 인 첫 조합 선택
+            for block in range(n_sampled):
+                lo = block * self.SAMPLE_ATTEMPTS
+                for attempt in range(self.SAMPLE_ATTEMPTS):
+                    i = lo + attempt
+                    if ticket_keys[i] in used_keys:
+                        continue
+                    if valid[i] or attempt > self.SAMPLE_RELAX_AFTER:
+                        add(candidates[i])
+                        break
+        
+        confidences = self.calculate_confidence_batch(np.asarray(selected))
+        results = [(combo, float(conf)) for combo, conf in zip(selected, confidences)]
         
         # 신뢰도 순 정렬
         results.sort(key=lambda x: x[1], reverse=True)
         
         return results
     
+    def _neutral_sets(self, n_sets: int, seed: Optional[int] = None) -> List[Tuple[List[int], float]]:
+        """엔진 결과가 하나도 없을 때 (시간 예산 첫 실행): 검증기 규칙을 통과한 균등 무작위 조합"""
+        from src.portfolio import sample_pool
+        
+        rng = np.random.default_rng(self.DEFAULT_SEED if seed is None else seed)
+        combos = sample_pool(np.ones(45), n_sets, rng, self.validator if self.use_validator else None)
+        confidences = self.calculate_confidence_batch(combos)
+        results = [([int(n) for n in combo], float(conf)) for combo, conf in zip(combos, confidences)]
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results
+    
+    def predict_portfolio(self, n_sets: int = 5, seed: Optional[int] = None,
+                          ensemble_scores: Dict[int, float] = None,
+                          **portfolio_kwargs) -> List[Tuple[List[int], float]]:
+        """
+        커버리지 포트폴리오 세트 생성
+        첫 세트는 최적화 조합, 나머지는 고득점 번호와 번호 쌍을 최대한 넓게 덮도록 함께 선택
+        """
+        from src.portfolio import build_portfolio
+        
+        ensemble_scores = ensemble_scores or self.get_ensemble_scores()
+        sorted_nums = sorted(ensemble_scores.items(), key=lambda x: x[1], reverse=True)
+        
+        first = self._optimize_combination(sorted_nums)
+        selected = [first]
+        if n_sets > 1:
+            selected += build_portfolio(ensemble_scores, n_sets - 1,
+                                        validator=self.validator if self.use_validator else None,
+                                        initial=[first],
+                                        seed=self.DEFAULT_SEED if seed is None else seed,
+                                        **portfolio_kwargs)
+        
+        confidences = self.calculate_confidence_batch(np.asarray(selected))
+        results = [(sorted(combo), float(conf)) for combo, conf in zip(selected, confidences)]
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results
+    
     def get_hot_cold_analysis(self) -> Dict:
-        """핫/콜드 넘버 요약"""
+        """핫/콜드 넘버 요약 (가중치와 무관하므로 1회 계산 후 재사용)"""
         if 'statistical' in self.engines:
-            stat_engine = self.engines['statistical']
-            return {
-                'hot': stat_engine.get_hot_numbers(last_n=50, top_k=10),
-                'cold': stat_engine.get_cold_numbers(last_n=50, top_k=10),
-                'overdue': stat_engine.get_overdue_numbers()[:10]
-            }
+            if 'hot_cold' not in self._analysis_cache:
+                stat_engine = self.engines['statistical']
+                self._analysis_cache['hot_cold'] = {
+                    'hot': stat_engine.get_hot_numbers(last_n=50, top_k=10),
+                    'cold': stat_engine.get_cold_numbers(last_n=50, top_k=10),
+                    'overdue': stat_engine.get_overdue_numbers()[:10]
+                }
+            return self._analysis_cache['hot_cold']
         return {}
     
     def get_repeat_analysis(self) -> Dict:
@@ -426,14 +1042,17 @@ class EnsemblePredictor:
         return {'is_valid': True, 'score': 0.5}
     
     def get_detailed_report(self, n_sets: int = 5) -> Dict:
-        """상세 분석 리포트"""
-        self.calculate_all_scores()
-        self.get_all_predictions()
+        """상세 분석 리포트 (엔진 점수/예측은 이미 계산되어 있으면 재사용)"""
+        if not self.engine_scores:
+            self.calculate_all_scores()
+        if not self.engine_predictions:
+            self.get_all_predictions()
         
         predicted_sets = self.predict_multiple_sets(n_sets)
         
-        return {
-            'engine_predictions': self.engine_predictions,
+        report = {
+            'engine_predictions': {name: self.engine_predictions[name] for name in self._weighted_engines()
+                                   if name in self.engine_predictions},
             'final_weights': self.weights,
             'dynamic_boosts': self.dynamic_boosts,
             'ensemble_scores': self.get_ensemble_scores(),
@@ -441,8 +1060,12 @@ class EnsemblePredictor:
             'repeat_analysis': self.get_repeat_analysis(),
             'predicted_sets': predicted_sets,
             'sum_range': (int(self.min_optimal_sum), int(self.max_optimal_sum)),
-            'top_set_analysis': self.get_combination_analysis(predicted_sets[0][0]) if predicted_sets else {}
+            'top_set_analysis': self.get_combination_analysis(predicted_sets[0][0]) if predicted_sets else {},
+            'degraded_engines': dict(self.degraded),
         }
+        if self.profiler.enabled:
+            report['profile'] = self.profiler.report()
+        return report
 
 
 # 테스트
@@ -34,7 +34,28 @@ def calculate_frequencies(loader):
         freq_dict[int(num)] = int(count)
     return freq_dict
 
-def export_results(target_round=None, round_range=None, force=False):
+def _fill_score_store(all_rounds_df, targets, max_round, force, workers=None):
+    """
+    새로 분석할 회차 시점의 엔진 결과를 점수 저장소에 미리 병렬 계산 (이미 저장된 시점은 재사용)
+    Returns:
+        ScoreTensorStore (실패 시 None - 회차별 직접 계산)
+    """
+    cutoffs = []
+    for target in targets:
+        round_num = target or max_round
+        if target and round_num < max_round and not force and \
+                (PROJECT_ROOT / "data" / "history" / f"prediction_{round_num + 1}.json").exists():
+            continue
+        cutoffs.append(int((all_rounds_df['round'] <= round_num).sum()))
+    try:
+        from src.optimization_cache import OptimizationCache
+        full_matrix = all_rounds_df[['num1', 'num2', 'num3', 'num4', 'num5', 'num6']].values
+        return OptimizationCache().fill_store(full_matrix, sorted(set(cutoffs)), workers=workers)
+    except Exception as e:
+        logger.warning(f"점수 저장소 사용 불가, 회차별로 직접 계산합니다: {e}")
+        return None
+
+def export_results(target_round=None, round_range=None, force=False, use_store=True):
     """분석 엔진을 실행하고 결과를 JSON 및 SQLite에 저장합니다."""
     
     # 1. 데이터 로드
@@ -69,6 +90,9 @@ def export_results(target_round=None, round_range=None, force=False):
             logger.info(f"🔍 누락된 역사적 데이터 {len(missing_history)}개를 발견했습니다. 자동으로 내보내기를 수행합니다.")
             targets = missing_history + targets
 
+    # 분석할 회차 시점의 엔진 결과는 점수 저장소에서 공유 (백테스트/학습과 동일한 계산 재사용)
+    store = _fill_score_store(all_rounds_df, targets, max_round, force) if use_store else None
+
     for current_target in targets:
         # 1-1. 분석 대상 회차 및 다음 회차 번호 계산
         if current_target:
@@ -120,6 +144,8 @@ def export_results(target_round=None, round_range=None, force=False):
 
             # 2. AI 엔진 분석 실행
             predictor = EnsemblePredictor(matrix)
+            if store is not None:
+                predictor.load_stored(store)
             report = predictor.get_detailed_report(n_sets=100)
             
             # 3. 데이터 구조화
@@ -169,6 +195,7 @@ if __name__ == "__main__":
     parser.add_argument("--round", type=int, help="분석 시점으로 지정할 회차 (예: 100)")
     parser.add_argument("--range", type=str, help="분석할 회차 범위 (예: 1-100)")
     parser.add_argument("--force", action="store_true", help="기존 분석 결과가 있더라도 새로 분석 수행")
+    parser.add_argument("--no-store", action="store_true", help="엔진 점수 저장소를 쓰지 않고 회차별로 직접 계산")
     args = parser.parse_args()
     
     round_range = None
@@ -181,7 +208,8 @@ if __name__ == "__main__":
             sys.exit(1)
 
     try:
-        export_results(target_round=args.round, round_range=round_range, force=args.force)
+        export_results(target_round=args.round, round_range=round_range, force=args.force,
+                       use_store=not args.no_store)
     except Exception as e:
         logger.exception(f"내보내기 중 예기치 않은 오류 발생: {e}")
         sys.exit(1)
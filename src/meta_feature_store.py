@@ -0,0 +1,189 @@
+"""
+ML 메타 피처 저장소 (Memory-mapped, Append-only)
+회차 인덱스 idx 행 = numbers_matrix[:idx] 로 계산한 메타 피처 (float32, N x n_features)
+
+파일 구성 (data/ml_meta_features/<key>.*):
+    <key>.f32   : float32 피처 행렬 (행 단위 append)
+    <key>.hist  : 피처 계산에 사용된 당첨번호 이력 (uint8, 회차 x 6)
+    <key>.json  : 헤더 (유효 행 수, 이력 지문, 엔진 코드 버전)
+
+key 는 엔진 코드 버전의 해시이므로 엔진 코드가 바뀌면 새 저장소가 생성되고,
+이력이 바뀌면 (데이터 정정 등) 불일치 지점 이후 행은 폐기 후 재계산됩니다.
+헤더는 임시 파일 + os.replace 로 원자적으로 교체되어 다른 프로세스는
+항상 완성된 행만 읽기 전용 memmap 으로 공유합니다.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from src.utils.atomic_io import file_lock, atomic_write_bytes
+from src.utils.fingerprint import matrix_fingerprint, combined_fingerprint
+
+
+DEFAULT_STORE_DIR = Path(__file__).parent.parent / "data" / "ml_meta_features"
+
+
+class MetaFeatureStore:
+    """엔진 코드 버전으로 주소 지정되는 메타 피처 저장소"""
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, engine_versions: Dict[str, str], n_features: int,
+                 store_dir: Path = None):
+        self.engine_versions = dict(engine_versions)
+        self.n_features = n_features
+        self.store_dir = Path(store_dir) if store_dir else DEFAULT_STORE_DIR
+        self.key = combined_fingerprint({
+            **self.engine_versions,
+            '__format__': str(self.FORMAT_VERSION),
+            '__n_features__': str(n_features),
+        })[:16]
+
+        self.data_path = self.store_dir / f"{self.key}.f32"
+        self.hist_path = self.store_dir / f"{self.key}.hist"
+        self.header_path = self.store_dir / f"{self.key}.json"
+        self.lock_path = self.store_dir / f"{self.key}.lock"
+
+        # 프로세스 내 읽기 전용 뷰 캐시 (헤더 행 수가 바뀔 때만 다시 매핑)
+        self._view_rows = -1
+        self._features = None
+        self._history = None
+
+    # ------------------------------------------------------------------ #
+    # 읽기
+    # ------------------------------------------------------------------ #
+    def _read_header(self) -> Optional[Dict]:
+        try:
+            with open(self.header_path, 'r', encoding='utf-8') as f:
+                header = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (header.get('format') != self.FORMAT_VERSION
+                or header.get('n_features') != self.n_features
+                or header.get('engine_versions') != self.engine_versions):
+            return None
+        return header
+
+    def _map(self, header: Optional[Dict]):
+        """헤더 기준 유효 행만 읽기 전용 memmap (zero-copy)"""
+        n_rows = header['n_rows'] if header else 0
+        if n_rows == self._view_rows:
+            return
+        if n_rows > 0:
+            self._features = np.memmap(self.data_path, dtype=np.float32, mode='r',
+                                       shape=(n_rows, self.n_features))
+            self._history = np.memmap(self.hist_path, dtype=np.uint8, mode='r',
+                                      shape=(n_rows - 1, 6)) if n_rows > 1 else np.zeros((0, 6), np.uint8)
+        else:
+            self._features = np.zeros((0, self.n_features), dtype=np.float32)
+            self._history = np.zeros((0, 6), dtype=np.uint8)
+        self._view_rows = n_rows
+
+    def _valid_rows(self, numbers_matrix: np.ndarray) -> int:
+        """현재 이력과 일치하는 저장 행 수 (행 idx 는 matrix[:idx] 가 일치해야 유효)"""
+        common = min(len(self._history), len(numbers_matrix))
+        stored = np.asarray(self._history[:common])
+        current = np.asarray(numbers_matrix[:common], dtype=np.uint8)
+        mismatch = np.nonzero(np.any(stored != current, axis=1))[0]
+        if len(mismatch) == 0:
+            return max(0, min(self._view_rows, len(numbers_matrix) + 1))
+        # 불일치 회차 d 이전 이력만 사용하는 행 0..d 까지 유효
+        return int(mismatch[0]) + 1
+
+    def get(self, numbers_matrix: np.ndarray, upto: int) -> Optional[np.ndarray]:
+        """
+        행 0..upto 의 메타 피처 뷰 반환 (모두 유효하게 저장된 경우에만)
+
+        Returns:
+            (upto + 1, n_features) float32 읽기 전용 배열 또는 None
+        """
+        self._map(self._read_header())
+        if self._valid_rows(numbers_matrix) > upto:
+            return self._features[:upto + 1]
+        return None
+
+    # ------------------------------------------------------------------ #
+    # 쓰기
+    # ------------------------------------------------------------------ #
+    def ensure(self, numbers_matrix: np.ndarray, upto: int,
+               compute_row: Callable[[int, np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        행 0..upto 가 저장소에 존재하도록 누락 행을 한 번의 스윕으로 계산 후 일괄 기록
+
+        Args:
+            numbers_matrix: 당첨번호 이력 (upto <= len(numbers_matrix))
+            upto: 필요한 마지막 행 인덱스
+            compute_row: (idx, numbers_matrix) -> (n_features,) float32
+
+        Returns:
+            (upto + 1, n_features) float32 배열 (저장 실패 시 메모리 배열)
+        """
+        cached = self.get(numbers_matrix, upto)
+        if cached is not None:
+            return cached
+
+        try:
+            with file_lock(self.lock_path):
+                # 잠금 획득 사이 다른 프로세스가 채웠을 수 있으므로 재확인
+                header = self._read_header()
+                self._map(header)
+                valid = self._valid_rows(numbers_matrix)
+                if valid > upto:
+                    return self._features[:upto + 1]
+
+                new_rows = np.stack([compute_row(idx, numbers_matrix)
+                                     for idx in range(valid, upto + 1)]).astype(np.float32)
+                history = np.ascontiguousarray(numbers_matrix[:upto], dtype=np.uint8)
+                self._write(header, valid, new_rows, history)
+        except OSError:
+            # 읽기 전용 파일 시스템 등: 저장 없이 계산 결과만 반환
+            self._map(self._read_header())
+            valid = min(self._valid_rows(numbers_matrix), upto + 1)
+            head = np.asarray(self._features[:valid])
+            tail = [compute_row(idx, numbers_matrix) for idx in range(valid, upto + 1)]
+            return np.concatenate([head, np.array(tail, dtype=np.float32).reshape(-1, self.n_features)])
+
+        self._map(self._read_header())
+        return self._features[:upto + 1]
+
+    def _write(self, header: Optional[Dict], valid: int, new_rows: np.ndarray,
+               history: np.ndarray):
+        """유효 행 뒤에 새 행을 기록하고 헤더를 원자적으로 갱신 (잠금 상태에서 호출)"""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        n_rows = valid + len(new_rows)
+        row_bytes = self.n_features * 4
+
+        if header is not None and valid == header['n_rows']:
+            # 순수 append: 기존 행은 건드리지 않음 (헤더 교체 전까지 독자에게 보이지 않음)
+            with open(self.data_path, 'r+b') as f:
+                f.seek(valid * row_bytes)
+                f.write(new_rows.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            hist_mode = 'r+b' if self.hist_path.exists() else 'wb'
+            with open(self.hist_path, hist_mode) as f:
+                f.seek(0)
+                f.write(history[:n_rows - 1].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            # 신규 생성 또는 이력 불일치: 유효 행만 보존하여 새 파일로 원자적 교체
+            # (기존 memmap 을 연 프로세스는 이전 inode 를 계속 안전하게 읽음)
+            kept = np.asarray(self._features[:valid], dtype=np.float32)
+            atomic_write_bytes(self.data_path, kept.tobytes() + new_rows.tobytes())
+            atomic_write_bytes(self.hist_path, history[:n_rows - 1].tobytes())
+
+        new_header = {
+            'format': self.FORMAT_VERSION,
+            'n_features': self.n_features,
+            'n_rows': n_rows,
+            'history_fingerprint': matrix_fingerprint(history[:n_rows - 1]),
+            'engine_versions': self.engine_versions,
+        }
+        atomic_write_bytes(self.header_path,
+                            json.dumps(new_header, indent=2).encode('utf-8'))
+        self._view_rows = -1
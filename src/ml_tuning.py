@@ -0,0 +1,177 @@
+"""
+MLEngine 하이퍼파라미터 탐색
+Rolling-origin 시계열 교차검증을 프로세스 풀에서 병렬 수행하고
+최적 설정을 data/ml_params.json 에 기록 (MLEngine 기본값으로 사용됨)
+"""
+
+import json
+import time
+import random
+import multiprocessing as mp
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.engines.ml import MLEngine
+from src.compiled_forest import CompiledForest
+
+
+# 기본 탐색 공간
+DEFAULT_SPACE = {
+    'lookback': [5, 10, 20],
+    'n_estimators': [30, 50, 100],
+    'max_depth': [6, 8, 12],
+    'retrain_interval': [25, 50, 100],
+}
+
+# 워커 프로세스 전역 (풀 초기화 시 1회 전달)
+_MATRIX = None
+_FEATURES = {}
+
+
+def build_feature_cache(matrix: np.ndarray, lookbacks: List[int]) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """
+    lookback 별 전체 피처 행렬을 1회 계산 (메타 피처는 저장소에서 재사용)
+
+    Returns:
+        {lookback: (X, Y)} - X[r], Y[r] 은 회차 인덱스 lookback + r 에 해당
+    """
+    cache = {}
+    for lookback in sorted(set(lookbacks)):
+        engine = MLEngine(matrix, lookback=lookback)
+        cache[lookback] = engine._training_set(len(matrix))
+    return cache
+
+
+def _init_worker(matrix: np.ndarray, features: Dict):
+    global _MATRIX, _FEATURES
+    _MATRIX = matrix
+    _FEATURES = features
+    # 프로세스 단위로 병렬화하므로 포레스트 내부 병렬은 끔
+    MLEngine.N_JOBS = 1
+
+
+def rolling_origins(n_draws: int, n_folds: int, horizon: int) -> List[int]:
+    """마지막 n_folds * horizon 회차를 겹치지 않는 테스트 구간으로 분할한 시작 회차들"""
+    return [n_draws - horizon * (n_folds - f) for f in range(n_folds)]
+
+
+def evaluate_config(config: Dict, origins: List[int], horizon: int) -> Dict:
+    """
+    단일 설정의 rolling-origin 교차검증
+
+    각 테스트 구간 [origin, origin + horizon) 안에서 retrain_interval 마다
+    그 시점 이전 데이터로 재학습하고 다음 구간을 예측 (실제 운영과 동일한 재학습 주기)
+    """
+    lookback = config['lookback']
+    X, Y = _FEATURES[lookback]
+    engine = MLEngine(_MATRIX, **config)
+
+    hits, fit_sec, infer_sec, n_fits = [], 0.0, 0.0, 0
+    for origin in origins:
+        base_model = None
+        for start in range(origin, origin + horizon, engine.retrain_interval):
+            end = min(start + engine.retrain_interval, origin + horizon)
+            train_end = start - lookback
+
+            t = time.perf_counter()
+            model = engine._fit_model(X[:train_end], Y[:train_end], base_model)
+            fit_sec += time.perf_counter() - t
+            n_fits += 1
+            if engine.mode == 'warm_start':
+                base_model = model
+
+            # 서빙 경로와 동일하게 배열 기반 추론기로 평가
+            engine.model = CompiledForest.from_sklearn(model)
+            t = time.perf_counter()
+            proba = engine._predict_positive(X[train_end:end - lookback])
+            infer_sec += time.perf_counter() - t
+
+            top6 = np.argpartition(-proba, 6, axis=1)[:, :6]
+            actual = Y[train_end:end - lookback]
+            hits.extend(np.take_along_axis(actual, top6, axis=1).sum(axis=1).tolist())
+
+    return {
+        'config': {**config, 'mode': engine.mode},
+        'avg_hits': float(np.mean(hits)) if hits else 0.0,
+        'hit_rate': float(np.mean(hits)) / 6 if hits else 0.0,
+        'fit_sec': fit_sec,
+        'fit_sec_per_model': fit_sec / max(n_fits, 1),
+        'infer_ms_per_row': infer_sec / max(len(hits), 1) * 1000,
+        'n_rounds': len(hits),
+        'n_fits': n_fits,
+    }
+
+
+def _evaluate_task(args):
+    config, origins, horizon = args
+    try:
+        return evaluate_config(config, origins, horizon)
+    except Exception as e:
+        return {'config': config, 'error': str(e), 'avg_hits': 0.0}
+
+
+def sample_configs(space: Dict[str, List], n_random: int = None, seed: int = 42) -> List[Dict]:
+    """전체 그리드 또는 그리드에서 비복원 무작위 표본"""
+    keys = sorted(space)
+    grid = [dict(zip(keys, values)) for values in product(*(space[k] for k in keys))]
+    if n_random and n_random < len(grid):
+        grid = random.Random(seed).sample(grid, n_random)
+    return grid
+
+
+def search(matrix: np.ndarray, space: Dict[str, List] = None, n_random: int = None,
+           n_folds: int = 3, horizon: int = 100, workers: int = None,
+           seed: int = 42, progress=None) -> List[Dict]:
+    """
+    하이퍼파라미터 탐색 실행
+
+    Args:
+        space: {파라미터: 후보 리스트} (기본 DEFAULT_SPACE)
+        n_random: 지정 시 그리드에서 무작위 n개만 평가
+        n_folds / horizon: rolling-origin 테스트 구간 수 / 구간 길이
+        workers: 프로세스 수 (기본 CPU - 1)
+        progress: (완료 수, 전체 수, 결과) 콜백
+
+    Returns:
+        평균 적중 수 내림차순 (동률이면 학습 비용 오름차순) 결과 리스트
+    """
+    space = space or DEFAULT_SPACE
+    configs = sample_configs(space, n_random, seed)
+    origins = rolling_origins(len(matrix), n_folds, horizon)
+    features = build_feature_cache(matrix, [c['lookback'] for c in configs])
+
+    workers = workers or max(1, mp.cpu_count() - 1)
+    tasks = [(c, origins, horizon) for c in configs]
+    results = []
+    with mp.Pool(processes=workers, initializer=_init_worker, initargs=(matrix, features)) as pool:
+        for res in pool.imap_unordered(_evaluate_task, tasks):
+            results.append(res)
+            if progress:
+                progress(len(results), len(tasks), res)
+
+    results.sort(key=lambda r: (-r['avg_hits'], r.get('fit_sec', float('inf'))))
+    return results
+
+
+def save_best(results: List[Dict], path: Path = None, search_info: Dict = None) -> Dict:
+    """최적 설정을 MLEngine 기본값 파일로 저장"""
+    path = Path(path) if path else MLEngine.PARAMS_FILE
+    valid = [r for r in results if 'error' not in r]
+    if not valid:
+        raise ValueError("평가에 성공한 설정이 없습니다")
+    best = valid[0]
+    data = {
+        'params': best['config'],
+        'avg_hits': best['avg_hits'],
+        'hit_rate': best['hit_rate'],
+        'search': search_info or {},
+        'results': results,
+        'generated_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return data
@@ -0,0 +1,99 @@
+"""
+학습된 모델 영구 저장소 (디스크 캐시 + 크기 제한 LRU 축출)
+CLI 실행, 내보내기, 백테스트, GA 워커 등 프로세스 간 학습 모델 재사용
+
+파일 구성 (data/ml_models/):
+    <key>.pkl : pickle 로 직렬화된 모델 (key = 학습 조건의 해시)
+    .lock     : 쓰기/축출 잠금
+
+LRU 순서는 파일 mtime 으로 관리합니다 (로드 시 갱신).
+"""
+
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.utils.atomic_io import file_lock, atomic_write_bytes
+from src.utils.fingerprint import combined_fingerprint
+
+
+DEFAULT_STORE_DIR = Path(__file__).parent.parent / "data" / "ml_models"
+
+
+class ModelStore:
+    """크기 제한 LRU 모델 저장소"""
+
+    # 기본 최대 용량 (환경변수 LOTTO_MODEL_STORE_MB 로 변경 가능)
+    DEFAULT_MAX_MB = 2048
+
+    def __init__(self, store_dir: Path = None, max_bytes: int = None):
+        self.store_dir = Path(store_dir) if store_dir else DEFAULT_STORE_DIR
+        if max_bytes is None:
+            max_mb = int(os.environ.get('LOTTO_MODEL_STORE_MB', self.DEFAULT_MAX_MB))
+            max_bytes = max_mb * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.lock_path = self.store_dir / ".lock"
+
+    @staticmethod
+    def make_key(parts: Dict[str, Any]) -> str:
+        """학습 조건 딕셔너리 -> 저장소 키"""
+        return combined_fingerprint({k: str(v) for k, v in parts.items()})[:24]
+
+    def _path(self, key: str) -> Path:
+        return self.store_dir / f"{key}.pkl"
+
+    def load(self, key: str) -> Optional[Any]:
+        """모델 로드 (없거나 손상된 경우 None)"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                model = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # 손상된 파일은 제거하여 재학습 유도
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+
+        try:
+            os.utime(path, None)  # LRU 접근 시각 갱신
+        except OSError:
+            pass
+        return model
+
+    def save(self, key: str, model: Any) -> bool:
+        """모델 저장 후 용량 초과분 LRU 축출"""
+        try:
+            data = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+            with file_lock(self.lock_path):
+                atomic_write_bytes(self._path(key), data)
+                self._evict(keep=key)
+            return True
+        except Exception:
+            return False
+
+    def _evict(self, keep: str = None):
+        """가장 오래 사용되지 않은 모델부터 삭제 (잠금 상태에서 호출)"""
+        entries = []
+        for path in self.store_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if keep and path.stem == keep:
+                continue
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
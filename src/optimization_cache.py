@@ -1,169 +1,508 @@
+import os
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Sequence
 from src.ensemble_predictor import EnsemblePredictor
+from src.score_store import ScoreTensorStore
 import time
 import sys
 
+
+# 워커 프로세스 상태 (풀 초기화 시 설정)
+_WORKER = {}
+
+# 회차별 계산 결과 (ScoreTensorStore 배열 이름, _compute_round 반환 순서)
+ROUND_TENSORS = ('scores', 'predictions', 'present', 'boosts')
+
+
+def _compute_round(matrix: np.ndarray, cutoff: int, engine_indices: Dict[str, int]):
+    """
+    cutoff 직전까지의 이력 matrix[:cutoff] 로 한 회차의 엔진 결과 계산
+    Returns:
+        (엔진별 점수 (E, 45), 엔진별 예측 번호 (E, 6), 엔진 결과 유무 (E,), 엔진별 동적 부스트 (E,))
+    """
+    n_engines = len(engine_indices)
+    scores_row = np.zeros((n_engines, 45), dtype=np.float64)
+    predictions_row = np.zeros((n_engines, 6), dtype=np.uint8)
+    present_row = np.zeros(n_engines, dtype=np.uint8)
+    boosts_row = np.ones(n_engines, dtype=np.float64)
+    
+    # 예측기 생성
+    predictor = EnsemblePredictor(matrix[:cutoff], use_ml=True, use_validator=True, use_dynamic_weight=True)
+    
+    # 엔진별 점수 계산
+    scores = predictor.calculate_all_scores()
+    predictions = predictor.get_all_predictions()
+    
+    # 동적 부스트 캐싱
+    for name, boost in predictor.dynamic_boosts.items():
+        if name in engine_indices:
+            boosts_row[engine_indices[name]] = boost
+    
+    # 행렬에 채우기
+    for name, engine_score in scores.items():
+        if name in engine_indices:
+            idx = engine_indices[name]
+            present_row[idx] = 1
+            for num, score in engine_score.items():
+                scores_row[idx, num - 1] = score
+    for name, preds in predictions.items():
+        if name in engine_indices:
+            preds = [int(n) for n in preds][:6]
+            predictions_row[engine_indices[name], :len(preds)] = preds
+    
+    return scores_row, predictions_row, present_row, boosts_row
+
+
+def _attach_shared(specs: Dict[str, Tuple[str, tuple, str]]):
+    """공유 메모리 블록에 연결하여 {이름: (블록, 배열)} 반환"""
+    from multiprocessing import shared_memory
+    attached = {}
+    for key, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        attached[key] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+    return attached
+
+
+def _init_worker(matrix: np.ndarray, engine_names: List[str], specs: Dict):
+    """풀 워커 초기화: 출력 텐서 연결, 포레스트 학습은 워커당 1코어"""
+    from src.engines.ml import MLEngine
+    MLEngine.N_JOBS = 1
+    _WORKER['matrix'] = matrix
+    _WORKER['engine_indices'] = {name: i for i, name in enumerate(engine_names)}
+    _WORKER['shared'] = _attach_shared(specs)
+
+
+def _worker_round(task: Tuple[int, int]) -> int:
+    """회차 계산 결과를 공유 출력 텐서의 slot 번째 행에 직접 기록"""
+    slot, cutoff = task
+    rows = _compute_round(_WORKER['matrix'], cutoff, _WORKER['engine_indices'])
+    for key, row in zip(ROUND_TENSORS, rows):
+        _WORKER['shared'][key][1][slot] = row
+    return slot
+
+
+
+def _init_population_worker(engine_names: List[str], key: str, root: str, start: int, stop: int,
+                            vote_weight: float):
+    """가중치 평가 워커 초기화: 점수 저장소를 읽기 전용 memmap 으로 1회 연결 (복사 없음)"""
+    store = ScoreTensorStore(engine_names, key, root, readonly=True)
+    _WORKER['population_data'] = store.cached_data(start, stop)
+    _WORKER['vote_weight'] = vote_weight
+
+
+def _worker_population(W: np.ndarray) -> np.ndarray:
+    """가중치 행렬 청크 (Pc, E) -> 평균 적중 수 (Pc,)"""
+    return OptimizationCache.evaluate_population(_WORKER['population_data'], W,
+                                                 vote_weight=_WORKER['vote_weight'])[0]
+
+
 class OptimizationCache:
     """
     유전 알고리즘 속도 향상을 위한 예측 결과 캐싱 클래스 (Vectorized)
     NumPy 행렬 연산을 통해 평가 속도를 극대화함.
+    
+    회차별 엔진 결과는 ScoreTensorStore (data/score_store/) 에 영구 저장되어
+    학습 구간이 바뀌거나 다시 실행해도 저장되지 않은 회차만 계산합니다.
     """
     
-    def __init__(self):
-        # 3D Array: (n_rounds, n_engines, 45) - float64 for precision
+    # 계산 완료 회차를 저장소에 기록하는 간격 (초, 중단 시에도 기록)
+    CHECKPOINT_INTERVAL = 10.0
+    
+    def __init__(self, store: ScoreTensorStore = None):
+        # 3D Array: (n_rounds, n_engines, 45) - float32 memmap
         self.cached_params = None 
         self.actual_matrix = None # (n_rounds, 45) - binary
         self.engine_indices = {}
         self.engine_names = []
+        self.store = store
+    
+    def _get_store(self) -> ScoreTensorStore:
+        if self.store is None:
+            self.store = ScoreTensorStore.for_engines(EnsemblePredictor._discover_engine_classes())
+        return self.store
     
-    def precalculate(self, matrix: np.ndarray, test_rounds: int):
+    @staticmethod
+    def _task_order(tasks: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
         """
-        테스트 구간의 모든 엔진 예측값을 미리 계산하여 3D 행렬로 변환
+        ML 모델 재학습 구간(retrain_interval)별 첫 회차를 먼저 배치
+        (구간 모델이 디스크 저장소에 먼저 만들어져 다른 워커는 학습 없이 불러옴)
         """
-        n_draws = len(matrix)
+        from src.engines.ml import MLEngine
+        interval = MLEngine.default_params()['retrain_interval']
+        seen, leaders, rest = set(), [], []
+        for task in tasks:
+            bucket = task[1] // interval
+            (rest if bucket in seen else leaders).append(task)
+            seen.add(bucket)
+        return leaders + rest
+    
+    @staticmethod
+    def _progress(done_now: int, total: int, resumed: int, start_time: float):
+        elapsed = time.time() - start_time
+        rate = done_now / elapsed if elapsed > 0 else 0.0
+        remaining = total - resumed - done_now
+        eta = remaining / rate if rate > 0 else float('inf')
+        eta_text = f"{int(eta // 60)}분 {int(eta % 60):02d}초" if eta != float('inf') else "-"
+        completed = resumed + done_now
+        sys.stdout.write(f"\r   캐싱 진행률: {completed / total * 100:5.1f}% ({completed}/{total}) "
+                         f"| {rate:5.2f}회/초 | 남은 시간 {eta_text}   ")
+        sys.stdout.flush()
+    
+    def fill_store(self, matrix: np.ndarray, cutoffs: Sequence[int], workers: int = None) -> ScoreTensorStore:
+        """
+        cutoffs 중 저장소에 없는 회차의 엔진 결과를 계산하여 저장
+        
+        회차별 계산을 프로세스 풀에 분배하고 워커가 공유 메모리 출력 텐서에 직접 기록합니다.
+        완료된 회차는 주기적으로(그리고 중단/오류 시) 저장소에 기록되어,
+        다시 실행하면 남은 회차만 계산합니다.
         
-        # 임시 예측기 생성으로 엔진 목록 확인
-        temp_predictor = EnsemblePredictor(matrix[:100], use_ml=True, use_validator=True, use_dynamic_weight=True)
-        self.engine_names = sorted(list(temp_predictor.engines.keys()))
-        self.engine_indices = {name: i for i, name in enumerate(self.engine_names)}
-        n_engines = len(self.engine_names)
+        Args:
+            matrix: 당첨번호 이력 (cutoff t 는 matrix[:t] 로 계산, 정답은 matrix[t])
+            workers: 프로세스 수 (기본 CPU 코어 수 - 1, 1 이면 현재 프로세스에서 순차 계산)
+        """
+        store = self._get_store()
+        store.sync(matrix)
+        cutoffs = list(cutoffs)
+        missing = store.missing(cutoffs)
+        if not missing:
+            return store
+        
+        if workers is None:
+            workers = max(1, (os.cpu_count() or 1) - 1)
+        workers = max(1, min(workers, len(missing)))
+        n_engines = len(store.engine_names)
+        
+        # 출력 텐서 (계산할 회차 수 기준, 저장소와 같은 형식)
+        layouts = {key: ((len(missing),) + store.ARRAYS[key][1](n_engines), store.ARRAYS[key][0])
+                   for key in ROUND_TENSORS}
+        shared = {}
+        if workers > 1:
+            from multiprocessing import shared_memory
+            for key, (shape, dtype) in layouts.items():
+                size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+                block = shared_memory.SharedMemory(create=True, size=size)
+                shared[key] = (block, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+            arrays = {key: array for key, (_, array) in shared.items()}
+        else:
+            arrays = {key: np.zeros(shape, dtype=dtype) for key, (shape, dtype) in layouts.items()}
         
-        # 캐시 행렬 초기화 (float64로 정밀도 유지)
-        self.cached_scores = np.zeros((test_rounds, n_engines, 45), dtype=np.float64)
-        self.actual_matrix = np.zeros((test_rounds, 45), dtype=np.int8)
-        self.cached_vote_scores = np.zeros((test_rounds, 45), dtype=np.float64)
-        self.cached_boosts = np.ones((test_rounds, n_engines), dtype=np.float64)
+        tasks = self._task_order(list(enumerate(missing)))
+        resumed = len(cutoffs) - len(missing)
         
-        print(f"\n⚡️ 최적화 캐시 생성 중... (Method: Vectorized Matrix, 총 {test_rounds}회차)")
+        print(f"\n⚡️ 최적화 캐시 생성 중... (Method: Vectorized Matrix, 총 {len(cutoffs)}회차, "
+              f"워커 {workers}개)")
+        if resumed:
+            print(f"   🔄 저장소에서 {resumed}회차 재사용, 남은 {len(missing)}회차 계산")
         start_time = time.time()
+        last_save = last_print = start_time
+        unsaved = []
+        pool = None
         
-        # 반복 구간
-        for i in range(test_rounds):
-            test_idx = n_draws - test_rounds + i
-            train_matrix = matrix[:test_idx]
-            
-            # 실제 당첨 번호 저장
-            actual = matrix[test_idx]
-            for num in actual:
-                self.actual_matrix[i, num - 1] = 1
-            
-            # 예측기 생성
-            predictor = EnsemblePredictor(train_matrix, use_ml=True, use_validator=True, use_dynamic_weight=True)
-            
-            # 엔진별 점수 계산
-            scores = predictor.calculate_all_scores()
-            predictions = predictor.get_all_predictions()
-            
-            # 동적 부스트 캐싱
-            for name, boost in predictor.dynamic_boosts.items():
-                if name in self.engine_indices:
-                    idx = self.engine_indices[name]
-                    self.cached_boosts[i, idx] = boost
+        def save():
+            if unsaved:
+                slots = np.array(unsaved)
+                store.write([missing[i] for i in unsaved], *(arrays[key][slots] for key in ROUND_TENSORS))
+                unsaved.clear()
+        
+        try:
+            if workers > 1:
+                import multiprocessing as mp
+                specs = {key: (block.name, array.shape, array.dtype.str) for key, (block, array) in shared.items()}
+                pool = mp.Pool(processes=workers, initializer=_init_worker,
+                               initargs=(np.asarray(matrix), store.engine_names, specs))
+                completed = pool.imap_unordered(_worker_round, tasks)
+            else:
+                def _sequential():
+                    for slot, cutoff in tasks:
+                        rows = _compute_round(matrix, cutoff, store.engine_indices)
+                        for key, row in zip(ROUND_TENSORS, rows):
+                            arrays[key][slot] = row
+                        yield slot
+                completed = _sequential()
             
-            # 행렬에 채우기
-            for name, engine_score in scores.items():
-                if name in self.engine_indices:
-                    idx = self.engine_indices[name]
-                    for num, score in engine_score.items():
-                        self.cached_scores[i, idx, num - 1] = score
-                        
-            # 투표 점수 캐싱
-            from collections import Counter
-            vote_counts = Counter()
-            for name, preds in predictions.items():
-                if name in self.engine_indices:
-                    for num in preds:
-                        vote_counts[num] += 1
-            max_votes = max(vote_counts.values()) if vote_counts.values() else 1
-            for num in range(1, 46):
-                self.cached_vote_scores[i, num - 1] = vote_counts.get(num, 0) / max_votes
+            for count, slot in enumerate(completed, 1):
+                unsaved.append(slot)
+                now = time.time()
+                if now - last_save >= self.CHECKPOINT_INTERVAL:
+                    save()
+                    last_save = now
+                if now - last_print >= 0.5 or count == len(tasks):
+                    self._progress(count, len(cutoffs), resumed, start_time)
+                    last_print = now
+            save()
             
-            # 진행상황 표시
-            if (i + 1) % 10 == 0:
-                percent = (i + 1) / test_rounds * 100
-                sys.stdout.write(f"\r   캐싱 진행률: {percent:5.1f}% ({i+1}/{test_rounds})")
-                sys.stdout.flush()
-                
+            if pool is not None:
+                pool.close()
+                pool.join()
+        except BaseException:
+            # 중단/오류 시 완료된 회차까지 저장 후 전달
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            n_saved = len(unsaved)
+            save()
+            if n_saved:
+                print(f"\n💾 완료된 {n_saved}회차를 저장소에 기록했습니다 (다시 실행하면 이어서 계산)")
+            raise
+        finally:
+            for block, _ in shared.values():
+                block.close()
+                block.unlink()
+        
         elapsed = time.time() - start_time
         print(f"\n✅ 캐싱 완료! 소요시간: {elapsed:.2f}초\n")
+        return store
+    
+    def precalculate(self, matrix: np.ndarray, test_rounds: int, workers: int = None):
+        """
+        테스트 구간의 모든 엔진 예측값을 미리 계산하여 3D 행렬로 변환
+        (저장소에 이미 있는 회차는 재사용, 반환 배열은 저장소 memmap 슬라이스)
+        """
+        n_draws = len(matrix)
+        start, stop = n_draws - test_rounds, n_draws
+        store = self.fill_store(matrix, range(start, stop), workers)
+        cached_data = store.cached_data(start, stop)
         
-        return {
-            'scores': self.cached_scores,
-            'actuals': self.actual_matrix,
-            'vote_scores': self.cached_vote_scores,
-            'boosts': self.cached_boosts,
-            'engine_names': self.engine_names
-        }
+        self.engine_names = cached_data['engine_names']
+        self.engine_indices = store.engine_indices
+        self.cached_scores = cached_data['scores']
+        self.actual_matrix = cached_data['actuals']
+        self.cached_vote_scores = cached_data['vote_scores']
+        self.cached_boosts = cached_data['boosts']
+        return cached_data
 
+    # evaluate_population 청크당 최대 작업 메모리 (앙상블 점수 텐서 기준)
+    POPULATION_CHUNK_BYTES = 64 * 1024 * 1024
+    # evaluate_population 에서 한 번에 float64 로 변환하는 회차 수
+    ROUND_CHUNK = 512
+    
     @staticmethod
-    def evaluate_weights(cached_data: Dict, weights: Dict[str, float]) -> Tuple[float, Dict[int, int]]:
-        """
-        Vectorized 평가 함수 for float64 precision
-        """
-        cached_scores = cached_data['scores'] # (R, E, 45)
-        actuals = cached_data['actuals']      # (R, 45)
-        vote_scores = cached_data.get('vote_scores') # (R, 45)
-        boosts = cached_data.get('boosts')    # (R, E)
+    def weight_matrix(cached_data: Dict, population: Sequence[Dict[str, float]]) -> np.ndarray:
+        """가중치 dict 목록 -> (P, E) 가중치 행렬 (캐시 엔진 순서, 없는 엔진 0)"""
         engine_names = cached_data['engine_names']
+        W = np.zeros((len(population), len(engine_names)), dtype=np.float64)
+        for p, weights in enumerate(population):
+            for i, name in enumerate(engine_names):
+                if name in weights:
+                    W[p, i] = weights[name]
+        return W
+    
+    @staticmethod
+    def _ensemble_block(S: np.ndarray, B: np.ndarray, V: np.ndarray, votes: np.ndarray,
+                        W_base: np.ndarray, vote_weight: np.ndarray, vote_part: np.ndarray = None) -> np.ndarray:
+        """
+        회차 블록의 앙상블 점수 (Rc, Pc, 45)
         
-        # W_base 생성 (float64)
-        W_base = np.zeros(len(engine_names), dtype=np.float64)
+        W_eff = W_base * boosts 를 회차별로 정규화한 가중 합 + 투표 점수.
+        투표는 EnsemblePredictor._blend 와 같이 가중치가 0 보다 큰 엔진의 추천만 집계합니다
+        (모든 엔진 가중치가 양수이면 미리 계산된 V 사용, 같은 엔진 조합은 1회만 계산).
         
-        for i, name in enumerate(engine_names):
-            if name in weights:
-                W_base[i] = weights[name]
+        Args:
+            S: 엔진 점수 (Rc, E, 45) float64, B: 동적 부스트 (Rc, E)
+            V: 전체 엔진 투표 점수 (Rc, 1, 45) 또는 None (투표 미사용)
+            votes: 엔진별 추천 횟수 (Rc, E, 45) 또는 None (항상 V 사용)
+            vote_weight: 개체별 투표 결합 비율 (Pc,)
+            vote_part: V * vote_weight (모든 개체 비율이 같을 때 미리 계산한 값)
+        """
+        W_eff = B[:, None, :] * W_base[None, :, :]                     # (Rc, Pc, E)
+        row_sums = W_eff.sum(axis=2, keepdims=True)
+        row_sums[row_sums == 0] = 1.0
+        if V is None:
+            W_eff /= row_sums
+            return np.matmul(W_eff, S)
         
-        if np.sum(W_base) == 0:
-            return 0.0, {0:0, 1:0, 2:0, 3:0, 4:0, 5:0, 6:0}
-            
-        # 1. 앙상블 점수 계산
-        # W_eff = W_base * boosts (R, E)
-        if boosts is not None:
-            W_eff = W_base * boosts
+        W_eff *= (1 - vote_weight)[None, :, None] / row_sums
+        ensemble = np.matmul(W_eff, S)                                 # (Rc, Pc, 45)
+        support = W_base > 0
+        if votes is None or support.all():
+            ensemble += vote_part if vote_part is not None else V * vote_weight[None, :, None]
         else:
-            R = cached_scores.shape[0]
-            W_eff = np.tile(W_base, (R, 1))
-            
-        # 정규화 (Row-wise)
-        row_sums = W_eff.sum(axis=1, keepdims=True)
-        row_sums[row_sums == 0] = 1.0
-        W_eff = W_eff / row_sums
+            patterns, inverse = np.unique(support, axis=0, return_inverse=True)
+            masked = ScoreTensorStore.masked_vote_scores(votes, patterns)[:, inverse.reshape(-1)]
+            ensemble += masked * vote_weight[None, :, None]
+        return ensemble
+    
+    @classmethod
+    def ensemble_scores(cls, cached_data: Dict, W: np.ndarray, vote_weight=0.35) -> np.ndarray:
+        """
+        가중치 행렬 W (P, E) 의 회차별 앙상블 점수 (R, P, 45) - evaluate_population 과 같은 계산
+        (EnsemblePredictor 의 앙상블 점수와 상위 번호를 비교하는 검증용, 큰 P 는 evaluate_population 사용)
+        """
+        W = np.atleast_2d(np.asarray(W, dtype=np.float64))
+        scores = np.asarray(cached_data['scores'], dtype=np.float64)
+        R, E = scores.shape[:2]
+        boosts = cached_data.get('boosts')
+        boosts = np.ones((R, E)) if boosts is None else np.asarray(boosts, dtype=np.float64)
+        vote_scores = cached_data.get('vote_scores')
+        V = None if vote_scores is None else np.asarray(vote_scores, dtype=np.float64)[:, None, :]
+        votes = cached_data.get('votes')
+        votes = None if votes is None else np.asarray(votes, dtype=np.float64)
+        vote_weight = np.broadcast_to(np.asarray(vote_weight, dtype=np.float64), (len(W),))
+        return cls._ensemble_block(scores, boosts, V, votes, W, vote_weight)
+    
+    @classmethod
+    def evaluate_population(cls, cached_data: Dict, W: np.ndarray, chunk_size: int = None,
+                            vote_weight=0.35) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        가중치 행렬 W (P, E) 의 P 개 앙상블을 한 번에 평가 (evaluate_weights 의 배치 버전)
         
-        # cached_scores: (R, E, 45), W_eff: (R, E) -> weighted_scores: (R, 45)
-        weighted_scores = np.einsum('rei,re->ri', cached_scores, W_eff)
+        청크마다 (R, Pc, E) @ (R, E, 45) 배치 행렬곱으로 앙상블 점수를 만들고 (_ensemble_block),
+        np.partition 으로 회차별 6번째 점수(임계값)를 구한 뒤
+        실제 당첨 번호 위치의 점수만 gather 하여 임계값 이상인 개수를 적중 수로 셉니다.
+        임계값 이상인 번호가 6개를 넘는 (경계 동점) 회차는 동점 번호 중 작은 번호부터
+        남은 자리만큼만 선택하여 다시 셉니다 (EnsemblePredictor 의 점수 내림차순 정렬과 같은 규칙).
         
-        # 투표 점수와 결합
-        if vote_scores is not None:
-            ensemble_scores = (weighted_scores * 0.65) + (vote_scores * 0.35)
-        else:
-            ensemble_scores = weighted_scores
-        
-        # 2. 상위 6개 선정 (argsort 사용)
-        # argsort는 오름차순이므로 뒤에서 6개를 가져옴
-        top6_indices = np.argsort(ensemble_scores, axis=1)[:, -6:]
-        
-        # 3. 적중 개수 계산 (Vectorized)
-        # 예측된 인덱스로 binary 마스크 생성
-        R = ensemble_scores.shape[0]
-        hits = np.zeros(R, dtype=np.int32)
-        
-        # 각 행(회차)별로 실제 번호와 비교
-        # 고급 인덱싱 or 반복문 사용 (NumPy 반복은 빠름)
-        # 여기서는 정확성을 위해 간단한 row-wise loop 사용 (여전히 Python dict보다 훨씬 빠름)
-        for r in range(R):
-            # top6_indices[r] contains 0-based indices
-            # actuals[r] is 0/1 array
-            row_hits = 0
-            for idx in top6_indices[r]:
-                if actuals[r, idx] == 1:
-                    row_hits += 1
-            hits[r] = row_hits
-            
-        # 통계 집계
-        hit_counts = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0}
-        unique, counts = np.unique(hits, return_counts=True)
-        for u, c in zip(unique, counts):
-            hit_counts[int(u)] = int(c)
+        Args:
+            W: 엔진별 기본 가중치 행렬 (열 순서 = cached_data['engine_names'])
+            chunk_size: 한 번에 평가할 개체 수 (기본: 점수 텐서가 POPULATION_CHUNK_BYTES 이내)
+            vote_weight: 투표 점수 결합 비율 (가중 점수는 1 - vote_weight), 스칼라 또는 개체별 (P,)
+        Returns:
+            (평균 적중 수 (P,), 적중 개수 분포 (P, 7)) - 가중치 합이 0 인 개체는 0
+        """
+        W = np.atleast_2d(np.asarray(W, dtype=np.float64))
+        scores = cached_data['scores']                                 # (R, E, 45) float32 memmap 가능
+        actuals = np.asarray(cached_data['actuals']) != 0              # (R, 45)
+        vote_scores = cached_data.get('vote_scores')                   # (R, 45)
+        votes = cached_data.get('votes')                               # (R, E, 45) 엔진별 추천 횟수
+        boosts = cached_data.get('boosts')                             # (R, E)
+        R, E = scores.shape[:2]
+        P = len(W)
+        
+        mean_hits = np.zeros(P, dtype=np.float64)
+        distribution = np.zeros((P, 7), dtype=np.int64)
+        if R == 0 or P == 0:
+            return mean_hits, distribution
+        
+        round_chunk = min(R, cls.ROUND_CHUNK)
+        if chunk_size is None:
+            chunk_size = max(1, cls.POPULATION_CHUNK_BYTES // (round_chunk * 45 * 8))
+        boosts = np.ones((R, E)) if boosts is None else np.asarray(boosts, dtype=np.float64)
+        per_individual = np.ndim(vote_weight) > 0
+        vote_weight = np.broadcast_to(np.asarray(vote_weight, dtype=np.float64), (P,))
+        valid = W.sum(axis=1) != 0
+        # 가중치 0 엔진이 있는 개체가 있을 때만 엔진별 추천으로 투표 점수를 다시 집계
+        if votes is not None and (W > 0).all():
+            votes = None
+        
+        # 회차별 당첨 번호 위치 (모든 회차의 당첨 개수가 같으면 gather, 아니면 마스크 사용)
+        per_round = actuals.sum(axis=1)
+        winning = None
+        if per_round.min() == per_round.max():
+            winning = np.nonzero(actuals)[1].reshape(R, -1)
+        
+        # 회차 청크마다 점수 텐서를 float64 로 변환 (저장소 memmap 은 float32 그대로 공유)
+        for r0 in range(0, R, round_chunk):
+            block = slice(r0, r0 + round_chunk)
+            S = np.asarray(scores[block], dtype=np.float64)            # (Rc, E, 45)
+            B = boosts[block]
+            A = actuals[block]
+            rows = np.arange(len(S))[:, None]
+            V = vote_part = VE = None
+            if vote_scores is not None:
+                V = np.asarray(vote_scores[block], dtype=np.float64)[:, None, :]
+                vote_part = None if per_individual else V * vote_weight[0]   # (Rc, 1, 45)
+                if votes is not None:
+                    VE = np.asarray(votes[block], dtype=np.float64)    # (Rc, E, 45)
             
-        return float(np.mean(hits)), hit_counts
+            for lo in range(0, P, chunk_size):
+                W_base = W[lo:lo + chunk_size]                         # (Pc, E)
+                n = len(W_base)
+                
+                # 1. 앙상블 점수
+                ensemble = cls._ensemble_block(S, B, V, VE, W_base, vote_weight[lo:lo + n], vote_part)
+                
+                # 2. 회차별 상위 6개 경계값
+                threshold = np.partition(ensemble, 39, axis=2)[:, :, 39:40]
+                
+                # 3. 적중 개수 = 당첨 번호 점수 중 경계값 이상인 개수
+                if winning is not None:
+                    picked = ensemble[rows, :, winning[block]].transpose(0, 2, 1)  # (Rc, Pc, 6)
+                    hits = np.count_nonzero(picked >= threshold, axis=2)
+                else:
+                    hits = np.count_nonzero((ensemble >= threshold) & A[:, None, :], axis=2)
+                
+                # 4. 경계 동점 회차: 동점 번호 중 작은 번호부터 남은 자리만큼만 선택
+                tied_r, tied_p = np.nonzero(np.count_nonzero(ensemble >= threshold, axis=2) > 6)
+                if len(tied_r):
+                    row_scores = ensemble[tied_r, tied_p]              # (T, 45)
+                    boundary = threshold[tied_r, tied_p]               # (T, 1)
+                    above = row_scores > boundary
+                    at = row_scores == boundary
+                    free = 6 - above.sum(axis=1, keepdims=True)
+                    chosen = above | (at & (np.cumsum(at, axis=1) <= free))
+                    hits[tied_r, tied_p] = np.count_nonzero(chosen & A[tied_r], axis=1)
+                hits = hits.T                                          # (Pc, Rc)
+                
+                mean_hits[lo:lo + n] += hits.sum(axis=1)
+                counts = np.bincount((hits + 7 * np.arange(n)[:, None]).ravel(), minlength=7 * n)
+                distribution[lo:lo + n] += counts.reshape(n, 7)
+        
+        mean_hits = np.where(valid, mean_hits / R, 0.0)
+        distribution *= valid[:, None]
+        return mean_hits, distribution
+    
+    @classmethod
+    def evaluate_weights(cls, cached_data: Dict, weights: Dict[str, float],
+                         vote_weight: float = 0.35) -> Tuple[float, Dict[int, int]]:
+        """
+        Vectorized 평가 함수 (가중치 1개, evaluate_population 사용)
+        """
+        mean_hits, distribution = cls.evaluate_population(cached_data, cls.weight_matrix(cached_data, [weights]),
+                                                          vote_weight=vote_weight)
+        return float(mean_hits[0]), {h: int(distribution[0, h]) for h in range(7)}
+
+
+class PopulationEvaluator:
+    """
+    세대마다 개체군 가중치 행렬을 평가하는 영구 워커 풀
+    
+    풀은 실행 전체에서 한 번만 만들고, 각 워커는 초기화 시 점수 저장소(ScoreTensorStore)를
+    읽기 전용 memmap 으로 연결합니다. 작업마다 (Pc, E) 가중치 청크만 전달하므로
+    세대당 오버헤드는 수 ms 수준입니다. 워커가 1개 이하이면 풀 없이 현재 프로세스에서 평가합니다.
+    
+    사용 예:
+        with PopulationEvaluator(cache.store, start, stop, workers=4) as evaluator:
+            scores = evaluator.evaluate(W)      # (P,) 평균 적중 수
+    """
+    
+    def __init__(self, store: ScoreTensorStore, start: int, stop: int, workers: int = None,
+                 vote_weight: float = 0.35):
+        if workers is None:
+            workers = max(1, (os.cpu_count() or 1) - 1)
+        self.workers = max(1, workers)
+        self.data = store.cached_data(start, stop)
+        self.engine_names = self.data['engine_names']
+        self.vote_weight = vote_weight
+        self.pool = None
+        if self.workers > 1:
+            import multiprocessing as mp
+            self.pool = mp.Pool(processes=self.workers, initializer=_init_population_worker,
+                                initargs=(store.engine_names, store.key, str(store.store_dir.parent),
+                                          start, stop, vote_weight))
+    
+    def weight_matrix(self, population: Sequence[Dict[str, float]]) -> np.ndarray:
+        return OptimizationCache.weight_matrix(self.data, population)
+    
+    def evaluate(self, W: np.ndarray) -> np.ndarray:
+        """가중치 행렬 (P, E) -> 개체별 평균 적중 수 (P,)"""
+        W = np.atleast_2d(np.asarray(W, dtype=np.float64))
+        if self.pool is None or len(W) < 2:
+            return OptimizationCache.evaluate_population(self.data, W, vote_weight=self.vote_weight)[0]
+        chunks = [c for c in np.array_split(W, min(self.workers, len(W))) if len(c)]
+        return np.concatenate(self.pool.map(_worker_population, chunks))
+    
+    def close(self, terminate: bool = False):
+        if self.pool is not None:
+            if terminate:
+                self.pool.terminate()
+            else:
+                self.pool.close()
+            self.pool.join()
+            self.pool = None
+    
+    def __enter__(self) -> 'PopulationEvaluator':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        # 예외(중단 포함) 시 진행 중인 작업을 기다리지 않고 종료
+        self.close(terminate=exc_type is not None)
@@ -0,0 +1,174 @@
+"""
+엔진별 성능 원장 (Performance Ledger)
+회차 idx 에 대해 numbers_matrix[:idx] 로 학습한 각 엔진의 top-6 예측이
+실제 당첨번호 numbers_matrix[idx] 와 몇 개 적중했는지 영구 기록
+
+- 새 회차가 추가될 때 엔진별로 1회만 계산하여 누적 (ML, LSTM 포함 모든 엔진 동일 취급)
+- 각 기록은 이력 체인 해시 (numbers_matrix[:idx + 1]) 로 검증되어 데이터가 바뀌면 자동 무효화
+- 엔진 모듈 소스가 바뀌면 해당 엔진 기록만 초기화
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.utils.atomic_io import file_lock, atomic_write_bytes
+from src.utils.fingerprint import module_fingerprint
+
+
+DEFAULT_LEDGER_PATH = Path(__file__).parent.parent / "data" / "engine_ledger.json"
+
+
+def history_chain(numbers_matrix: np.ndarray) -> List[str]:
+    """chain[i] = numbers_matrix[:i + 1] 의 누적 해시 (앞부분이 같은 이력은 같은 값)"""
+    chain, prev = [], b''
+    for row in np.asarray(numbers_matrix, dtype=np.uint8):
+        prev = hashlib.sha1(prev + row.tobytes()).digest()
+        chain.append(prev.hex()[:16])
+    return chain
+
+
+class PerformanceLedger:
+    """영구 저장되는 엔진별 회차 적중 기록"""
+
+    FORMAT_VERSION = 1
+    _shared = {}
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path) if path else DEFAULT_LEDGER_PATH
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self._data = None
+        self._mtime = None
+
+    @classmethod
+    def shared(cls, path: Path = None) -> 'PerformanceLedger':
+        """프로세스 내 공유 인스턴스 (경로별)"""
+        key = str(path or DEFAULT_LEDGER_PATH)
+        if key not in cls._shared:
+            cls._shared[key] = cls(path)
+        return cls._shared[key]
+
+    # ------------------------------------------------------------------ #
+    # 저장 / 로드
+    # ------------------------------------------------------------------ #
+    def _empty(self) -> Dict:
+        return {'format': self.FORMAT_VERSION, 'rounds': {}, 'engines': {}}
+
+    def _read_file(self) -> Dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') == self.FORMAT_VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return self._empty()
+
+    def _load(self) -> Dict:
+        """파일이 바뀐 경우에만 다시 읽음"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+        if self._data is None or mtime != self._mtime:
+            self._data = self._read_file()
+            self._mtime = mtime
+        return self._data
+
+    @staticmethod
+    def _apply_rounds(data: Dict, new_rounds: Dict[str, str]):
+        """회차 이력 해시 갱신 (이력이 바뀐 회차의 기존 기록은 모든 엔진에서 무효)"""
+        for key, chain_hash in new_rounds.items():
+            if data['rounds'].get(key) != chain_hash:
+                for entry in data['engines'].values():
+                    entry['hits'].pop(key, None)
+                data['rounds'][key] = chain_hash
+
+    def _save(self, new_rounds: Dict[str, str], new_hits: Dict[str, Dict],
+              versions: Dict[str, str]):
+        """다른 프로세스의 기록과 병합하여 원자적으로 저장"""
+        try:
+            with file_lock(self.lock_path):
+                data = self._read_file()
+                self._apply_rounds(data, new_rounds)
+                for name, hits in new_hits.items():
+                    entry = data['engines'].get(name)
+                    if entry is None or entry.get('version') != versions[name]:
+                        entry = {'version': versions[name], 'hits': {}}
+                        data['engines'][name] = entry
+                    entry['hits'].update(hits)
+                atomic_write_bytes(self.path, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+                self._data = data
+                self._mtime = os.stat(self.path).st_mtime
+        except OSError:
+            # 저장 실패 시 이번 프로세스 메모리에만 반영
+            data = self._load()
+            self._apply_rounds(data, new_rounds)
+            for name, hits in new_hits.items():
+                data['engines'].setdefault(name, {'version': versions[name], 'hits': {}})['hits'].update(hits)
+
+    # ------------------------------------------------------------------ #
+    # 조회 / 갱신
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _evaluate(engine_class, numbers_matrix: np.ndarray, idx: int) -> Optional[int]:
+        """idx 직전까지 데이터로 엔진 예측 후 idx 회차 적중 수"""
+        try:
+            engine = engine_class(numbers_matrix[:idx])
+            pred = set(int(n) for n in engine.predict())
+            return len(pred & set(int(n) for n in numbers_matrix[idx]))
+        except Exception:
+            return None
+
+    def round_hits(self, numbers_matrix: np.ndarray, engine_classes: Dict[str, type],
+                   lookback: int) -> Dict[str, List[Optional[int]]]:
+        """
+        최근 lookback 회차의 엔진별 적중 수 (누락분만 계산 후 원장에 기록)
+
+        Returns:
+            {엔진: [최근 1회차 전 적중, 2회차 전, ...]} (계산 실패는 None)
+        """
+        data = self._load()
+        n = len(numbers_matrix)
+        chain = history_chain(numbers_matrix)
+        versions = {name: module_fingerprint(sys.modules[cls.__module__])
+                    for name, cls in engine_classes.items()}
+
+        result = {name: [] for name in engine_classes}
+        new_rounds, new_hits = {}, {}
+        for i in range(1, lookback + 1):
+            idx = n - i
+            key = str(idx)
+            same_history = data['rounds'].get(key) == chain[idx]
+            for name, engine_class in engine_classes.items():
+                entry = data['engines'].get(name)
+                if (same_history and entry is not None
+                        and entry.get('version') == versions[name] and key in entry['hits']):
+                    result[name].append(entry['hits'][key])
+                    continue
+                hits = self._evaluate(engine_class, numbers_matrix, idx)
+                new_hits.setdefault(name, {})[key] = hits
+                result[name].append(hits)
+            if not same_history:
+                new_rounds[key] = chain[idx]
+
+        if new_hits or new_rounds:
+            self._save(new_rounds, new_hits, versions)
+        return result
+
+    def performance(self, numbers_matrix: np.ndarray, engine_classes: Dict[str, type],
+                    lookback: int = 10, decay: float = 1.0) -> Dict[str, float]:
+        """
+        엔진별 감쇠 가중 적중 합계: sum_i decay^(i-1) * hits(n - i)
+
+        decay=1.0 이면 최근 lookback 회차 단순 합계
+        """
+        hits = self.round_hits(numbers_matrix, engine_classes, lookback)
+        weights = decay ** np.arange(lookback)
+        return {name: float(sum(w * (h or 0) for w, h in zip(weights, values)))
+                for name, values in hits.items()}
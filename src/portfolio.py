@@ -0,0 +1,169 @@
+"""
+커버리지 최대화 티켓 포트폴리오
+N장의 조합을 함께 선택하여 고득점 번호와 번호 쌍을 최대한 넓게 덮도록 구성
+
+목적함수 (단조 증가 + 부분모듈러 -> 탐욕 선택이 (1 - 1/e) 근사 보장):
+    f(S) = sum_n  w_n  * (1 - decay^c_n)
+         + pair_weight * sum_{i<j} w_ij * (1 - decay^c_ij),   w_ij ∝ w_i w_j
+    (w_n, w_ij 는 각각 합이 1 이 되도록 정규화)
+    c_n / c_ij : 포트폴리오에서 번호 n / 번호 쌍 (i, j) 가 등장한 티켓 수
+
+후보 풀은 점수 비례 Gumbel-top-k 추출 후 조합 검증을 통과한 고유 조합이며,
+탐욕 선택은 지연(lazy) 한계이득 갱신으로 상위 후보만 다시 계산합니다.
+"""
+
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.bitmask import combination_masks, popcount
+
+
+_PAIR_I, _PAIR_J = np.array(list(combinations(range(6), 2))).T
+
+
+def sample_pool(scores: np.ndarray, size: int, rng: np.random.Generator,
+                validator=None, temperature: float = 1.0,
+                max_rounds: int = 8) -> np.ndarray:
+    """
+    점수 비례 비복원 추출로 검증을 통과한 고유 조합 풀 생성
+
+    Args:
+        scores: (45,) 번호 1~45 점수 (0 이상)
+        size: 목표 풀 크기
+        temperature: 작을수록 고득점 번호에 집중
+    Returns:
+        (K, 6) 정렬된 조합 (K <= size)
+    """
+    with np.errstate(divide='ignore'):
+        log_w = np.log(np.maximum(scores, 0) / max(scores.sum(), 1e-12)) / temperature
+    numbers = np.arange(1, 46)
+
+    pool, seen = [], set()
+    for _ in range(max_rounds):
+        draws = rng.gumbel(size=(size, 45)) + log_w
+        combos = np.sort(numbers[np.argpartition(-draws, 5, axis=1)[:, :6]], axis=1)
+        if validator is not None:
+            combos = combos[validator.is_valid_batch(combos)]
+        keys = combination_masks(combos)
+        _, first = np.unique(keys, return_index=True)
+        for i in np.sort(first):
+            key = int(keys[i])
+            if key not in seen:
+                seen.add(key)
+                pool.append(combos[i])
+        if len(pool) >= size:
+            break
+    return np.array(pool[:size], dtype=np.int64).reshape(-1, 6)
+
+
+class PortfolioBuilder:
+    """지연 탐욕(lazy greedy) 커버리지 포트폴리오 선택기"""
+
+    def __init__(self, scores: np.ndarray, pair_weight: float = 1.0, decay: float = 0.5,
+                 max_overlap: Optional[int] = None, refresh: int = 64):
+        """
+        Args:
+            scores: (45,) 번호 1~45 점수
+            pair_weight: 번호 쌍 커버리지 가중 (0 이면 번호만)
+            decay: 같은 번호/쌍이 반복될 때 추가 가치 감쇠율 (0 = 한 번만 인정)
+            max_overlap: 지정 시 이미 고른 티켓과 이 개수보다 많이 겹치는 후보 제외
+            refresh: 지연 갱신 시 한 번에 다시 계산할 후보 수
+        """
+        w = np.maximum(np.asarray(scores, dtype=np.float64), 0)
+        self.w = w / w.sum() if w.sum() > 0 else np.full(45, 1 / 45)
+        # 번호 쌍 가중치도 합이 1 이 되도록 정규화 (i < j 칸만 사용)
+        pair_w = np.triu(np.outer(self.w, self.w), k=1)
+        self.pair_w = pair_w / pair_w.sum() * pair_weight
+        self.decay = decay
+        self.max_overlap = max_overlap
+        self.refresh = refresh
+
+    def _gains(self, idx: np.ndarray, pool0: np.ndarray, pair_idx: np.ndarray,
+               num_count: np.ndarray, pair_count: np.ndarray) -> np.ndarray:
+        """후보 idx 의 현재 한계이득 (벡터화)"""
+        num_gain = self.w * (1 - self.decay) * self.decay ** num_count
+        pair_gain = self.pair_w.ravel() * (1 - self.decay) * self.decay ** pair_count
+        return num_gain[pool0[idx]].sum(axis=1) + pair_gain[pair_idx[idx]].sum(axis=1)
+
+    def select(self, pool: np.ndarray, n_tickets: int,
+               initial: Sequence[Sequence[int]] = ()) -> List[List[int]]:
+        """
+        풀에서 n_tickets 장 선택 (initial 은 먼저 포함된 것으로 간주)
+
+        Returns:
+            선택된 조합 리스트 (선택 순서, initial 제외)
+        """
+        pool = np.asarray(pool, dtype=np.int64)
+        pool0 = pool - 1
+        pair_idx = pool0[:, _PAIR_I] * 45 + pool0[:, _PAIR_J]
+        keys = combination_masks(pool)
+
+        num_count = np.zeros(45, dtype=np.int64)
+        pair_count = np.zeros(45 * 45, dtype=np.int64)
+        upper = np.zeros(len(pool))
+
+        def take(ticket0: np.ndarray):
+            num_count[ticket0] += 1
+            pair_count[ticket0[_PAIR_I] * 45 + ticket0[_PAIR_J]] += 1
+            key = combination_masks(ticket0[None, :] + 1)[0]
+            upper[keys == key] = -np.inf
+            if self.max_overlap is not None:
+                upper[popcount(keys & key) > self.max_overlap] = -np.inf
+
+        for ticket in initial:
+            take(np.sort(np.asarray(ticket, dtype=np.int64)) - 1)
+        live = upper > -np.inf
+        upper[live] = self._gains(np.nonzero(live)[0], pool0, pair_idx, num_count, pair_count)
+
+        selected = []
+        while len(selected) < n_tickets:
+            live = upper > -np.inf
+            if not live.any():
+                break
+            # 상한(이전 이득)이 큰 후보만 다시 계산, 갱신된 최댓값이 다른 모든 상한 이상이면 확정
+            m = min(self.refresh, int(live.sum()))
+            top = np.argpartition(-upper, m - 1)[:m]
+            top = top[upper[top] > -np.inf]
+            upper[top] = self._gains(top, pool0, pair_idx, num_count, pair_count)
+            best = top[np.argmax(upper[top])]
+            if upper[best] >= upper.max():
+                selected.append(pool[best].tolist())
+                take(pool0[best])
+        return selected
+
+
+def build_portfolio(scores: Dict[int, float], n_tickets: int, validator=None,
+                    initial: Sequence[Sequence[int]] = (), seed: Optional[int] = None,
+                    pool_size: int = None, **builder_kwargs) -> List[List[int]]:
+    """
+    {번호: 점수} 로부터 커버리지 포트폴리오 구성
+
+    Args:
+        n_tickets: initial 을 제외하고 추가로 고를 티켓 수
+        pool_size: 후보 풀 크기 (기본 max(2000, 40 * n_tickets))
+    """
+    score_vec = np.array([scores.get(n, 0.0) for n in range(1, 46)], dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    pool = sample_pool(score_vec, pool_size or max(2000, 40 * n_tickets), rng, validator)
+    return PortfolioBuilder(score_vec, **builder_kwargs).select(pool, n_tickets, initial)
+
+
+def portfolio_overlap(tickets: Sequence[Sequence[int]]) -> Dict[str, float]:
+    """포트폴리오 중복 지표 (평균/최대 쌍별 공통 번호 수, 덮은 번호/쌍 수)"""
+    combos = np.asarray(tickets, dtype=np.int64)
+    if len(combos) < 2:
+        return {'mean_overlap': 0.0, 'max_overlap': 0, 'numbers_covered': len(np.unique(combos)),
+                'pairs_covered': len(combos) * 15}
+    member = np.zeros((len(combos), 46), dtype=np.int64)
+    np.put_along_axis(member, combos, 1, axis=1)
+    shared = member @ member.T
+    iu = np.triu_indices(len(combos), k=1)
+    pairs = np.unique((combos[:, _PAIR_I] * 46 + combos[:, _PAIR_J]).ravel())
+    return {
+        'mean_overlap': float(shared[iu].mean()),
+        'max_overlap': int(shared[iu].max()),
+        'numbers_covered': int(np.count_nonzero(member.sum(axis=0))),
+        'pairs_covered': int(len(pairs)),
+    }
@@ -0,0 +1,200 @@
+"""
+대량 자동번호(Quick Pick) 생성기
+고정/제외 번호와 CombinationValidator 규칙(AC, 합계, 홀수, 끝수 다양성)을 만족하는
+조합 공간에서 균등하게, 중복 없이 대량의 티켓을 청크 단위로 생성
+
+조합 순위(rank) 공간에서 동작:
+    1. 조건을 만족하는 조합의 순위 배열 A 를 1회 구성 (전체 조합 특성 테이블 사용)
+    2. A 의 인덱스를 균등 비복원 추출 (요청 수가 적으면 rng.integers + 방문 비트맵, 많으면 순열)
+    3. 순위 -> 조합 변환 (unrank)
+
+사용 예:
+    gen = QuickPickGenerator(fixed=[7], exclude=[13, 40], seed=1)
+    for chunk in gen.generate(1_000_000):      # (k, 6) uint8 배열
+        ...
+"""
+
+from itertools import combinations
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.combination_table import CombinationTable, N_COMBINATIONS, N_NUMBERS, PICK, rank, unrank
+from src.utils.bitmask import combination_masks
+
+
+# 자유 번호 조합을 직접 나열할 최대 개수 (이보다 크면 유효 순위 목록을 걸러서 구성)
+ENUMERATE_LIMIT = 500_000
+
+
+def _mask_of(numbers: Sequence[int]) -> np.uint64:
+    return np.uint64(sum(1 << int(n) for n in numbers))
+
+
+class QuickPickGenerator:
+    """조건부 균등 비복원 티켓 생성기"""
+
+    # 검증 규칙별 유효 순위 목록 캐시 {규칙: int32 순위 배열}
+    _VALID_RANKS_CACHE = {}
+
+    def __init__(self, fixed: Sequence[int] = (), exclude: Sequence[int] = (),
+                 validator=None, validate: bool = True, seed: Optional[int] = None,
+                 table: CombinationTable = None):
+        """
+        Args:
+            fixed: 모든 티켓에 포함할 번호
+            exclude: 어떤 티켓에도 포함하지 않을 번호
+            validator: 규칙을 제공하는 CombinationValidator (기본 인스턴스)
+            validate: False 이면 검증 규칙 없이 고정/제외 조건만 적용
+            seed: 난수 시드 (같은 시드와 조건이면 같은 결과)
+            table: 전체 조합 특성 테이블 (없으면 기본 경로에서 열고, 없으면 생성)
+        """
+        self.fixed = sorted(set(int(n) for n in fixed))
+        self.exclude = sorted(set(int(n) for n in exclude))
+        for n in self.fixed + self.exclude:
+            if not 1 <= n <= N_NUMBERS:
+                raise ValueError(f"번호는 1~{N_NUMBERS} 사이여야 합니다: {n}")
+        if set(self.fixed) & set(self.exclude):
+            raise ValueError(f"고정 번호와 제외 번호가 겹칩니다: {sorted(set(self.fixed) & set(self.exclude))}")
+        if len(self.fixed) > PICK:
+            raise ValueError(f"고정 번호는 최대 {PICK}개입니다")
+        if N_NUMBERS - len(self.exclude) < PICK:
+            raise ValueError("제외 번호가 너무 많습니다")
+
+        if validate and validator is None:
+            from src.combination_validator import CombinationValidator
+            validator = CombinationValidator()
+        self.validator = validator if validate else None
+        self.rng = np.random.default_rng(seed)
+        self._table = table
+        self.ranks = self._eligible_ranks()
+
+    # ------------------------------------------------------------------ #
+    # 조건을 만족하는 순위 목록
+    # ------------------------------------------------------------------ #
+    def _rules(self) -> Tuple:
+        v = self.validator
+        return (tuple(v.OPTIMAL_AC_RANGE), tuple(v.OPTIMAL_SUM_RANGE),
+                tuple(v.OPTIMAL_ODD_RANGE), v.MIN_ENDING_DIVERSITY)
+
+    def _valid_mask(self, ranks: np.ndarray = None) -> np.ndarray:
+        """검증 규칙 통과 여부 (ranks 가 None 이면 전체 순위)"""
+        table = self._table or CombinationTable.open(build=True)
+        self._table = table
+        sl = slice(None) if ranks is None else ranks
+        metrics = {name: table.columns[name][sl]
+                   for name in ('ac', 'sum', 'odd_count', 'ending_diversity')}
+        return self.validator.is_valid_batch(None, metrics)
+
+    def _valid_ranks(self) -> np.ndarray:
+        key = self._rules()
+        if key not in self._VALID_RANKS_CACHE:
+            self._VALID_RANKS_CACHE[key] = np.flatnonzero(self._valid_mask()).astype(np.int32)
+        return self._VALID_RANKS_CACHE[key]
+
+    def _free_space_size(self) -> int:
+        from math import comb
+        return comb(N_NUMBERS - len(self.fixed) - len(self.exclude), PICK - len(self.fixed))
+
+    def _eligible_ranks(self) -> Optional[np.ndarray]:
+        """조건을 만족하는 조합 순위 (오름차순 int32, 제약이 전혀 없으면 None = 전체)"""
+        if not self.fixed and not self.exclude:
+            return self._valid_ranks() if self.validator is not None else None
+
+        if self._free_space_size() <= ENUMERATE_LIMIT:
+            # 자유 번호에서 나머지를 고르는 모든 경우를 직접 나열
+            free = [n for n in range(1, N_NUMBERS + 1) if n not in self.fixed and n not in self.exclude]
+            r = PICK - len(self.fixed)
+            flat = np.fromiter((n for combo in combinations(free, r) for n in combo), dtype=np.int64)
+            rest = flat.reshape(-1, r) if r else np.empty((1, 0), dtype=np.int64)
+            combos = np.hstack([np.tile(np.array(self.fixed, dtype=np.int64), (len(rest), 1)), rest])
+            ranks = np.sort(rank(combos))
+            if self.validator is not None:
+                ranks = ranks[self._valid_mask(ranks)]
+            return ranks.astype(np.int32)
+
+        # 유효(또는 전체) 순위를 청크 단위로 걸러냄
+        base = self._valid_ranks() if self.validator is not None else None
+        total = len(base) if base is not None else N_COMBINATIONS
+        need, ban = _mask_of(self.fixed), _mask_of(self.exclude)
+        kept = []
+        for lo in range(0, total, CombinationTable.CHUNK):
+            hi = min(lo + CombinationTable.CHUNK, total)
+            ranks = base[lo:hi] if base is not None else np.arange(lo, hi, dtype=np.int32)
+            keys = combination_masks(unrank(ranks))
+            kept.append(ranks[((keys & need) == need) & ((keys & ban) == 0)])
+        return np.concatenate(kept).astype(np.int32)
+
+    @property
+    def space_size(self) -> int:
+        """조건을 만족하는 전체 티켓 수"""
+        return N_COMBINATIONS if self.ranks is None else len(self.ranks)
+
+    # ------------------------------------------------------------------ #
+    # 생성
+    # ------------------------------------------------------------------ #
+    def _to_tickets(self, idx: np.ndarray) -> np.ndarray:
+        return unrank(idx if self.ranks is None else self.ranks[idx])
+
+    def generate(self, count: int, chunk_size: int = 1_000_000) -> Iterator[np.ndarray]:
+        """
+        서로 다른 티켓 count 장을 (k, 6) uint8 청크로 생성
+        (조건을 만족하는 티켓이 count 보다 적으면 전부 생성)
+        """
+        space = self.space_size
+        count = min(int(count), space)
+        if count <= 0:
+            return
+
+        if count * 4 >= space:
+            # 공간의 상당 부분을 요청하면 순열에서 앞부분을 사용
+            order = self.rng.permutation(space)[:count]
+            for lo in range(0, count, chunk_size):
+                yield self._to_tickets(order[lo:lo + chunk_size])
+            return
+
+        # 균등 추출 + 방문 비트맵으로 중복 제거 (요청 수가 공간의 1/4 미만이므로 기각률이 낮음)
+        seen = np.zeros(space, dtype=bool)
+        produced = 0
+        while produced < count:
+            want = min(chunk_size, count - produced)
+            idx = self.rng.integers(0, space, size=int(want * 1.1) + 16)
+            _, first = np.unique(idx, return_index=True)
+            idx = idx[np.sort(first)]
+            idx = idx[~seen[idx]][:want]
+            seen[idx] = True
+            produced += len(idx)
+            yield self._to_tickets(idx)
+
+    def sample(self, count: int) -> np.ndarray:
+        """서로 다른 티켓 count 장을 하나의 (count, 6) 배열로 반환"""
+        chunks = list(self.generate(count))
+        return np.concatenate(chunks) if chunks else np.empty((0, PICK), dtype=np.uint8)
+
+    def describe(self) -> Dict:
+        return {
+            'fixed': self.fixed,
+            'exclude': self.exclude,
+            'validate': self.validator is not None,
+            'space_size': self.space_size,
+        }
+
+
+def to_csv_bytes(tickets: np.ndarray) -> bytes:
+    """(k, 6) 티켓 -> CSV 바이트 ("1,2,3,4,5,6\n" 행) 벡터화 변환"""
+    t = np.asarray(tickets, dtype=np.uint8)
+    n, width = t.shape
+    buf = np.empty((n, width, 3), dtype=np.uint8)
+    buf[:, :, 0] = t // 10 + ord('0')
+    buf[:, :, 1] = t % 10 + ord('0')
+    buf[:, :, 2] = ord(',')
+    buf[:, -1, 2] = ord('\n')
+    keep = np.ones(buf.shape, dtype=bool)
+    keep[:, :, 0] = t >= 10           # 한 자리 수는 십의 자리 생략
+    return buf[keep].tobytes()
+
+
+def quick_pick(count: int, fixed: Sequence[int] = (), exclude: Sequence[int] = (),
+               seed: Optional[int] = None, validate: bool = True) -> np.ndarray:
+    """조건을 만족하는 서로 다른 티켓 count 장 (균등 추출)"""
+    return QuickPickGenerator(fixed, exclude, validate=validate, seed=seed).sample(count)
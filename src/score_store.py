@@ -0,0 +1,334 @@
+"""
+엔진 점수 텐서 영구 저장소 (Score Tensor Store)
+회차 시점(cutoff)별 엔진 점수/예측 번호/동적 부스트를 memory-mapped 배열로 저장하여
+학습(train_1000), 백테스트, 이력 내보내기가 같은 계산 결과를 재계산 없이 공유
+
+    cutoff t 행 = 이력 matrix[:t] 로 계산한 엔진 결과, 실제 번호 = 이력 t 번째 행 (다음 회차)
+
+파일 구성 (data/score_store/<키>/, 키 = 엔진 목록 + 엔진 코드 버전 + ML 파라미터 지문):
+    manifest.json   : 형식 버전, 엔진 목록, 용량, 저장된 이력 길이/지문
+    history.u8      : (용량, 6)      계산에 사용한 당첨번호 이력 (데이터 변경 감지, 실제 번호)
+    filled.u8       : (용량,)        cutoff 별 계산 완료 표시
+    scores.f4       : (용량, E, 45)  엔진별 번호 점수 (float32)
+    predictions.u8  : (용량, E, 6)   엔진별 예측 번호 (0 = 없음)
+    present.u8      : (용량, E)      엔진 결과 유무 (학습 실패 엔진 0)
+    boosts.f4       : (용량, E)      엔진별 동적 부스트
+
+새 회차는 파일 끝에 덧붙여 저장하고, 읽기 전용으로 연 프로세스는 memmap 슬라이스를 복사 없이 공유합니다.
+이력 데이터가 바뀌면(정정 등) 바뀐 회차 이후의 cutoff 만 무효화합니다.
+
+사용 예:
+    store = ScoreTensorStore.for_engines(EnsemblePredictor._discover_engine_classes())
+    store.sync(matrix)
+    missing = store.missing(range(500, 1000))
+    cached_data = store.cached_data(500, 1000)     # OptimizationCache.evaluate_weights 입력
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.atomic_io import file_lock, atomic_write_bytes
+from src.utils.fingerprint import matrix_fingerprint, module_fingerprint, combined_fingerprint
+
+
+DEFAULT_STORE_ROOT = Path(__file__).parent.parent / "data" / "score_store"
+
+PICK = 6
+
+
+class ScoreTensorStore:
+    """cutoff 별 엔진 점수 텐서 저장소"""
+
+    FORMAT_VERSION = 1
+    GROW_STEP = 256  # 용량 확장 단위 (cutoff 수)
+    # 저장된 동적 부스트의 계산 설정 (EnsemblePredictor 기본값: boost_lookback, boost_decay)
+    BOOST_PARAMS = (10, 1.0)
+
+    # 배열 파일 {이름: (dtype, 행 이후 형태 생성 함수)}
+    ARRAYS = {
+        'history': (np.uint8, lambda e: (PICK,)),
+        'filled': (np.uint8, lambda e: ()),
+        'scores': (np.float32, lambda e: (e, 45)),
+        'predictions': (np.uint8, lambda e: (e, PICK)),
+        'present': (np.uint8, lambda e: (e,)),
+        'boosts': (np.float32, lambda e: (e,)),
+    }
+    SUFFIX = {np.uint8: 'u8', np.float32: 'f4'}
+
+    def __init__(self, engine_names: Sequence[str], key: str, root: Path = None, readonly: bool = False):
+        self.engine_names = list(engine_names)
+        self.engine_indices = {name: i for i, name in enumerate(self.engine_names)}
+        self.key = key
+        self.readonly = readonly
+        self.store_dir = (Path(root) if root else DEFAULT_STORE_ROOT) / key
+        self.lock_path = self.store_dir / ".lock"
+        self._arrays = {}
+        self._manifest = None
+        self._mtime = None
+
+    @classmethod
+    def for_engines(cls, engine_classes: Dict[str, type], root: Path = None,
+                    readonly: bool = False) -> 'ScoreTensorStore':
+        """엔진 클래스 {엔진 id: 클래스} 의 현재 코드 버전에 해당하는 저장소"""
+        import sys
+        names = sorted(engine_classes)
+        parts = {f'engine:{name}': module_fingerprint(sys.modules[engine_classes[name].__module__])
+                 for name in names}
+        parts['format'] = str(cls.FORMAT_VERSION)
+        if 'ml' in engine_classes:
+            # 튜닝된 ML 파라미터(data/ml_params.json)가 바뀌어도 다른 결과
+            parts['ml_params'] = json.dumps(engine_classes['ml'].default_params(), sort_keys=True)
+        return cls(names, combined_fingerprint(parts)[:16], root=root, readonly=readonly)
+
+    # ------------------------------------------------------------------ #
+    # 파일 / 메타데이터
+    # ------------------------------------------------------------------ #
+    @property
+    def manifest_path(self) -> Path:
+        return self.store_dir / "manifest.json"
+
+    def _array_path(self, name: str) -> Path:
+        dtype = self.ARRAYS[name][0]
+        return self.store_dir / f"{name}.{self.SUFFIX[dtype]}"
+
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('format') == self.FORMAT_VERSION and manifest.get('engines') == self.engine_names:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {'format': self.FORMAT_VERSION, 'engines': self.engine_names,
+                'capacity': 0, 'n_history': 0, 'data_fingerprint': None}
+
+    @property
+    def manifest(self) -> Dict:
+        """manifest (파일이 바뀐 경우에만 다시 읽고, 용량이 늘었으면 배열을 다시 연결)"""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime
+        except OSError:
+            mtime = None
+        if self._manifest is None or mtime != self._mtime:
+            manifest = self._read_manifest()
+            if self._manifest is None or manifest['capacity'] != self._manifest['capacity']:
+                self._arrays = {}
+            self._manifest, self._mtime = manifest, mtime
+        return self._manifest
+
+    def _write_manifest(self, manifest: Dict):
+        atomic_write_bytes(self.manifest_path, json.dumps(manifest, indent=2).encode('utf-8'))
+        self._manifest = manifest
+        self._mtime = os.stat(self.manifest_path).st_mtime
+
+    def _array(self, name: str) -> np.ndarray:
+        """배열 memmap (용량 0 이면 빈 배열)"""
+        capacity = self.manifest['capacity']
+        if name not in self._arrays:
+            dtype, tail = self.ARRAYS[name]
+            shape = (capacity,) + tail(len(self.engine_names))
+            if capacity == 0:
+                self._arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                self._arrays[name] = np.memmap(self._array_path(name), dtype=dtype,
+                                               mode='r' if self.readonly else 'r+', shape=shape)
+        return self._arrays[name]
+
+    def _grow(self, manifest: Dict, needed: int) -> Dict:
+        """용량을 needed 이상으로 확장 (파일 끝을 0 으로 늘림, 쓰기 잠금 안에서 호출)"""
+        if needed <= manifest['capacity']:
+            return manifest
+        capacity = -(-needed // self.GROW_STEP) * self.GROW_STEP
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        for name, (dtype, tail) in self.ARRAYS.items():
+            row_bytes = int(np.prod(tail(len(self.engine_names)), dtype=np.int64)) * np.dtype(dtype).itemsize
+            with open(self._array_path(name), 'ab') as f:
+                f.truncate(capacity * row_bytes)
+        manifest = dict(manifest, capacity=capacity)
+        self._write_manifest(manifest)
+        self._arrays = {}
+        return manifest
+
+    def _flush(self):
+        for array in self._arrays.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    # ------------------------------------------------------------------ #
+    # 이력 동기화 / 조회
+    # ------------------------------------------------------------------ #
+    def sync(self, matrix: np.ndarray) -> int:
+        """
+        당첨번호 이력을 저장소와 맞춤 (새 회차 추가, 바뀐 회차 이후 cutoff 무효화)
+
+        Returns:
+            무효화된 cutoff 수
+        """
+        matrix = np.asarray(matrix, dtype=np.uint8).reshape(-1, PICK)
+        if self.readonly:
+            raise PermissionError("읽기 전용 저장소는 동기화할 수 없습니다")
+        with file_lock(self.lock_path):
+            self._manifest = None
+            manifest = self.manifest
+            n_old = manifest['n_history']
+            common = min(n_old, len(matrix))
+            if manifest['data_fingerprint'] == matrix_fingerprint(matrix[:n_old]) and n_old <= len(matrix):
+                first_changed = n_old
+            else:
+                diff = np.flatnonzero((self._array('history')[:common] != matrix[:common]).any(axis=1))
+                first_changed = int(diff[0]) if len(diff) else common
+            if first_changed >= common and len(matrix) <= n_old:
+                return 0  # 저장된 이력의 앞부분 (과거 시점 이력)
+
+            # 바뀐 회차 k 를 쓰는 cutoff (k 이후 학습 또는 k 가 정답) 무효화
+            invalidated = 0
+            if first_changed < n_old:
+                filled = self._array('filled')
+                invalidated = int(filled[first_changed:].sum())
+                filled[first_changed:] = 0
+
+            # 최신 이력으로 다음 회차를 예측하는 cutoff = len(matrix) 까지 저장 가능하도록 확장
+            manifest = self._grow(manifest, len(matrix) + 1)
+            history = self._array('history')
+            history[first_changed:len(matrix)] = matrix[first_changed:]
+            history[len(matrix):] = 0
+            self._flush()
+            self._write_manifest(dict(manifest, n_history=int(len(matrix)),
+                                      data_fingerprint=matrix_fingerprint(matrix)))
+        return invalidated
+
+    def matches(self, matrix: np.ndarray) -> bool:
+        """matrix 가 저장된 이력의 앞부분과 같은지 (cutoff = len(matrix) 행 사용 가능 조건)"""
+        n = len(matrix)
+        if n > self.manifest['n_history']:
+            return False
+        return bool(np.array_equal(self._array('history')[:n], np.asarray(matrix, dtype=np.uint8)))
+
+    def has(self, cutoffs: Iterable[int]) -> np.ndarray:
+        """cutoff 별 저장 여부"""
+        cutoffs = np.asarray(list(cutoffs), dtype=np.int64)
+        filled = self._array('filled')
+        ok = (cutoffs >= 0) & (cutoffs < len(filled)) & (cutoffs <= self.manifest['n_history'])
+        result = np.zeros(len(cutoffs), dtype=bool)
+        result[ok] = filled[cutoffs[ok]] == 1
+        return result
+
+    def missing(self, cutoffs: Iterable[int]) -> List[int]:
+        cutoffs = list(cutoffs)
+        return [t for t, ok in zip(cutoffs, self.has(cutoffs)) if not ok]
+
+    # ------------------------------------------------------------------ #
+    # 기록
+    # ------------------------------------------------------------------ #
+    def write(self, cutoffs: Sequence[int], scores: np.ndarray, predictions: np.ndarray,
+              present: np.ndarray, boosts: np.ndarray):
+        """
+        cutoff 행 일괄 기록 (배열 기록 후 완료 표시, sync 로 이력을 먼저 맞춰야 함)
+
+        Args:
+            scores (K, E, 45), predictions (K, E, 6), present (K, E), boosts (K, E) - 엔진 순서는 engine_names
+        """
+        if self.readonly:
+            raise PermissionError("읽기 전용 저장소에는 기록할 수 없습니다")
+        cutoffs = np.asarray(cutoffs, dtype=np.int64)
+        if not len(cutoffs):
+            return
+        with file_lock(self.lock_path):
+            self._manifest = None
+            if cutoffs.max() > self.manifest['n_history']:
+                raise ValueError("저장소 이력보다 뒤의 cutoff 는 기록할 수 없습니다 (sync 필요)")
+            self._array('scores')[cutoffs] = scores
+            self._array('predictions')[cutoffs] = predictions
+            self._array('present')[cutoffs] = present
+            self._array('boosts')[cutoffs] = boosts
+            self._flush()
+            self._array('filled')[cutoffs] = 1
+            self._flush()
+
+    # ------------------------------------------------------------------ #
+    # 읽기
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def vote_scores(predictions: np.ndarray) -> np.ndarray:
+        """예측 번호 (R, E, 6) -> 번호별 추천 엔진 수 / 최대 추천 수 (R, 45)"""
+        R = len(predictions)
+        counts = np.zeros((R, 46), dtype=np.int64)
+        rows = np.repeat(np.arange(R), predictions.shape[1] * predictions.shape[2])
+        np.add.at(counts, (rows, predictions.reshape(R, -1).ravel().astype(np.int64)), 1)
+        counts = counts[:, 1:]
+        max_votes = counts.max(axis=1, keepdims=True) if R else np.ones((0, 1), dtype=np.int64)
+        max_votes[max_votes == 0] = 1
+        return counts / max_votes
+
+    @staticmethod
+    def engine_votes(predictions: np.ndarray) -> np.ndarray:
+        """예측 번호 (R, E, 6) -> 엔진별 번호 추천 횟수 (R, E, 45) uint8"""
+        R, E, k = predictions.shape
+        votes = np.zeros((R * E, 46), dtype=np.uint8)
+        np.add.at(votes, (np.repeat(np.arange(R * E), k), predictions.reshape(-1).astype(np.int64)), 1)
+        return votes.reshape(R, E, 46)[:, :, 1:]
+
+    @staticmethod
+    def masked_vote_scores(votes: np.ndarray, masks: np.ndarray) -> np.ndarray:
+        """
+        엔진별 추천 표시 (R, E, 45) + 투표 엔진 표시 (P, E) -> 가중치 행별 투표 점수 (R, P, 45)
+        (EnsemblePredictor._blend 와 같이 표시된 엔진의 추천만 집계하여 최대 추천 수로 정규화)
+        """
+        counts = np.matmul(np.asarray(masks, dtype=np.float64), np.asarray(votes, dtype=np.float64))
+        max_votes = counts.max(axis=2, keepdims=True)
+        max_votes[max_votes == 0] = 1
+        return counts / max_votes
+
+    @staticmethod
+    def actual_masks(rows: np.ndarray) -> np.ndarray:
+        """당첨번호 (R, 6) -> 번호 표시 (R, 45) int8 (0 행은 아직 추첨 전)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        mask = np.zeros((len(rows), 46), dtype=np.int8)
+        np.put_along_axis(mask, rows, 1, axis=1)
+        return mask[:, 1:]
+
+    def cached_data(self, start: int, stop: int) -> Dict:
+        """
+        cutoff [start, stop) 구간을 OptimizationCache.evaluate_weights 입력 형식으로 반환
+        (점수/부스트는 memmap 슬라이스 - 복사 없음)
+        """
+        if not self.has(range(start, stop)).all():
+            raise KeyError(f"저장되지 않은 cutoff 가 있습니다: {self.missing(range(start, stop))[:5]} ...")
+        return {
+            'scores': self._array('scores')[start:stop],
+            'actuals': self.actual_masks(self._array('history')[start:stop]),
+            'vote_scores': self.vote_scores(self._array('predictions')[start:stop]),
+            'votes': self.engine_votes(self._array('predictions')[start:stop]),
+            'boosts': self._array('boosts')[start:stop],
+            'engine_names': self.engine_names,
+        }
+
+    def row(self, cutoff: int) -> Optional[Dict]:
+        """
+        cutoff 1행을 EnsemblePredictor 가 쓰는 형식으로 반환 (없으면 None)
+
+        Returns:
+            {'engines': {엔진: {'scores': {번호: 점수}, 'predictions': [...]}},
+             'failed': [결과 없는 엔진], 'boosts': {엔진: 부스트}}
+        """
+        if not self.has([cutoff])[0]:
+            return None
+        scores = self._array('scores')[cutoff]
+        predictions = self._array('predictions')[cutoff]
+        present = self._array('present')[cutoff]
+        boosts = self._array('boosts')[cutoff]
+        engines, failed = {}, []
+        for i, name in enumerate(self.engine_names):
+            if not present[i]:
+                failed.append(name)
+                continue
+            engines[name] = {
+                'scores': {num: float(scores[i, num - 1]) for num in range(1, 46)},
+                'predictions': [int(n) for n in predictions[i] if n],
+            }
+        return {'engines': engines, 'failed': failed,
+                'boosts': {name: float(boosts[i]) for i, name in enumerate(self.engine_names) if present[i]}}
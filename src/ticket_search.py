@@ -0,0 +1,315 @@
+"""
+45개 번호 전체 공간에 대한 정확한 top-k 조합 탐색 (branch-and-bound)
+
+앙상블 조합 목적함수 (EnsemblePredictor._optimize_combination 과 동일):
+    합계 적합도 * 0.25 + 평균 번호 점수 * 0.30 + 조합 검증 점수 * 0.30 + 구간 다양성 * 0.15
+
+탐색 상태 = (선택된 번호, 다음 후보 위치). 각 상태에서 남은 후보로 달성 가능한
+항목별 최댓값(상위 r개 점수 합, 합계 범위, 홀수 범위, 새 끝수/구간 수)을 더한
+허용(admissible) 상한으로 가지치기하므로 결과는 전수 탐색과 동일합니다.
+동점은 전수 탐색(후보 순서의 itertools.combinations)과 같이 앞선 조합이 우선합니다.
+"""
+
+import heapq
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# 목적함수 가중치 (합계 적합도, 번호 점수, 검증 점수, 구간 다양성)
+ENSEMBLE_WEIGHTS = (0.25, 0.30, 0.30, 0.15)
+VALIDATOR_WEIGHTS = (0.0, 0.0, 1.0, 0.0)
+
+N_NUMBERS = 45
+
+# 상한 계산 부동소수 오차 여유
+_BOUND_EPS = 1e-9
+
+
+def _section(n: int) -> int:
+    return min((n - 1) // 10, 4)
+
+
+def _popcount(x: int) -> int:
+    return bin(x).count('1')
+
+
+class TicketSearch:
+    """정확한 top-k / 최선 우선 조합 탐색기"""
+
+    def __init__(self, candidates: Sequence[Tuple[int, float]],
+                 min_optimal_sum: float, max_optimal_sum: float,
+                 validator=None, require_valid: bool = False,
+                 weights: Tuple[float, float, float, float] = ENSEMBLE_WEIGHTS,
+                 n_numbers: int = 6):
+        """
+        Args:
+            candidates: [(번호, 점수), ...] - 이 순서가 동점 처리 순서 (보통 점수 내림차순)
+            min_optimal_sum / max_optimal_sum: 합계 적합도 최적 구간
+            validator: CombinationValidator (None 이면 검증 점수 0.5 고정)
+            require_valid: True 이면 validator.validate 를 통과하는 조합만 반환
+            weights: 목적함수 항목 가중치
+        """
+        if require_valid and validator is None:
+            raise ValueError("require_valid=True 에는 validator 가 필요합니다")
+
+        self.numbers = [int(n) for n, _ in candidates]
+        self.scores = [float(s) for _, s in candidates]
+        self.min_optimal_sum = min_optimal_sum
+        self.max_optimal_sum = max_optimal_sum
+        self.validator = validator
+        self.require_valid = require_valid
+        self.weights = tuple(weights)
+        self.k = n_numbers
+        self._bands = self._validator_bands() if validator is not None else None
+        self._precompute()
+
+    # ------------------------------------------------------------------ #
+    # 전처리: 후보 위치 pos 이후(suffix)에서 r개를 고를 때의 항목별 한계
+    # ------------------------------------------------------------------ #
+    def _precompute(self):
+        n, k = len(self.numbers), self.k
+        self.odd = [num % 2 for num in self.numbers]
+        self.end_bit = [1 << (num % 10) for num in self.numbers]
+        self.sec_bit = [1 << _section(num) for num in self.numbers]
+
+        self.top_scores = [[0.0] * (k + 1) for _ in range(n + 1)]
+        self.min_add = [[0] * (k + 1) for _ in range(n + 1)]
+        self.max_add = [[0] * (k + 1) for _ in range(n + 1)]
+        self.odd_avail = [0] * (n + 1)
+        self.even_avail = [0] * (n + 1)
+        self.end_avail = [0] * (n + 1)
+        self.sec_avail = [0] * (n + 1)
+
+        for pos in range(n - 1, -1, -1):
+            self.odd_avail[pos] = self.odd_avail[pos + 1] + self.odd[pos]
+            self.even_avail[pos] = self.even_avail[pos + 1] + 1 - self.odd[pos]
+            self.end_avail[pos] = self.end_avail[pos + 1] | self.end_bit[pos]
+            self.sec_avail[pos] = self.sec_avail[pos + 1] | self.sec_bit[pos]
+
+            suffix_scores = sorted(self.scores[pos:], reverse=True)
+            suffix_nums = sorted(self.numbers[pos:])
+            for r in range(1, min(k, n - pos) + 1):
+                self.top_scores[pos][r] = sum(suffix_scores[:r])
+                self.min_add[pos][r] = sum(suffix_nums[:r])
+                self.max_add[pos][r] = sum(suffix_nums[-r:])
+
+    # ------------------------------------------------------------------ #
+    # 점수 항목
+    # ------------------------------------------------------------------ #
+    def _sum_fit(self, total: float) -> float:
+        if self.min_optimal_sum <= total <= self.max_optimal_sum:
+            return 1.0
+        distance = min(abs(total - self.min_optimal_sum), abs(total - self.max_optimal_sum))
+        return max(0, 1 - distance / 40)
+
+    def _sum_fit_bound(self, lo: int, hi: int) -> float:
+        if hi < self.min_optimal_sum:
+            return self._sum_fit(hi)
+        if lo > self.max_optimal_sum:
+            return self._sum_fit(lo)
+        return 1.0
+
+    @staticmethod
+    def _band(lo: int, hi: int, bands: Sequence[Tuple[int, int, float]], default: float) -> float:
+        """[lo, hi] 구간과 겹치는 첫 band 의 값 (band 는 값 내림차순)"""
+        for b_lo, b_hi, value in bands:
+            if lo <= b_hi and hi >= b_lo:
+                return value
+        return default
+
+    def _validator_bands(self):
+        """CombinationValidator.score 의 항목별 구간 점수 (AC, 합계, 홀수)"""
+        v = self.validator
+        ac_bands = ((v.OPTIMAL_AC_RANGE[0], v.OPTIMAL_AC_RANGE[1], 0.3), (6, 10, 0.2))
+        sum_bands = ((v.OPTIMAL_SUM_RANGE[0], v.OPTIMAL_SUM_RANGE[1], 0.25), (90, 185, 0.15))
+        odd_bands = ((2, 4, 0.2), (1, 5, 0.1))
+        return ac_bands, sum_bands, odd_bands
+
+    def _extend(self, state: Tuple, p: int) -> Tuple:
+        """상태에 p 번 후보 추가: (picked, 점수 합, 번호 합, 홀수, 끝수 mask, 구간 mask, 차이 mask)"""
+        picked, partial, total, odds, end_mask, sec_mask, diff_mask = state
+        num = self.numbers[p]
+        for q in picked:
+            diff_mask |= 1 << abs(num - self.numbers[q])
+        return (picked + (p,), partial + self.scores[p], total + num, odds + self.odd[p],
+                end_mask | self.end_bit[p], sec_mask | self.sec_bit[p], diff_mask)
+
+    def _exact(self, state: Tuple) -> Optional[float]:
+        """완성된 조합의 목적함수 값 (require_valid 위반 시 None)"""
+        _, partial, total, odds, end_mask, sec_mask, diff_mask = state
+        covered = _popcount(sec_mask)
+        endings = _popcount(end_mask)
+
+        if self.validator is not None:
+            ac = _popcount(diff_mask) - (self.k - 1)
+            ac_bands, sum_bands, odd_bands = self._bands
+            if self.require_valid:
+                v = self.validator
+                if not (v.OPTIMAL_AC_RANGE[0] <= ac <= v.OPTIMAL_AC_RANGE[1]
+                        and v.OPTIMAL_SUM_RANGE[0] <= total <= v.OPTIMAL_SUM_RANGE[1]
+                        and v.OPTIMAL_ODD_RANGE[0] <= odds <= v.OPTIMAL_ODD_RANGE[1]
+                        and endings >= v.MIN_ENDING_DIVERSITY):
+                    return None
+            # CombinationValidator.score 와 같은 연산 순서
+            validator_score = 0.0
+            validator_score += self._band(ac, ac, ac_bands, 0.1)
+            validator_score += self._band(total, total, sum_bands, 0.05)
+            validator_score += self._band(odds, odds, odd_bands, 0.0)
+            validator_score += min(endings / 6, 1) * 0.15
+            validator_score += (covered / 5) * 0.1
+        else:
+            validator_score = 0.5
+
+        w_sum, w_num, w_val, w_div = self.weights
+        return (self._sum_fit(total) * w_sum + (partial / self.k) * w_num +
+                validator_score * w_val + (covered / 5) * w_div)
+
+    def _bound(self, pos: int, state: Tuple) -> Optional[float]:
+        """상태에 pos 번 이후 후보만 더해 달성 가능한 목적함수 상한 (불가능하면 None)"""
+        picked, partial, total, odds, end_mask, sec_mask, diff_mask = state
+        depth = len(picked)
+        r = self.k - depth
+        if len(self.numbers) - pos < r:
+            return None
+
+        sum_lo, sum_hi = total + self.min_add[pos][r], total + self.max_add[pos][r]
+        odd_lo = odds + max(0, r - self.even_avail[pos])
+        odd_hi = odds + min(r, self.odd_avail[pos])
+        endings = _popcount(end_mask) + min(r, _popcount(self.end_avail[pos] & ~end_mask))
+        covered = _popcount(sec_mask) + min(r, _popcount(self.sec_avail[pos] & ~sec_mask))
+
+        if self.validator is not None:
+            # 차이 집합은 커지기만 하고 새 쌍은 최대 C(k,2) - C(depth,2) 개
+            ac_lo = _popcount(diff_mask) - (self.k - 1)
+            new_pairs = self.k * (self.k - 1) // 2 - depth * (depth - 1) // 2
+            ac_hi = min(_popcount(diff_mask) + new_pairs, N_NUMBERS - 1) - (self.k - 1)
+            ac_bands, sum_bands, odd_bands = self._bands
+            if self.require_valid:
+                v = self.validator
+                if (ac_hi < v.OPTIMAL_AC_RANGE[0] or ac_lo > v.OPTIMAL_AC_RANGE[1]
+                        or sum_hi < v.OPTIMAL_SUM_RANGE[0] or sum_lo > v.OPTIMAL_SUM_RANGE[1]
+                        or odd_hi < v.OPTIMAL_ODD_RANGE[0] or odd_lo > v.OPTIMAL_ODD_RANGE[1]
+                        or endings < v.MIN_ENDING_DIVERSITY):
+                    return None
+            validator_ub = (self._band(ac_lo, ac_hi, ac_bands, 0.1) +
+                            self._band(sum_lo, sum_hi, sum_bands, 0.05) +
+                            self._band(odd_lo, odd_hi, odd_bands, 0.0) +
+                            min(endings / 6, 1) * 0.15 + (covered / 5) * 0.1)
+        else:
+            validator_ub = 0.5
+
+        w_sum, w_num, w_val, w_div = self.weights
+        return (self._sum_fit_bound(sum_lo, sum_hi) * w_sum +
+                (partial + self.top_scores[pos][r]) / self.k * w_num +
+                validator_ub * w_val + (covered / 5) * w_div + _BOUND_EPS)
+
+    # ------------------------------------------------------------------ #
+    # 탐색
+    # ------------------------------------------------------------------ #
+    _ROOT = ((), 0.0, 0, 0, 0, 0, 0)
+
+    def _ticket(self, picked: Tuple[int, ...]) -> List[int]:
+        return sorted(self.numbers[p] for p in picked)
+
+    def top_k(self, k: int = 1) -> List[Tuple[List[int], float]]:
+        """
+        목적함수 상위 k개 조합 (깊이 우선 branch-and-bound)
+
+        Returns:
+            [(조합, 점수), ...] 점수 내림차순 (동점은 후보 순서상 앞선 조합 우선 - 전수 탐색과 동일)
+        """
+        n, size = len(self.numbers), self.k
+        if n < size or k <= 0:
+            return []
+
+        heap = []          # (점수, -방문 순번, picked) 최소 힙 = 현재 k번째
+        counter = [0]
+
+        def threshold() -> float:
+            # 상한에는 _BOUND_EPS 가 더해져 있으므로 현재 k번째와 같거나 낮은 상태는 제외
+            # (깊이 우선 방문이 후보 순서와 같아 나중에 나오는 동점 조합은 어차피 밀림)
+            return heap[0][0] + _BOUND_EPS if len(heap) >= k else float('-inf')
+
+        def visit(state, pos):
+            depth = len(state[0])
+            for p in range(pos, n - (size - depth) + 1):
+                child = self._extend(state, p)
+                ub = self._bound(p + 1, child)
+                if ub is None or ub <= threshold():
+                    continue
+                if depth + 1 < size:
+                    visit(child, p + 1)
+                    continue
+                value = self._exact(child)
+                if value is None:
+                    continue
+                counter[0] += 1
+                item = (value, -counter[0], child[0])
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif value > heap[0][0]:
+                    heapq.heapreplace(heap, item)
+
+        visit(self._ROOT, 0)
+        ranked = sorted(heap, key=lambda item: (-item[0], -item[1]))
+        return [(self._ticket(picked), value) for value, _, picked in ranked]
+
+    def best(self) -> Optional[Tuple[List[int], float]]:
+        """최고 점수 조합 (없으면 None)"""
+        result = self.top_k(1)
+        return result[0] if result else None
+
+    def iter_best(self) -> Iterator[Tuple[List[int], float]]:
+        """
+        점수 내림차순으로 조합을 하나씩 생성하는 지연 이터레이터 (최선 우선 탐색)
+
+        상태 (선택, pos) 는 'pos 번 후보 포함' / '제외' 두 자식으로 분기하며
+        상한이 가장 큰 상태부터 펼치므로 완성 조합은 정확히 점수 순서로 나옵니다.
+        """
+        n, size = len(self.numbers), self.k
+        if n < size:
+            return
+        ub = self._bound(0, self._ROOT)
+        if ub is None:
+            return
+        counter = 0
+        # (-우선순위, 종류(0=완성, 1=부분), -선택 수, 순번, pos, 상태) - 같은 상한이면 깊은 상태 우선
+        heap = [(-ub, 1, 0, counter, 0, self._ROOT)]
+        while heap:
+            neg_value, kind, _, _, pos, state = heapq.heappop(heap)
+            if kind == 0:
+                yield self._ticket(state[0]), -neg_value
+                continue
+
+            # 포함
+            included = self._extend(state, pos)
+            if len(included[0]) == size:
+                value = self._exact(included)
+                if value is not None:
+                    counter += 1
+                    heapq.heappush(heap, (-value, 0, 0, counter, pos + 1, included))
+            else:
+                child_ub = self._bound(pos + 1, included)
+                if child_ub is not None:
+                    counter += 1
+                    heapq.heappush(heap, (-child_ub, 1, -len(included[0]), counter, pos + 1, included))
+
+            # 제외
+            child_ub = self._bound(pos + 1, state)
+            if child_ub is not None:
+                counter += 1
+                heapq.heappush(heap, (-child_ub, 1, -len(state[0]), counter, pos + 1, state))
+
+    def score(self, numbers: Sequence[int]) -> Optional[float]:
+        """임의 조합의 목적함수 값 (번호는 candidates 에 포함되어야 함, require_valid 위반 시 None)"""
+        position = {num: i for i, num in enumerate(self.numbers)}
+        state = self._ROOT
+        for p in sorted(position[int(n)] for n in numbers):
+            state = self._extend(state, p)
+        return self._exact(state)
+
+
+def search_from_scores(scores: Dict[int, float], min_optimal_sum: float, max_optimal_sum: float,
+                       validator=None, **kwargs) -> TicketSearch:
+    """{번호: 점수} 에서 점수 내림차순 후보로 탐색기 생성"""
+    candidates = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    return TicketSearch(candidates, min_optimal_sum, max_optimal_sum, validator=validator, **kwargs)
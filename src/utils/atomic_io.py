@@ -0,0 +1,47 @@
+"""
+파일 캐시 공용 입출력 유틸리티
+프로세스 간 잠금 + 임시 파일 기반 원자적 쓰기
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows 등 fcntl 미지원 환경
+    fcntl = None
+
+
+@contextmanager
+def file_lock(lock_path: Path):
+    """프로세스 간 쓰기 잠금 (fcntl 미지원 환경에서는 잠금 없이 진행)"""
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """임시 파일에 기록 후 os.replace 로 원자적 교체"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + '.', suffix='.tmp')
+    try:
+        os.chmod(tmp, 0o644)  # 다른 프로세스/사용자가 읽기 전용으로 공유
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
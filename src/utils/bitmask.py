@@ -0,0 +1,23 @@
+"""
+번호 조합 비트마스크 유틸리티
+조합을 uint64 비트마스크 (비트 n = 번호 n) 로 표현하여 중복 판별 / 겹침 수 계산에 사용
+"""
+
+import numpy as np
+
+
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+
+def combination_masks(combos: np.ndarray) -> np.ndarray:
+    """조합 (n, k) -> 번호 비트마스크 (n,) uint64 (순서 무관 중복 판별용)"""
+    bits = np.left_shift(np.uint64(1), np.asarray(combos, dtype=np.uint64))
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def popcount(x: np.ndarray) -> np.ndarray:
+    """uint64 배열 비트 수 (int64)"""
+    x = np.ascontiguousarray(x, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x).astype(np.int64)
+    return _BYTE_POPCOUNT[x.reshape(-1, 1).view(np.uint8)].sum(axis=1).reshape(x.shape)
@@ -0,0 +1,37 @@
+"""
+데이터/코드 지문(fingerprint) 유틸리티
+캐시 무효화 키로 사용 (당첨번호 이력 해시, 엔진 소스 코드 해시)
+"""
+
+import hashlib
+from pathlib import Path
+from types import ModuleType
+from typing import Dict
+
+import numpy as np
+
+
+def matrix_fingerprint(numbers_matrix: np.ndarray) -> str:
+    """당첨번호 행렬(회차 x 6)의 내용 기반 해시"""
+    arr = np.ascontiguousarray(numbers_matrix, dtype=np.uint8)
+    h = hashlib.sha1()
+    h.update(str(arr.shape).encode())
+    h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def module_fingerprint(module: ModuleType) -> str:
+    """모듈 소스 파일의 내용 기반 해시 (코드 변경 시 캐시 무효화)"""
+    try:
+        source = Path(module.__file__).read_bytes()
+    except (OSError, TypeError, AttributeError):
+        source = module.__name__.encode()
+    return hashlib.sha1(source).hexdigest()
+
+
+def combined_fingerprint(parts: Dict[str, str]) -> str:
+    """여러 지문을 하나의 키로 결합 (키 순서와 무관)"""
+    h = hashlib.sha1()
+    for key in sorted(parts):
+        h.update(f"{key}={parts[key]};".encode())
+    return h.hexdigest()
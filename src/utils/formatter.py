@@ -99,3 +99,17 @@ class LottoFormatter:
                 bar = "█" * int(pct / 5)
                 print(f"   {hits}개 적중: {count:3d}회 ({pct:5.1f}%) {bar}")
         print(f"\n   평균 적중 개수: {avg_hits:.2f}개")
+
+    @staticmethod
+    def print_profile(profile: dict, top: int = 30):
+        print("\n" + "-" * 60)
+        print("⏱️  구간별 실행 계측")
+        print("-" * 60)
+        phases = profile.get('phases', {})
+        if not phases:
+            print("   (기록 없음)")
+            return
+        print(f"   {'구간':32s} {'호출':>6s} {'시간(s)':>9s} {'CPU(s)':>9s} {'메모리(KB)':>11s}")
+        for key, r in list(phases.items())[:top]:
+            peak = f"{r['peak_kb']:11.1f}" if r.get('peak_kb') is not None else f"{'-':>11s}"
+            print(f"   {key:32s} {r['calls']:6d} {r['wall_s']:9.4f} {r['cpu_s']:9.4f} {peak}")
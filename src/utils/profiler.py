@@ -0,0 +1,124 @@
+"""
+경량 실행 계측(프로파일러) 유틸리티
+구간(phase)별 벽시계 시간, CPU 시간, 호출 횟수, 최대 메모리 할당량(tracemalloc) 기록
+
+사용 예:
+    profiler = Profiler(enabled=True, trace_memory=True)
+    with profiler.phase('get_scores', 'statistical'):
+        ...
+    profiler.report()          # {'phases': {'statistical.get_scores': {...}}, ...}
+    profiler.save_json(path)   # 회귀 추적용 JSON 저장
+
+비활성 상태에서는 phase() 가 공유 nullcontext 를 반환하므로 오버헤드가 거의 없습니다.
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Optional
+
+
+_NULL_CONTEXT = nullcontext()
+
+
+class Profiler:
+    """구간별 시간/호출/메모리 누적 기록기"""
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False):
+        """
+        Args:
+            enabled: False 이면 아무것도 기록하지 않음
+            trace_memory: True 이면 tracemalloc 으로 구간별 최대 할당량 기록 (느려짐)
+        """
+        self.enabled = enabled
+        self.trace_memory = trace_memory and enabled
+        self.records: Dict[str, Dict[str, float]] = {}
+        self._local = threading.local()  # 스레드별 메모리 추적 중첩 구간 스택
+        self._started_tracing = False
+        self._active = 0  # 전체 스레드에서 진행 중인 메모리 추적 구간 수
+        self._lock = threading.Lock()
+
+    def phase(self, name: str, engine: Optional[str] = None):
+        """계측 구간 컨텍스트 (engine 지정 시 '엔진.구간' 키로 기록)"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._measure(f"{engine}.{name}" if engine else name)
+
+    @contextmanager
+    def _measure(self, key: str):
+        if self.trace_memory:
+            self._enter_memory()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            peak = self._exit_memory() if self.trace_memory else 0
+            record = self.records.setdefault(key, {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'peak_bytes': 0})
+            record['calls'] += 1
+            record['wall'] += wall
+            record['cpu'] += cpu
+            record['peak_bytes'] = max(record['peak_bytes'], peak)
+
+    @property
+    def _stack(self) -> list:
+        """[시작 시 할당량, 관측된 최대 할당량] 스택 (스레드별, 다른 스레드 구간과 최대값이 섞일 수 있음)"""
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _enter_memory(self):
+        with self._lock:
+            self._active += 1
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            # 바깥 구간의 최대값은 reset_peak 로 사라지므로 미리 보관
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        self._stack.append([current, current])
+
+    def _exit_memory(self) -> int:
+        start, observed = self._stack.pop()
+        peak = max(observed, tracemalloc.get_traced_memory()[1])
+        if self._stack:
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        with self._lock:
+            self._active -= 1
+            if self._active == 0 and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+        return max(0, peak - start)
+
+    def reset(self):
+        self.records.clear()
+
+    def report(self) -> Dict:
+        """JSON 직렬화 가능한 계측 결과 (벽시계 시간 내림차순)"""
+        phases = {
+            key: {
+                'calls': int(r['calls']),
+                'wall_s': round(r['wall'], 6),
+                'cpu_s': round(r['cpu'], 6),
+                'peak_kb': round(r['peak_bytes'] / 1024, 1) if self.trace_memory else None,
+            }
+            for key, r in sorted(self.records.items(), key=lambda x: -x[1]['wall'])
+        }
+        return {'enabled': self.enabled, 'trace_memory': self.trace_memory, 'phases': phases}
+
+    def save_json(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path
+
+
+# 계측을 사용하지 않을 때 공유하는 비활성 인스턴스
+NULL_PROFILER = Profiler(enabled=False)
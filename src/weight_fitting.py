@@ -0,0 +1,224 @@
+"""
+미분 가능한 대리 목적함수(surrogate)로 엔진 가중치와 투표 결합 비율을 경사 상승으로 학습
+캐시된 (회차, 엔진, 45) 점수 텐서(OptimizationCache.precalculate / ScoreTensorStore.cached_data)에서
+NumPy 해석적 경사 + Adam 으로 수 초 안에 수렴합니다 (500회차 x 12엔진 기준 500단계 약 1초).
+
+매개변수화 (제약 없는 변수 -> 제약 있는 값):
+    w = softmax(theta)     엔진 가중치 (단체: 음수 없음, 합 1)
+    β = sigmoid(phi)       투표 점수 결합 비율 (EnsemblePredictor.VOTE_WEIGHT, 기본 0.35)
+    τ = exp(rho)           온도 (likelihood 에서만 함께 학습)
+
+앙상블 점수 (OptimizationCache.evaluate_population 과 동일):
+    a_re = w_e b_re / Σ_k w_k b_rk          (b = 동적 부스트)
+    s_ri = (1 - β) Σ_e a_re S_rei + β V_ri  (V = 가중치 > 0 엔진의 투표 점수, softmax 이므로 보통 전체)
+
+목적함수:
+    soft_topk  : 적중 수의 연속 완화  mean_r Σ_{i∈당첨} σ((s_ri - t_r) / τ),
+                 t_r = 6번째와 7번째 점수의 중간값 (상위 6개 경계),
+                 τ 를 단계마다 기하급수적으로 줄여(annealing) 매끄러운 지형에서 정확 적중 수로 접근
+    likelihood : 당첨 번호의 평균 로그 확률, p_r = softmax(s_r / τ)
+
+학습 중 일정 간격의 스냅샷을 정확 적중 평가기(evaluate_population)로 한 번에 검증하여
+실제 평균 적중 수가 가장 높은 지점을 결과로 반환합니다.
+
+사용 예:
+    cached_data = OptimizationCache().precalculate(matrix, 500)
+    result = fit_weights(cached_data, x0, vote_weight=0.35)
+    result['weights'], result['vote_weight'], result['hits']
+"""
+
+import time
+from typing import Dict
+
+import numpy as np
+
+
+OBJECTIVES = ('soft_topk', 'likelihood')
+
+
+def _sigmoid(x):
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max())
+    return e / e.sum()
+
+
+class SurrogateObjective:
+    """캐시 점수 텐서 위의 대리 목적함수와 해석적 경사"""
+
+    def __init__(self, cached_data: Dict, objective: str = 'soft_topk'):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"알 수 없는 목적함수: {objective} (가능: {', '.join(OBJECTIVES)})")
+        self.objective = objective
+        self.S = np.asarray(cached_data['scores'], dtype=np.float64)              # (R, E, 45)
+        self.A = (np.asarray(cached_data['actuals']) != 0).astype(np.float64)     # (R, 45)
+        R, E = self.S.shape[:2]
+        boosts = cached_data.get('boosts')
+        self.B = np.ones((R, E)) if boosts is None else np.asarray(boosts, dtype=np.float64)
+        vote_scores = cached_data.get('vote_scores')
+        self.has_votes = vote_scores is not None
+        self.V = np.asarray(vote_scores, dtype=np.float64) if self.has_votes else np.zeros((R, 45))
+        votes = cached_data.get('votes')                                           # (R, E, 45)
+        self.votes = None if votes is None else np.asarray(votes, dtype=np.float64)
+        self.k = self.A.sum(axis=1)                                                # 회차별 당첨 번호 수
+        self.rows = np.arange(R)
+
+    def vote_scores(self, w: np.ndarray) -> np.ndarray:
+        """투표 점수 (R, 45) - EnsemblePredictor 와 같이 가중치가 0 보다 큰 엔진의 추천만 집계"""
+        if self.votes is None or (w > 0).all():
+            return self.V
+        from src.score_store import ScoreTensorStore
+        return ScoreTensorStore.masked_vote_scores(self.votes, (w > 0)[None, :])[:, 0]
+    
+    def ensemble(self, w: np.ndarray, beta: float):
+        """앙상블 점수 s (R, 45) 와 역전파용 중간값"""
+        U = self.B * w                                         # (R, E)
+        Z = U.sum(axis=1)
+        Z[Z == 0] = 1.0
+        a = U / Z[:, None]
+        M = np.einsum('re,rei->ri', a, self.S)
+        beta = beta if self.has_votes else 0.0
+        V = self.vote_scores(w)
+        return (1 - beta) * M + beta * V, (a, Z, M, V, beta)
+
+    def _soft_topk(self, s: np.ndarray, tau: float):
+        R = len(s)
+        pos = np.argpartition(-s, (5, 6), axis=1)[:, 5:7]      # 6번째, 7번째 점수 위치
+        t = 0.5 * (s[self.rows, pos[:, 0]] + s[self.rows, pos[:, 1]])
+        sig = _sigmoid((s - t[:, None]) / tau)
+        value = float((self.A * sig).sum() / R)
+        G = self.A * sig * (1 - sig) / (tau * R)
+        dt = -G.sum(axis=1)
+        G[self.rows, pos[:, 0]] += 0.5 * dt
+        G[self.rows, pos[:, 1]] += 0.5 * dt
+        return value, G, 0.0
+
+    def _likelihood(self, s: np.ndarray, tau: float):
+        K = self.k.sum()
+        z = s / tau
+        z_max = z.max(axis=1, keepdims=True)
+        e = np.exp(z - z_max)
+        lse = np.log(e.sum(axis=1)) + z_max[:, 0]
+        p = e / e.sum(axis=1, keepdims=True)
+        value = float(((self.A * z).sum(axis=1) - self.k * lse).sum() / K)
+        G = (self.A - self.k[:, None] * p) / (tau * K)
+        # d/d(log τ) = τ d/dτ
+        g_rho = float((-(self.A * s).sum(axis=1) + self.k * (p * s).sum(axis=1)).sum() / (tau * K))
+        return value, G, g_rho
+
+    def value_and_grad(self, theta: np.ndarray, phi: float, rho: float):
+        """
+        Returns:
+            (목적함수 값, d/dtheta (E,), d/dphi, d/drho)
+        """
+        w = _softmax(theta)
+        beta = float(_sigmoid(phi))
+        tau = float(np.exp(rho))
+        s, (a, Z, M, V, beta_used) = self.ensemble(w, beta)
+
+        if self.objective == 'soft_topk':
+            value, G, g_rho = self._soft_topk(s, tau)
+        else:
+            value, G, g_rho = self._likelihood(s, tau)
+
+        # s -> a -> U = w * b -> w -> theta
+        H = (1 - beta_used) * np.einsum('ri,rei->re', G, self.S)
+        dU = (H - (a * H).sum(axis=1, keepdims=True)) / Z[:, None]
+        g_w = (dU * self.B).sum(axis=0)
+        g_theta = w * (g_w - w @ g_w)
+        g_phi = float((G * (V - M)).sum()) * beta * (1 - beta) if self.has_votes else 0.0
+        return value, g_theta, g_phi, g_rho
+
+
+def fit_weights(cached_data: Dict, x0: np.ndarray = None, vote_weight: float = 0.35,
+                objective: str = 'soft_topk', fit_vote: bool = True, temperature: float = None,
+                final_temperature: float = None, steps: int = 500, lr: float = 0.02,
+                validate_every: int = 10, verbose: bool = False) -> Dict:
+    """
+    대리 목적함수 경사 상승으로 엔진 가중치 (+ 투표 결합 비율) 학습 후 정확 적중 수로 검증
+
+    Args:
+        cached_data: OptimizationCache.precalculate / ScoreTensorStore.cached_data 결과
+        x0: 시작 가중치 (E,) - cached_data['engine_names'] 순서 (기본 균등)
+        vote_weight: 시작 투표 결합 비율
+        fit_vote: False 이면 vote_weight 고정
+        temperature: 시작 온도 (기본: soft_topk 는 시작점 상위 6~12번째 점수 간격의 1/4, likelihood 는 0.1)
+        final_temperature: soft_topk 마지막 단계 온도 (기본 temperature / 10, likelihood 는 τ 도 학습)
+        steps: Adam 단계 수
+        validate_every: 정확 평가 스냅샷 간격 (단계)
+    Returns:
+        {'weights', 'vote_weight', 'hits', 'step', 'initial_hits', 'final', 'temperature',
+         'surrogate', 'steps', 'history', 'time_sec'} - weights/vote_weight/hits 는 검증 최고 지점
+    """
+    from src.optimization_cache import OptimizationCache
+
+    start = time.perf_counter()
+    surrogate = SurrogateObjective(cached_data, objective)
+    E = surrogate.S.shape[1]
+    fit_vote = fit_vote and surrogate.has_votes
+
+    x0 = np.full(E, 1.0 / E) if x0 is None else np.asarray(x0, dtype=np.float64)
+    x0 = x0 / x0.sum() if x0.sum() > 0 else np.full(E, 1.0 / E)
+    # 가중치 0 엔진도 경사로 되살아날 수 있도록 하한을 둠
+    theta = np.log(np.maximum(x0, 1e-3))
+    vote_weight = float(np.clip(vote_weight, 1e-3, 1 - 1e-3))
+    phi = float(np.log(vote_weight / (1 - vote_weight)))
+    if temperature is None:
+        if objective == 'soft_topk':
+            s, _ = surrogate.ensemble(_softmax(theta), vote_weight)
+            top = -np.sort(-s, axis=1)
+            temperature = max(0.25 * float(np.median(top[:, 5] - top[:, 11])), 1e-4)
+        else:
+            temperature = 0.1
+    if final_temperature is None:
+        final_temperature = temperature / 10
+    rho = float(np.log(temperature))
+    decay = np.log(final_temperature / temperature) / max(steps - 1, 1)
+
+    params = np.concatenate([theta, [phi, rho]])
+    m, v = np.zeros_like(params), np.zeros_like(params)
+    b1, b2, eps = 0.9, 0.999, 1e-8
+    history, snapshots = [], []
+
+    for step in range(1, steps + 1):
+        if objective == 'soft_topk':
+            params[E + 1] = rho + decay * (step - 1)
+        value, g_theta, g_phi, g_rho = surrogate.value_and_grad(params[:E], params[E], params[E + 1])
+        grad = np.concatenate([g_theta, [g_phi if fit_vote else 0.0,
+                                         g_rho if objective == 'likelihood' else 0.0]])
+        history.append((step, value))
+        if step == 1 or step % validate_every == 0:
+            snapshots.append((step, _softmax(params[:E]), float(_sigmoid(params[E]))))
+
+        # Adam (경사 상승)
+        m = b1 * m + (1 - b1) * grad
+        v = b2 * v + (1 - b2) * grad ** 2
+        params += lr * (m / (1 - b1 ** step)) / (np.sqrt(v / (1 - b2 ** step)) + eps)
+
+        if verbose and step % 50 == 0:
+            print(f"   단계 {step:4d} | 대리 목적함수 {value:.6f} | 투표 비율 {_sigmoid(params[E]):.3f} "
+                  f"| 온도 {np.exp(params[E + 1]):.4f}")
+
+    snapshots.append((len(history), _softmax(params[:E]), float(_sigmoid(params[E]))))
+
+    # 정확 적중 수 검증 (시작점 + 스냅샷을 한 번에 평가)
+    W = np.vstack([x0] + [w for _, w, _ in snapshots])
+    betas = np.array([vote_weight] + [b for _, _, b in snapshots])
+    hits = OptimizationCache.evaluate_population(cached_data, W, vote_weight=betas)[0]
+    best = 1 + int(np.argmax(hits[1:]))
+
+    return {
+        'weights': W[best],
+        'vote_weight': float(betas[best]),
+        'hits': float(hits[best]),
+        'step': snapshots[best - 1][0],
+        'initial_hits': float(hits[0]),
+        'final': {'weights': W[-1], 'vote_weight': float(betas[-1]), 'hits': float(hits[-1])},
+        'temperature': float(np.exp(params[E + 1])),
+        'surrogate': history[-1][1],
+        'steps': len(history),
+        'history': history,
+        'time_sec': time.perf_counter() - start,
+    }
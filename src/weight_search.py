@@ -0,0 +1,348 @@
+"""
+엔진 가중치 개체군 탐색기 (Population-based weight search)
+세대 전체를 (P, E) 가중치 행렬로 한 번에 평가하며 (OptimizationCache.evaluate_population,
+PopulationEvaluator.evaluate) 확률 단체(simplex: 음수 없음, 합 1) 위에서 엔진 가중치를 탐색
+
+    ga    : train_1000 의 기존 유전 알고리즘 (두 엔진 사이 질량 이동 돌연변이, 상위 50% 생존) - 비교 기준
+    de    : 차분 진화 DE/current-to-pbest/1/bin (동점 이상이면 교체하여 평탄 구간에서도 이동)
+    cmaes : CMA-ES (합 1 초평면의 E-1 차원 좌표에서 표본 추출, 단체로 사영하여 평가, IPOP 재시작)
+
+적중 수 목적함수는 계단형이므로 후보는 유클리드 사영(project_simplex)으로 단체에 올리며,
+사영은 일부 엔진 가중치를 정확히 0 으로 만들 수 있습니다. 가중치 0 엔진은 EnsemblePredictor 와
+같이 평가기(OptimizationCache.evaluate_population)에서도 투표 집계에서 빠집니다.
+
+사용 예:
+    optimizer = make_optimizer('cmaes', seed=1)
+    result = optimizer.run(evaluator.evaluate, x0, budget=5000, patience=100)
+    result['weights'], result['score'], result['evaluations']
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def project_simplex(Y: np.ndarray) -> np.ndarray:
+    """행 단위 유클리드 사영: 각 행을 {x >= 0, sum(x) = 1} 의 가장 가까운 점으로"""
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    n = Y.shape[1]
+    u = -np.sort(-Y, axis=1)
+    cssv = np.cumsum(u, axis=1) - 1.0
+    ind = np.arange(1, n + 1)
+    rho = n - 1 - np.argmax((u - cssv / ind > 0)[:, ::-1], axis=1)
+    theta = cssv[np.arange(len(Y)), rho] / (rho + 1)
+    return np.maximum(Y - theta[:, None], 0.0)
+
+
+def evaluations_to_reach(history: List[Tuple[int, float]], score: float) -> Optional[int]:
+    """탐색 기록 [(누적 평가 수, 최고 점수), ...] 에서 score 에 처음 도달한 평가 수 (미도달 None)"""
+    for evaluations, best in history:
+        if best >= score:
+            return evaluations
+    return None
+
+
+class WeightSearch(ABC):
+    """
+    개체군 탐색기 기반 클래스 (ask / tell)
+
+    하위 클래스는 _start(x0), _ask() -> (P, E) 단체 위 후보, _tell(X, scores) 를 구현합니다.
+    """
+
+    name = ''
+
+    def __init__(self, population_size: int = None, seed: Optional[int] = None):
+        self.population_size = population_size
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    @abstractmethod
+    def _start(self, x0: np.ndarray):
+        """시작 가중치 x0 (단체 위) 로 탐색 상태 초기화"""
+        pass
+
+    @abstractmethod
+    def _ask(self) -> np.ndarray:
+        """다음 세대 후보 (P, E) - 각 행은 단체 위 가중치"""
+        pass
+
+    @abstractmethod
+    def _tell(self, X: np.ndarray, scores: np.ndarray):
+        """평가 결과 (P,) 로 탐색 상태 갱신"""
+        pass
+
+    def run(self, evaluate: Callable[[np.ndarray], np.ndarray], x0: np.ndarray,
+            budget: int = 5000, patience: Optional[int] = None, target: Optional[float] = None,
+            callback: Callable = None, tol: float = 1e-12) -> Dict:
+        """
+        탐색 실행
+
+        Args:
+            evaluate: (P, E) 가중치 행렬 -> (P,) 점수 (클수록 좋음)
+            x0: 시작 가중치 (E,) - 단체로 사영하여 사용
+            budget: 최대 개체 평가 수 (다음 세대가 예산을 넘으면 종료)
+            patience: 최고 점수가 이 세대 수 동안 개선되지 않으면 조기 종료
+            target: 이 점수에 도달하면 종료
+            callback: 세대마다 callback(generation, evaluations, best_score, best_weights) 호출
+        Returns:
+            {'optimizer', 'weights', 'score', 'evaluations', 'generations', 'stop_reason',
+             'history': [(누적 평가 수, 최고 점수), ...]}
+        """
+        self.rng = np.random.default_rng(self.seed)
+        x0 = project_simplex(x0)[0]
+        self._start(x0)
+
+        best_score, best_weights = -np.inf, x0.copy()
+        evaluations = generation = stall = 0
+        history = []
+        stop_reason = 'budget'
+
+        while True:
+            X = self._ask()
+            if evaluations + len(X) > budget:
+                break
+            scores = np.asarray(evaluate(X), dtype=np.float64)
+            evaluations += len(X)
+            generation += 1
+            self._tell(X, scores)
+
+            i = int(np.argmax(scores))
+            if scores[i] > best_score + tol:
+                best_score, best_weights = float(scores[i]), X[i].copy()
+                stall = 0
+            else:
+                stall += 1
+            history.append((evaluations, best_score))
+            if callback is not None:
+                callback(generation, evaluations, best_score, best_weights)
+
+            if target is not None and best_score >= target:
+                stop_reason = 'target'
+                break
+            if patience and stall >= patience:
+                stop_reason = 'patience'
+                break
+
+        return {
+            'optimizer': self.name,
+            'weights': best_weights,
+            'score': best_score,
+            'evaluations': evaluations,
+            'generations': generation,
+            'stop_reason': stop_reason,
+            'history': history,
+        }
+
+
+class GeneticSearch(WeightSearch):
+    """train_1000 의 기존 유전 알고리즘 (배열 버전): 상위 survival 비율 생존 + 질량 이동 돌연변이"""
+
+    name = 'ga'
+
+    def __init__(self, population_size: int = 50, seed: Optional[int] = None,
+                 initial_rate: float = 0.15, mutation_rate: float = 0.08, survival: float = 0.5):
+        super().__init__(population_size, seed)
+        self.initial_rate = initial_rate
+        self.mutation_rate = mutation_rate
+        self.survival = survival
+
+    def _mutate(self, W: np.ndarray, rate: float) -> np.ndarray:
+        """두 엔진 사이 질량 이동 2회 후 정규화 (train_1000.mutate_weights 와 동일 규칙)"""
+        W = W.copy()
+        P, E = W.shape
+        rows = np.arange(P)
+        for _ in range(2):
+            src = self.rng.integers(E, size=P)
+            dst = (src + self.rng.integers(1, E, size=P)) % E
+            delta = self.rng.uniform(0.01, rate, size=P)
+            ok = W[rows, src] > delta
+            W[rows[ok], src[ok]] -= delta[ok]
+            W[rows[ok], dst[ok]] += delta[ok]
+        return W / W.sum(axis=1, keepdims=True)
+
+    def _start(self, x0: np.ndarray):
+        P = self.population_size
+        self.population = np.vstack([x0, self._mutate(np.tile(x0, (P - 1, 1)), self.initial_rate)])
+
+    def _ask(self) -> np.ndarray:
+        return self.population
+
+    def _tell(self, X: np.ndarray, scores: np.ndarray):
+        P = len(X)
+        order = np.argsort(-scores, kind='stable')
+        survivors = X[order[:max(1, int(P * self.survival))]]
+        parents = survivors[self.rng.integers(len(survivors), size=P - len(survivors))]
+        self.population = np.vstack([survivors, self._mutate(parents, self.mutation_rate)])
+
+
+class DifferentialEvolution(WeightSearch):
+    """
+    차분 진화 DE/current-to-pbest/1/bin
+
+    시도 벡터 u = x + F (x_pbest - x) + F (x_r1 - x_r2) 를 이항 교차 후 단체로 사영하고,
+    부모 이상(>=)이면 교체합니다.
+    """
+
+    name = 'de'
+
+    def __init__(self, population_size: int = 40, seed: Optional[int] = None,
+                 F: float = 0.6, CR: float = 0.9, p_best: float = 0.2, init_scale: float = 0.05):
+        super().__init__(population_size, seed)
+        self.F = F
+        self.CR = CR
+        self.p_best = p_best
+        self.init_scale = init_scale
+
+    def _start(self, x0: np.ndarray):
+        P, E = self.population_size, len(x0)
+        population = project_simplex(x0 + self.init_scale * self.rng.standard_normal((P, E)))
+        population[0] = x0
+        self.population = population
+        self.fitness = None
+
+    def _distinct(self, P: int, *exclude: np.ndarray) -> np.ndarray:
+        """행마다 exclude 와 다른 무작위 개체 인덱스"""
+        idx = self.rng.integers(P, size=P)
+        for _ in range(100):
+            clash = np.zeros(P, dtype=bool)
+            for other in exclude:
+                clash |= idx == other
+            if not clash.any():
+                break
+            idx[clash] = self.rng.integers(P, size=int(clash.sum()))
+        return idx
+
+    def _ask(self) -> np.ndarray:
+        if self.fitness is None:
+            return self.population
+        X = self.population
+        P, E = X.shape
+        own = np.arange(P)
+        top = np.argsort(-self.fitness, kind='stable')[:max(1, int(round(P * self.p_best)))]
+        pbest = top[self.rng.integers(len(top), size=P)]
+        r1 = self._distinct(P, own)
+        r2 = self._distinct(P, own, r1)
+
+        V = X + self.F * (X[pbest] - X) + self.F * (X[r1] - X[r2])
+        cross = self.rng.random((P, E)) < self.CR
+        cross[own, self.rng.integers(E, size=P)] = True
+        return project_simplex(np.where(cross, V, X))
+
+    def _tell(self, X: np.ndarray, scores: np.ndarray):
+        if self.fitness is None:
+            self.fitness = scores.copy()
+            return
+        better = scores >= self.fitness
+        self.population[better] = X[better]
+        self.fitness[better] = scores[better]
+
+
+class CMAES(WeightSearch):
+    """
+    CMA-ES (mu/mu_w, lambda) - 합 1 초평면의 직교 좌표 (E-1 차원) 에서 탐색
+
+    표본 x = project_simplex(c + Q y), c = 균등 가중치, Q = 합 0 부분공간의 정규직교 기저.
+    평균은 갱신 후 단체로 사영하여 항상 유효한 가중치 근처에 머물게 합니다.
+    보폭이 restart_tol 미만으로 줄면 지금까지의 최고점에서 개체 수를 2배로 늘려 재시작합니다.
+    """
+
+    name = 'cmaes'
+
+    def __init__(self, population_size: int = None, seed: Optional[int] = None, sigma0: float = 0.05,
+                 restart_tol: float = 1e-3):
+        super().__init__(population_size, seed)
+        self.sigma0 = sigma0
+        self.restart_tol = restart_tol
+
+    def _to_weights(self, Y: np.ndarray) -> np.ndarray:
+        return project_simplex(self.center + Y @ self.Q.T)
+
+    def _to_coords(self, X: np.ndarray) -> np.ndarray:
+        return (X - self.center) @ self.Q
+
+    def _start(self, x0: np.ndarray):
+        E = len(x0)
+        self.center = np.full(E, 1.0 / E)
+        self.Q = np.linalg.svd(np.ones((1, E)))[2][1:].T          # (E, E-1)
+        self.n = E - 1
+        self.best = (-np.inf, x0)
+        self.restarts = 0
+        self._reset(x0, self.population_size or 4 + int(3 * np.log(self.n)))
+
+    def _reset(self, x0: np.ndarray, lam: int):
+        """전략 상태 초기화 (시작 / 재시작: 평균 = x0, 개체 수 lam)"""
+        n = self.n
+        mu = lam // 2
+        w = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        self.weights = w / w.sum()
+        mueff = 1.0 / np.sum(self.weights ** 2)
+
+        self.lam, self.mu, self.mueff = lam, mu, mueff
+        self.cc = (4 + mueff / n) / (n + 4 + 2 * mueff / n)
+        self.cs = (mueff + 2) / (n + mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + mueff)
+        self.cmu = min(1 - self.c1, 2 * (mueff - 2 + 1 / mueff) / ((n + 2) ** 2 + mueff))
+        self.damps = 1 + 2 * max(0.0, np.sqrt((mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+        self.mean = self._to_coords(x0)
+        self.sigma = self.sigma0
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.C = np.eye(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.generation = 0
+
+    def _ask(self) -> np.ndarray:
+        Z = self.rng.standard_normal((self.lam, self.n))
+        self._steps = (Z * self.D) @ self.B.T                       # y = B D z
+        return self._to_weights(self.mean + self.sigma * self._steps)
+
+    def _tell(self, X: np.ndarray, scores: np.ndarray):
+        self.generation += 1
+        order = np.argsort(-scores, kind='stable')[:self.mu]
+        if scores[order[0]] > self.best[0]:
+            self.best = (scores[order[0]], X[order[0]].copy())
+        selected = self._steps[order]
+
+        # 평균 갱신 후 단체로 사영 (실제 이동량으로 경로 갱신)
+        old_mean = self.mean
+        self.mean = self._to_coords(self._to_weights(old_mean + self.sigma * (self.weights @ selected))[0])
+        y_w = (self.mean - old_mean) / self.sigma
+
+        inv_sqrt_C = self.B @ np.diag(1 / self.D) @ self.B.T
+        self.ps = (1 - self.cs) * self.ps + np.sqrt(self.cs * (2 - self.cs) * self.mueff) * (inv_sqrt_C @ y_w)
+        ps_norm = np.linalg.norm(self.ps)
+        hsig = ps_norm / np.sqrt(1 - (1 - self.cs) ** (2 * self.generation)) / self.chi_n < 1.4 + 2 / (self.n + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_w
+
+        rank_mu = (selected.T * self.weights) @ selected
+        self.C = ((1 - self.c1 - self.cmu) * self.C
+                  + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C)
+                  + self.cmu * rank_mu)
+        self.sigma *= np.exp((self.cs / self.damps) * (ps_norm / self.chi_n - 1))
+
+        self.C = np.triu(self.C) + np.triu(self.C, 1).T
+        eigenvalues, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+        # 계단형 목적함수의 평탄 구간에서 보폭이 무의미하게 작아지면 최고점에서 개체 수 2배로 재시작 (IPOP)
+        if self.sigma * self.D.max() < self.restart_tol:
+            self.restarts += 1
+            self._reset(self.best[1], self.lam * 2)
+
+
+OPTIMIZERS = {
+    'ga': GeneticSearch,
+    'de': DifferentialEvolution,
+    'cmaes': CMAES,
+}
+
+
+def make_optimizer(name: str, **kwargs) -> WeightSearch:
+    """이름 (ga / de / cmaes) 으로 탐색기 생성"""
+    if name not in OPTIMIZERS:
+        raise ValueError(f"알 수 없는 최적화기: {name} (가능: {', '.join(OPTIMIZERS)})")
+    return OPTIMIZERS[name](**kwargs)
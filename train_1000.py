@@ -5,6 +5,7 @@
 
 import sys
 import os
+import argparse
 
 # 병렬 처리 성능 최적화: 라이브러리 내부 스레딩 비활성화 (프로세스 병렬화 집중)
 os.environ["OMP_NUM_THREADS"] = "1"
@@ -20,22 +21,15 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from src.data_loader import LottoDataLoader
 from src.ensemble_predictor import EnsemblePredictor
-from src.optimization_cache import OptimizationCache
+from src.optimization_cache import OptimizationCache, PopulationEvaluator
+from src.weight_search import OPTIMIZERS, make_optimizer
+from src.weight_fitting import OBJECTIVES, fit_weights
 import numpy as np
 
 import multiprocessing as mp
-from functools import partial
-import threading
 import time
 
 
-def worker_eval_cached(args):
-    """캐시된 데이터를 이용한 초고속 평가"""
-    weights, cached_data = args
-    avg_hits, _ = OptimizationCache.evaluate_weights(cached_data, weights)
-    return avg_hits, weights
-
-
 def worker_eval(args):
     """(구) 병렬 처리를 위한 작업자 함수 wrapper - 더 이상 사용 안 함"""
     weights, matrix, test_rounds = args
@@ -101,47 +95,71 @@ def mutate_weights(weights, mutation_rate=0.1):
     return {k: v / total for k, v in new_weights.items()}
 
 
-def genetic_optimize(matrix, generations=10, population_size=10, test_rounds=100):
-    """유전 알고리즘 기반 최적화"""
-    
-    # 초기 가중치 설정
-    result_path = Path(__file__).parent / "trained_weights_1000.json"
-    # 초기 가중치 설정 (최신 12대 엔진 라인업)
-    default_base_weights = {
-        'statistical': 0.1600,
-        'ml': 0.1000,
-        'lstm': 0.1000,
-        'sequence_correlation': 0.1000,
-        'timeseries': 0.0900,
-        'advanced_pattern': 0.0900,
-        'pattern': 0.0800,
-        'gap': 0.0800,
-        'graph': 0.0800,
-        'poisson': 0.0600,
-        'fourier': 0.0500,
-        'numerology': 0.0100,
-    }
+RESULT_PATH = Path(__file__).parent / "trained_weights_1000.json"
+
+# 초기 가중치 설정 (최신 12대 엔진 라인업)
+DEFAULT_BASE_WEIGHTS = {
+    'statistical': 0.1600,
+    'ml': 0.1000,
+    'lstm': 0.1000,
+    'sequence_correlation': 0.1000,
+    'timeseries': 0.0900,
+    'advanced_pattern': 0.0900,
+    'pattern': 0.0800,
+    'gap': 0.0800,
+    'graph': 0.0800,
+    'poisson': 0.0600,
+    'fourier': 0.0500,
+    'numerology': 0.0100,
+}
 
+
+def load_initial_weights(result_path=RESULT_PATH):
+    """기존 학습 결과(없으면 기본 가중치), 역대 최고 점수, 투표 결합 비율"""
     if result_path.exists():
         try:
             with open(result_path, 'r') as f:
                 data = json.load(f)
             base_weights = data['weights']
             best_score = data.get('best_score', 0)
-            print(f"🔄 기존 학습 결과 로드 완료 (역대 최고 점수: {best_score:.4f})")
+            vote_weight = data.get('vote_weight', EnsemblePredictor.VOTE_WEIGHT)
+            print(f"🔄 기존 학습 결과 로드 완료 (역대 최고 점수: {best_score:.4f}, 투표 결합 비율: {vote_weight:.4f})")
             
             # 혹시 기존 파일에 누락된 엔진이 있다면 기본값으로 채워줌
-            for key in default_base_weights:
+            for key in DEFAULT_BASE_WEIGHTS:
                 if key not in base_weights:
-                    base_weights[key] = default_base_weights[key]
+                    base_weights[key] = DEFAULT_BASE_WEIGHTS[key]
+            return base_weights, best_score, vote_weight
         except Exception as e:
             print(f"⚠️ 기존 학습 파일 로드 실패, 기본값으로 시작합니다: {e}")
-            base_weights = default_base_weights.copy()
-            best_score = 0
     else:
         print("💡 신규 학습을 시작합니다 (기본 가중치 사용)")
-        base_weights = default_base_weights.copy()
-        best_score = 0
+    return DEFAULT_BASE_WEIGHTS.copy(), 0, EnsemblePredictor.VOTE_WEIGHT
+
+
+def save_best_weights(best_score, best_weights, result_path=RESULT_PATH, vote_weight=None):
+    """💾 최고 기록 즉시 자동 저장 (vote_weight: 기본값과 다르게 학습된 투표 결합 비율)"""
+    try:
+        save_data = {
+            "best_score": best_score,
+            "weights": best_weights,
+            "generated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        if vote_weight is not None and vote_weight != EnsemblePredictor.VOTE_WEIGHT:
+            save_data["vote_weight"] = vote_weight
+        with open(result_path, 'w', encoding='utf-8') as f:
+            json.dump(save_data, f, indent=2, ensure_ascii=False)
+        print(f"   💾 가중치가 자동 저장되었습니다: {result_path.name}")
+    except Exception as e:
+        print(f"   ⚠️ 자동 저장 실패: {e}")
+
+
+def genetic_optimize(matrix, generations=10, population_size=10, test_rounds=100):
+    """유전 알고리즘 기반 최적화"""
+    
+    # 초기 가중치 설정
+    result_path = RESULT_PATH
+    base_weights, best_score, vote_weight = load_initial_weights(result_path)
     
     # 초기 개체군 생성
     population = [base_weights.copy()]
@@ -160,88 +178,34 @@ def genetic_optimize(matrix, generations=10, population_size=10, test_rounds=100
     
     # ⚡️ 최적화 캐시 생성 (여기서 한 번만 무거운 연산 수행)
     cache = OptimizationCache()
-    cached_data = cache.precalculate(matrix, test_rounds)
+    cache.precalculate(matrix, test_rounds)
     
     # 가용 코어 전체 사용 (시스템 여유분 1개 확보)
     num_cores = max(1, mp.cpu_count() - 1)
     
+    # 평가 워커 풀은 학습 전체에서 1회 생성 (각 워커가 점수 저장소를 읽기 전용으로 연결)
+    evaluator = PopulationEvaluator(cache.store, len(matrix) - test_rounds, len(matrix), workers=num_cores,
+                                    vote_weight=vote_weight)
+    print(f"🧬 평가 워커 {evaluator.workers}개 준비 완료 (점수 텐서 공유: {cache.store.store_dir})")
+    
     for gen in range(generations):
-        print(f"\n{'='*60}")
-        print(f"🧬 세대 {gen+1}/{generations} 평가 중 (CPU 코어 {num_cores}개 활용)")
-        print(f"{'='*60}")
-        
-        # 병렬 평가를 위한 인자 준비 (캐시 데이터 전달)
-        # cached_data는 읽기 전용이므로 여러 프로세스에서 공유 가능
-        task_args = [(w, cached_data) for w in population]
-        
-        # 상태 공유 변수
-        completed_count = 0
-        current_best_in_gen = 0.0
-        lock = threading.Lock()
-        
-        def _progress_monitor():
-            start_time = time.time()
-            spinner = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
-            idx = 0
-            
-            while completed_count < population_size:
-                elapsed = time.time() - start_time
-                percent = completed_count / population_size * 100
-                bar_len = 30
-                filled = int(bar_len * completed_count / population_size)
-                bar = "█" * filled + "░" * (bar_len - filled)
-                
-                spin = spinner[idx % len(spinner)]
-                idx += 1
-                
-                # 메인 스레드와 값 충돌 방지 (읽기만 하므로 lock 없어도 안전하지만 명시적으로)
-                curr_score = current_best_in_gen
-                
-                status = f"\r  {spin} [시간: {elapsed:3.0f}s] |{bar}| {percent:5.1f}% ({completed_count}/{population_size}) - 최고점수: {curr_score:.4f}"
-                sys.stdout.write(status)
-                sys.stdout.flush()
-                time.sleep(0.1)
-                
-            # 완료 후 최종 출력
-            elapsed = time.time() - start_time
-            sys.stdout.write(f"\r  ✅ [시간: {elapsed:3.0f}s] |{'█'*30}| 100.0% ({population_size}/{population_size}) - 최고점수: {current_best_in_gen:.4f}\n")
-            sys.stdout.flush()
-
-        # 프로세스 풀 생성 및 실행
-        pool = mp.Pool(processes=num_cores)
-        
-        # 모니터링 스레드 시작
-        monitor_thread = threading.Thread(target=_progress_monitor)
-        monitor_thread.start()
+        gen_start = time.time()
         
+        # 개체군 가중치 행렬 (P, E) 만 워커에 전달
         try:
-            results = []
-            # imap_unordered 사용
-            for i, res in enumerate(pool.imap_unordered(worker_eval_cached, task_args)):
-                score, weights = res
-                results.append((score, weights))
-                
-                with lock:
-                    completed_count += 1
-                    if score > current_best_in_gen:
-                        current_best_in_gen = score
-            
-            monitor_thread.join() # 스레드 종료 대기
-            pool.close()
-            pool.join()
-            fitness = results
+            scores = evaluator.evaluate(evaluator.weight_matrix(population))
         except KeyboardInterrupt:
             print("\n⚠️ 사용자에 의해 학습이 중단되었습니다. 하위 프로세스를 정리합니다...")
-            pool.terminate()
-            pool.join()
+            evaluator.close(terminate=True)
             raise # 상위로 전달하여 프로그램 종료
         except Exception as e:
             print(f"\n❌ 오류 발생: {e}")
-            pool.terminate()
-            pool.join()
+            evaluator.close(terminate=True)
             raise
-            
-        print() 
+        
+        fitness = list(zip(scores.tolist(), population))
+        print(f"🧬 세대 {gen+1}/{generations} 평가 완료 ({(time.time() - gen_start) * 1000:.0f}ms) "
+              f"- 세대 최고: {scores.max():.4f}")
         
         # 정렬
         fitness.sort(key=lambda x: x[0], reverse=True)
@@ -255,18 +219,7 @@ def genetic_optimize(matrix, generations=10, population_size=10, test_rounds=100
             best_weights = generation_best_weights
             print(f"\n🎯 새로운 최고 점수! {best_score:.4f}")
             
-            # 💾 즉시 자동 저장
-            try:
-                save_data = {
-                    "best_score": best_score,
-                    "weights": best_weights,
-                    "generated_at": time.strftime("%Y-%m-%d %H:%M:%S")
-                }
-                with open(result_path, 'w', encoding='utf-8') as f:
-                    json.dump(save_data, f, indent=2, ensure_ascii=False)
-                print(f"   💾 가중치가 자동 저장되었습니다: {result_path.name}")
-            except Exception as e:
-                print(f"   ⚠️ 자동 저장 실패: {e}")
+            save_best_weights(best_score, best_weights, result_path, vote_weight)
         else:
             print(f"\n   현재 세대 최고: {fitness[0][0]:.4f} | 역대 최고: {best_score:.4f}")
         
@@ -282,6 +235,7 @@ def genetic_optimize(matrix, generations=10, population_size=10, test_rounds=100
         
         population = new_population
     
+    evaluator.close()
     print()
     print("=" * 60)
     print(f"✅ 학습 완료!")
@@ -291,7 +245,116 @@ def genetic_optimize(matrix, generations=10, population_size=10, test_rounds=100
     return best_weights, best_score
 
 
+def search_optimize(matrix, optimizer='cmaes', budget=20000, test_rounds=100, seed=None, patience=None):
+    """CMA-ES / 차분 진화 / GA (src.weight_search) 기반 최적화 - 단체 위 가중치 배열을 세대 단위로 평가"""
+    result_path = RESULT_PATH
+    base_weights, best_score, vote_weight = load_initial_weights(result_path)
+    
+    print("=" * 60)
+    print(f"🎓 1~1000회차 데이터로 학습 시작 (최적화기: {optimizer})")
+    print("=" * 60)
+    print(f"   평가 예산: {budget}")
+    print(f"   조기 종료: {patience or '-'}세대 개선 없음")
+    print(f"   검증 회차: {test_rounds}")
+    print()
+    
+    cache = OptimizationCache()
+    cache.precalculate(matrix, test_rounds)
+    num_cores = max(1, mp.cpu_count() - 1)
+    
+    with PopulationEvaluator(cache.store, len(matrix) - test_rounds, len(matrix), workers=num_cores,
+                             vote_weight=vote_weight) as evaluator:
+        names = evaluator.engine_names
+        x0 = evaluator.weight_matrix([base_weights])[0]
+        if x0.sum() <= 0:
+            x0 = np.ones(len(names))
+        state = {'best_score': best_score, 'last_print': 0.0}
+        
+        def _to_dict(w):
+            return {name: float(v) for name, v in zip(names, w)}
+        
+        def _on_generation(generation, evaluations, score, weights):
+            if score > state['best_score']:
+                state['best_score'] = score
+                print(f"\n🎯 새로운 최고 점수! {score:.4f} (평가 {evaluations}회)")
+                save_best_weights(score, _to_dict(weights), result_path, vote_weight)
+            now = time.time()
+            if now - state['last_print'] >= 1.0:
+                print(f"🧬 세대 {generation} | 평가 {evaluations}/{budget} | 탐색 최고: {score:.4f}")
+                state['last_print'] = now
+        
+        try:
+            result = make_optimizer(optimizer, seed=seed).run(
+                evaluator.evaluate, x0, budget=budget, patience=patience, callback=_on_generation)
+        except KeyboardInterrupt:
+            print("\n⚠️ 사용자에 의해 학습이 중단되었습니다. 하위 프로세스를 정리합니다...")
+            raise
+    
+    print()
+    print("=" * 60)
+    print(f"✅ 학습 완료! (종료 사유: {result['stop_reason']}, 평가 {result['evaluations']}회)")
+    print(f"   탐색 최고 점수: {result['score']:.4f} | 역대 최고: {max(best_score, result['score']):.4f}")
+    print("=" * 60)
+    
+    if result['score'] > best_score:
+        return _to_dict(result['weights']), result['score']
+    return base_weights, best_score
+
+
+def gradient_fit(matrix, test_rounds=100, objective='soft_topk', fit_vote=True, steps=500):
+    """대리 목적함수 경사 상승 (src.weight_fitting) - 엔진 가중치 + 투표 결합 비율, 정확 적중 수로 검증"""
+    result_path = RESULT_PATH
+    base_weights, best_score, vote_weight = load_initial_weights(result_path)
+    
+    print("=" * 60)
+    print(f"🎓 1~1000회차 데이터로 학습 시작 (경사 학습: {objective})")
+    print("=" * 60)
+    print(f"   단계 수: {steps}")
+    print(f"   투표 결합 비율 학습: {'예' if fit_vote else '아니오 (고정)'}")
+    print(f"   검증 회차: {test_rounds}")
+    print()
+    
+    cache = OptimizationCache()
+    cached_data = cache.precalculate(matrix, test_rounds)
+    names = cached_data['engine_names']
+    x0 = OptimizationCache.weight_matrix(cached_data, [base_weights])[0]
+    
+    result = fit_weights(cached_data, x0, vote_weight=vote_weight, objective=objective,
+                         fit_vote=fit_vote, steps=steps, verbose=True)
+    weights = {name: float(v) for name, v in zip(names, result['weights'])}
+    
+    print()
+    print("=" * 60)
+    print(f"✅ 학습 완료! ({result['steps']}단계, {result['time_sec']:.2f}초)")
+    print(f"   정확 적중 검증: 시작 {result['initial_hits']:.4f} -> 최고 {result['hits']:.4f} "
+          f"({result['step']}단계) | 마지막 {result['final']['hits']:.4f}")
+    print(f"   투표 결합 비율: {vote_weight:.4f} -> {result['vote_weight']:.4f}")
+    print("=" * 60)
+    
+    if result['hits'] > best_score:
+        print(f"\n🎯 새로운 최고 점수! {result['hits']:.4f}")
+        save_best_weights(result['hits'], weights, result_path, result['vote_weight'])
+        return weights, result['hits']
+    print(f"\n   역대 최고 {best_score:.4f} 보다 낮아 기존 결과를 유지합니다.")
+    return base_weights, best_score
+
+
 def main():
+    parser = argparse.ArgumentParser(description='1~1000회차 데이터로 엔진 가중치 학습')
+    parser.add_argument('--optimizer', choices=sorted(OPTIMIZERS) + ['gradient'], default='ga',
+                        help='ga: 기존 유전 알고리즘 (세대 수 기준), de / cmaes: src.weight_search (평가 예산 기준), '
+                             'gradient: 대리 목적함수 경사 학습 (src.weight_fitting, 투표 결합 비율 포함)')
+    parser.add_argument('--generations', type=int, default=20000, help='GA 세대 수')
+    parser.add_argument('--population', type=int, default=50, help='GA 개체군 크기')
+    parser.add_argument('--budget', type=int, default=20000, help='de / cmaes 최대 평가 수')
+    parser.add_argument('--patience', type=int, help='de / cmaes 조기 종료 (개선 없는 세대 수)')
+    parser.add_argument('--seed', type=int, help='de / cmaes 난수 시드')
+    parser.add_argument('--objective', choices=OBJECTIVES, default='soft_topk', help='gradient 대리 목적함수')
+    parser.add_argument('--steps', type=int, default=500, help='gradient 단계 수')
+    parser.add_argument('--fix-vote', action='store_true', help='gradient 에서 투표 결합 비율을 고정')
+    parser.add_argument('--test-rounds', type=int, default=500, help='검증 회차 수')
+    args = parser.parse_args()
+    
     # 데이터 로드
     print("\n⏳ 데이터 로딩...")
     loader = LottoDataLoader()
@@ -303,13 +366,31 @@ def main():
     print(f"✅ 학습 데이터: 1~1000회차 (총 {len(train_matrix)}개)")
     print(f"📌 1001회차 이후는 실전 테스트용으로 보존\n")
     
-    # 유전 알고리즘 최적화
-    best_weights, best_score = genetic_optimize(
-        train_matrix,
-        generations=20000,   # 무한에 가까운 반복 (사용자가 중단할 때까지)
-        population_size=50,
-        test_rounds=500
-    )
+    if args.optimizer == 'ga':
+        # 유전 알고리즘 최적화
+        best_weights, best_score = genetic_optimize(
+            train_matrix,
+            generations=args.generations,   # 기본 20000: 무한에 가까운 반복 (사용자가 중단할 때까지)
+            population_size=args.population,
+            test_rounds=args.test_rounds
+        )
+    elif args.optimizer == 'gradient':
+        best_weights, best_score = gradient_fit(
+            train_matrix,
+            test_rounds=args.test_rounds,
+            objective=args.objective,
+            fit_vote=not args.fix_vote,
+            steps=args.steps
+        )
+    else:
+        best_weights, best_score = search_optimize(
+            train_matrix,
+            optimizer=args.optimizer,
+            budget=args.budget,
+            test_rounds=args.test_rounds,
+            seed=args.seed,
+            patience=args.patience
+        )
     
     print("\n" + "="*60)
     print("✅ 학습이 중단되거나 완료되었습니다.")
@@ -327,7 +408,16 @@ def main():
         'weights': best_weights
     }
     
-    result_path = Path(__file__).parent / "trained_weights_1000.json"
+    result_path = RESULT_PATH
+    # 학습된 투표 결합 비율은 자동 저장된 값을 유지
+    try:
+        with open(result_path, 'r') as f:
+            previous = json.load(f)
+        if 'vote_weight' in previous:
+            result['vote_weight'] = previous['vote_weight']
+    except (OSError, ValueError):
+        pass
+    
     with open(result_path, 'w') as f:
         json.dump(result, f, indent=2)
     
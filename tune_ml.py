@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+🔧 MLEngine 하이퍼파라미터 탐색 (Rolling-origin 시계열 교차검증)
+결과 최적 설정은 data/ml_params.json 에 저장되어 MLEngine 기본값으로 사용됩니다.
+
+사용 예:
+    python tune_ml.py --random 12 --mode native
+    python tune_ml.py --lookback 5,10 --max-depth 6,8 --n-estimators 50 --retrain-interval 50
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.data_loader import LottoDataLoader
+from src.engines.ml import MLEngine
+from src import ml_tuning
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MLEngine 하이퍼파라미터 탐색')
+    parser.add_argument('--lookback', type=_int_list, help='후보 lookback (쉼표 구분)')
+    parser.add_argument('--n-estimators', type=_int_list, help='후보 트리 수')
+    parser.add_argument('--max-depth', type=_int_list, help='후보 최대 깊이')
+    parser.add_argument('--retrain-interval', type=_int_list, help='후보 재학습 주기 (회차)')
+    parser.add_argument('--mode', type=str, help=f'모델 방식 후보 (쉼표 구분, {",".join(MLEngine.MODEL_MODES)})')
+    parser.add_argument('--random', type=int, help='그리드에서 무작위로 N개만 평가')
+    parser.add_argument('--folds', type=int, default=3, help='rolling-origin 테스트 구간 수')
+    parser.add_argument('--horizon', type=int, default=100, help='테스트 구간 길이 (회차)')
+    parser.add_argument('--workers', type=int, help='프로세스 수 (기본: CPU - 1)')
+    parser.add_argument('--seed', type=int, default=42, help='무작위 표본 시드')
+    parser.add_argument('--no-apply', action='store_true', help='결과를 출력만 하고 기본값 파일에 저장하지 않음')
+    args = parser.parse_args()
+
+    space = dict(ml_tuning.DEFAULT_SPACE)
+    for key, value in (('lookback', args.lookback), ('n_estimators', args.n_estimators),
+                       ('max_depth', args.max_depth), ('retrain_interval', args.retrain_interval)):
+        if value:
+            space[key] = value
+    if args.mode:
+        space['mode'] = args.mode.split(',')
+
+    print("\n⏳ 데이터 로딩...")
+    loader = LottoDataLoader()
+    matrix = loader.get_numbers_matrix()
+
+    n_configs = len(ml_tuning.sample_configs(space, args.random, args.seed))
+    print(f"✅ 데이터: {len(matrix)}회차 | 설정 {n_configs}개 | "
+          f"검증: 최근 {args.folds}x{args.horizon}회차 rolling-origin")
+    print("⏳ 피처 행렬 준비 중 (메타 피처 저장소 재사용)...\n")
+
+    def _progress(done, total, res):
+        cfg = res['config']
+        if 'error' in res:
+            print(f"  [{done:3d}/{total}] ❌ {cfg}: {res['error']}")
+            return
+        print(f"  [{done:3d}/{total}] 적중 {res['avg_hits']:.3f} | 학습 {res['fit_sec']:7.1f}s "
+              f"| 추론 {res['infer_ms_per_row']:6.3f}ms/행 | {cfg}")
+
+    results = ml_tuning.search(matrix, space, n_random=args.random, n_folds=args.folds,
+                               horizon=args.horizon, workers=args.workers,
+                               seed=args.seed, progress=_progress)
+
+    print("\n" + "=" * 78)
+    print("📊 상위 설정")
+    print("=" * 78)
+    print(f"{'avg hits':>9s} {'hit rate':>9s} {'fit(s)':>8s} {'fit/model':>10s} {'infer(ms/row)':>14s}  config")
+    for r in [r for r in results if 'error' not in r][:10]:
+        print(f"{r['avg_hits']:9.3f} {r['hit_rate']:9.3%} {r['fit_sec']:8.1f} {r['fit_sec_per_model']:10.2f} "
+              f"{r['infer_ms_per_row']:14.3f}  {r['config']}")
+
+    if not args.no_apply:
+        data = ml_tuning.save_best(results, search_info={
+            'space': space, 'random': args.random, 'folds': args.folds,
+            'horizon': args.horizon, 'n_draws': len(matrix),
+        })
+        print(f"\n💾 최적 설정 저장: {MLEngine.PARAMS_FILE} -> {data['params']}")
+
+
+if __name__ == "__main__":
+    main()